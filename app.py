@@ -1,13 +1,39 @@
 import streamlit as st
 import pandas as pd
+import functools
 import json
+import time
 import altair as alt
 from datetime import datetime
 
+import carga
+import clasificacion_abc
+import claves_producto
+import coincidencias
+import cuadratura
+import exportar
+import informes
+import memo
+import packs
+import refresco
+import registro
+import rendimiento
+import snapshot
+import tablas
+
 # Configuración de la página
 st.set_page_config(page_title="Dashboard Botillería", layout="wide")
 st.title("📊 Dashboard de Ventas")
 
+# Medición por etapa de esta ejecución del script (panel "⏱️ Rendimiento" en el sidebar)
+rendimiento.iniciar()
+
+# st.stop corta el script con una excepción: la ejecución se cierra antes para que su
+# medición llegue igual al historial, al log y a las métricas
+def detener():
+    rendimiento.terminar()
+    st.stop()
+
 # --- Carga y validación del archivo JSON de configuración ---
 @st.cache_data
 def cargar_config(path="report.json"):
@@ -20,146 +46,301 @@ def cargar_config(path="report.json"):
 
 config = cargar_config()
 if not config:
-    st.stop()
+    detener()
+
+# Log local por ejecución y endpoint /metrics para Prometheus (opcionales, sección "rendimiento")
+opciones_rendimiento = rendimiento.configurar(config)
+
+@st.cache_resource(show_spinner=False)
+def cargar_servidor_metricas(puerto, host):
+    return rendimiento.servir_prometheus(puerto, host)
+
+if opciones_rendimiento["puertoPrometheus"]:
+    try:
+        cargar_servidor_metricas(opciones_rendimiento["puertoPrometheus"], opciones_rendimiento["hostPrometheus"])
+    except OSError as e:
+        st.sidebar.caption(f"Métricas Prometheus no disponibles: {e}")
+
+# --- Registro de datasets: una entrada por sucursal, cada una con ventas, catálogo y stock ---
+registro_datasets = registro.leer_registro(config)
+
+# Almacén compartido por todas las sesiones del proceso: cada sucursal se carga una sola vez
+# y cambiar de sucursal no vuelve a cargar lo que ya está en memoria (LRU con presupuesto de memoria)
+@st.cache_resource(show_spinner=False)
+def cargar_almacen(memoria_max):
+    return registro.AlmacenDatasets(memoria_max)
+
+almacen_datasets = cargar_almacen(registro.memoria_max_bytes(config))
+
+if len(registro_datasets) > 1:
+    nombre_dataset = st.sidebar.selectbox("Sucursal", list(registro_datasets), key="dataset_sucursal")
+else:
+    nombre_dataset = next(iter(registro_datasets))
+config_dataset = registro_datasets[nombre_dataset]
+fuentes_dataset = registro.fuentes(config_dataset)
 
 # --- Obtener URL CSV desde JSON ---
-csv_url = config.get("dataSource", {}).get("filename", "")
+csv_url = fuentes_dataset["ventas"]
 if not csv_url:
     st.error("No se encontró URL CSV en JSON.")
-    st.stop()
+    detener()
 
 # --- Obtener URL catálogo desde JSON ---
-catalogo_url = config.get("catalogoProductos", {}).get("url", "")
+catalogo_url = fuentes_dataset["catalogo"]
 if not catalogo_url:
     st.warning("No se encontró URL del catálogo en JSON, la pestaña de productos repetidos no funcionará.")
 
+# --- Obtener URL stock desde JSON ---
+url_stock = fuentes_dataset["stock"]
+
+# --- Refresco en segundo plano de las fuentes remotas (stale-while-revalidate) ---
+# Un hilo por proceso revisa ventas, catálogo y stock con peticiones condicionales y, si
+# cambiaron, los parsea fuera de la ejecución de los usuarios y los reemplaza en el almacén.
+@st.cache_resource(show_spinner=False)
+def cargar_refrescador(memoria_max, intervalo):
+    return refresco.Refrescador(cargar_almacen(memoria_max), intervalo)
+
+refrescador = cargar_refrescador(registro.memoria_max_bytes(config), registro.intervalo_refresco(config))
+
+# --- Carga concurrente de las fuentes ---
+# Descargas y parseo de los Excel en un pool de hilos (sin pool de procesos: cada proceso volvería
+# a ejecutar este script, ver carga.py); cada fuente se define como (clave en el almacén, cargar)
+# para poder cargarla en segundo plano.
+@st.cache_resource(show_spinner=False)
+def cargar_cargador_fuentes(hilos):
+    return carga.CargadorFuentes(hilos, procesos=0)
+
+cargador_fuentes = cargar_cargador_fuentes(registro.pools_carga(config)[0])
+
+# Validador de la fuente a partir de las cabeceras del refresco (None en la primera carga)
+def validador_refresco(cabeceras):
+    return refresco.validador(cabeceras) if cabeceras else None
+
 # --- Función para cargar datos CSV con cache ---
-@st.cache_data(show_spinner=False)
-def cargar_datos_csv(url):
+# Parseo tipado (medidas, fecha y claves categóricas) según el slice de report.json.
+# Si la fuente no cambió se lee el snapshot columnar local en vez del CSV; si solo
+# creció, se parsean únicamente las filas nuevas (refresco incremental).
+def fuente_ventas(url, config):
+    def cargar(contenido=None, cabeceras=None):
+        inicio = time.perf_counter()
+        df, stats = snapshot.cargar_ventas(url, config, contenido=contenido, validador=validador_refresco(cabeceras))
+        with rendimiento.etapa("derivar columnas"):
+            resultado = informes.preparar_ventas(df), stats
+        cargador_fuentes.registrar_tiempo(f"ventas · {url}", inicio, origen=stats.get("origen"))
+        return resultado
+    return ("ventas", url, snapshot.huella_config(config)), cargar
+
+def cargar_datos_csv(url, config):
+    clave, cargar = fuente_ventas(url, config)
     try:
-        df = pd.read_csv(url, sep=None, engine='python')
-        df.columns = df.columns.str.strip()
-        return df
+        resultado = almacen_datasets.obtener(clave, cargar)
     except Exception as e:
         st.error(f"Error cargando CSV: {e}")
-        return pd.DataFrame()
-
-df = cargar_datos_csv(csv_url)
-if df.empty:
-    st.warning("Archivo CSV vacío o no cargado.")
-    st.stop()
+        return pd.DataFrame(), {}
+    refrescador.registrar(url, clave, cargar)
+    return resultado
 
 # --- Función para cargar catálogo Excel con cache ---
-@st.cache_data(show_spinner=False)
+def fuente_catalogo(url):
+    def cargar(contenido=None, cabeceras=None):
+        return cargador_fuentes.excel(
+            f"catalogo · {url}", url, carga.leer_catalogo, contenido=contenido, validador=validador_refresco(cabeceras)
+        )
+    return ("catalogo", url), cargar
+
+@rendimiento.medir("carga · catálogo")
 def cargar_catalogo_excel(url):
+    clave, cargar = fuente_catalogo(url)
     try:
-        df_cat = pd.read_excel(url)
-        df_cat.columns = df_cat.columns.str.strip()
-        return df_cat
+        resultado = almacen_datasets.obtener(clave, cargar)
     except Exception as e:
         st.error(f"Error cargando catálogo Excel: {e}")
         return pd.DataFrame()
+    refrescador.registrar(url, clave, cargar)
+    return resultado
+
+# --- Mapeo pack -> componentes (hoja "Packs" del catálogo o columnas de la hoja principal) ---
+# Se registra después del catálogo: al refrescar, el catálogo nuevo ya está en el almacén.
+def fuente_packs(url):
+    def cargar(contenido=None, cabeceras=None):
+        try:
+            df_cat = almacen_datasets.obtener(*fuente_catalogo(url))
+        except Exception:
+            return packs.vacio()
+        return cargador_fuentes.excel(
+            f"packs · {url}", url, carga.leer_packs, df_cat, contenido=contenido, validador=validador_refresco(cabeceras)
+        )
+    return ("packs", url), cargar
+
+@rendimiento.medir("carga · packs")
+def cargar_mapeo_packs(url):
+    clave, cargar = fuente_packs(url)
+    resultado = almacen_datasets.obtener(clave, cargar)
+    refrescador.registrar(url, clave, cargar)
+    return resultado
+
+# --- Fuente de stock de la sucursal (report.json: "stock": {"url": ...}) ---
+def fuente_stock(url):
+    def cargar(contenido=None, cabeceras=None):
+        return cargador_fuentes.excel(
+            f"stock · {url}", url, carga.leer_stock, contenido=contenido, validador=validador_refresco(cabeceras)
+        )
+    return ("stock", url), cargar
 
-df_catalogo = pd.DataFrame()
-if catalogo_url:
-    df_catalogo = cargar_catalogo_excel(catalogo_url)
+@rendimiento.medir("carga · stock")
+def cargar_stock(url):
+    clave, cargar = fuente_stock(url)
+    try:
+        resultado = almacen_datasets.obtener(clave, cargar)
+    except Exception as e:
+        st.error(f"Error cargando archivo de stock: {e}")
+        return pd.DataFrame()
+    refrescador.registrar(url, clave, cargar)
+    return resultado
+
+# Carga en segundo plano (sin llamadas a st): si falla, el cargador de la pestaña lo reintenta
+# y muestra el error
+def precargar(url, *fuentes):
+    for clave, cargar in fuentes:
+        almacen_datasets.obtener(clave, cargar)
+        refrescador.registrar(url, clave, cargar)
+
+# Catálogo (+ packs) y stock se cargan en paralelo mientras se leen las ventas en este hilo;
+# las pestañas que los usan esperan a que terminen (mismo cerrojo por clave del almacén)
+precargas = {}
+if catalogo_url and not almacen_datasets.contiene(("packs", catalogo_url)):
+    precargas["catalogo"] = lambda: precargar(catalogo_url, fuente_catalogo(catalogo_url), fuente_packs(catalogo_url))
+if url_stock and not almacen_datasets.contiene(("stock", url_stock)):
+    precargas["stock"] = lambda: precargar(url_stock, fuente_stock(url_stock))
+cargador_fuentes.lanzar(precargas)
+
+with rendimiento.etapa("carga · ventas"):
+    df, stats_csv = cargar_datos_csv(csv_url, config_dataset)
+rendimiento.anotar(dataset=nombre_dataset, filas=len(df))
+if df.empty:
+    st.warning("Archivo CSV vacío o no cargado.")
+    detener()
 
 # --- Detectar columnas clave ---
 cols = df.columns.tolist()
+columnas_clave = informes.columnas_ventas(cols)
 
-def encontrar_col(busqueda, columnas=cols):
-    busqueda = busqueda.lower()
-    for c in columnas:
-        if busqueda in c.lower():
-            return c
-    return None
-
-col_sucursal = encontrar_col("sucursal")
-col_producto = encontrar_col("producto / servicio + variante")
-col_mes = encontrar_col("mes")
-col_tipo_producto = encontrar_col("tipo de producto / servicio")
-col_fecha = encontrar_col("fecha")
+col_sucursal = columnas_clave["sucursal"]
+col_producto = columnas_clave["producto"]
+col_mes = columnas_clave["mes"]
+col_tipo_producto = columnas_clave["tipo"]
+col_fecha = columnas_clave["fecha"]
 
-medidas_esperadas = ["Subtotal Neto", "Subtotal Bruto", "Margen Neto", "Costo Neto", "Impuestos", "Cantidad"]
-medidas = [m for m in medidas_esperadas if m in cols]
+medidas = columnas_clave["medidas"]
 
 # Validaciones básicas
 if not all([col_sucursal, col_producto, col_mes]):
     st.error("No se encontraron columnas clave para sucursal, producto o mes en el CSV.")
     st.write("Columnas encontradas:", cols)
-    st.stop()
+    detener()
 
 if not medidas:
     st.error("No se encontraron columnas de medidas importantes en el CSV.")
-    st.stop()
+    detener()
 
 if not col_fecha:
     st.error("No se encontró columna 'Fecha' para detalle diario. Es necesaria.")
-    st.stop()
+    detener()
 
-# --- Conversión de medidas a float ---
-for col in medidas:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
+# --- Cubo preagregado (día × producto × sucursal × categoría) definido por el slice de report.json ---
+# Se materializa una vez por versión de los datos; las pestañas consultan el cubo y no las líneas.
+# El cubo y su motor de filtros (índices por valor para sucursal, tipo, mes y producto) se
+# guardan juntos en el almacén compartido y no deben modificarse.
+def cargar_cubo(version, _df, dimensiones, medidas, columnas_filtros):
+    clave = ("cubo", version, tuple(dimensiones), tuple(sorted(medidas.items())), tuple(sorted(columnas_filtros.items())))
+    return almacen_datasets.obtener(clave, lambda: informes.construir_cubo(_df, dimensiones, medidas, columnas_filtros))
 
-# Convertir columna fecha a datetime
-df[col_fecha] = pd.to_datetime(df[col_fecha], errors='coerce', dayfirst=True)
-
-# Extraer Año, Mes (numérico y nombre) y Día para filtros en nueva pestaña
-df['Año'] = df[col_fecha].dt.year
-df['MesNum'] = df[col_fecha].dt.month
-df['MesNombre'] = df[col_fecha].dt.strftime('%B')
-df['Día'] = df[col_fecha].dt.day
+dims_cubo, agregaciones, columnas_filtros = informes.definir_cubo(config_dataset, cols, columnas_clave)
+with rendimiento.etapa("cubo"):
+    df_cubo, motor_filtros = cargar_cubo(stats_csv.get("version_datos", csv_url), df, dims_cubo, agregaciones, columnas_filtros)
 
 # --- Detectar sucursales únicas para filtros ---
-sucursales_disponibles = sorted(df[col_sucursal].dropna().unique())
+# Con varios datasets el selector "Sucursal" de arriba ya eligió el local: si su nombre es una
+# sucursal del CSV (un export compartido) el filtro queda fijo en ella; si no, el filtro ofrece
+# solo las sucursales de ese dataset y lleva otro nombre para no confundirlo con el de arriba.
+sucursales_disponibles = sorted(motor_filtros.valores("sucursal"))
+sucursal_fija = nombre_dataset if len(registro_datasets) > 1 and nombre_dataset in sucursales_disponibles else None
+if sucursal_fija is not None:
+    sucursales_disponibles = [sucursal_fija]
 
 # --- Sidebar: filtros ---
 st.sidebar.header("Filtros")
 
+if stats_csv:
+    origen = {"snapshot": "Snapshot", "incremental": "Incremental"}.get(stats_csv.get("origen"), "CSV")
+    st.sidebar.caption(
+        f"{origen}: {stats_csv['filas']:,} filas en {stats_csv['segundos']:.2f} s "
+        f"({stats_csv['filas_por_segundo']:,.0f} filas/s, motor {stats_csv['motor']})".replace(",", ".")
+    )
+    if stats_csv.get("origen") == "incremental":
+        st.sidebar.caption(
+            f"+{stats_csv['filas_nuevas']} filas nuevas, {stats_csv['correcciones']} corregidas"
+        )
+
 if len(sucursales_disponibles) == 1:
     seleccion_sucursal = sucursales_disponibles[0]
-    st.sidebar.markdown(f"**Sucursal:** {seleccion_sucursal}")
+    if len(registro_datasets) == 1:
+        st.sidebar.markdown(f"**Sucursal:** {seleccion_sucursal}")
 else:
     opciones_suc = ["Todas"] + sucursales_disponibles
-    seleccion_sucursal = st.sidebar.selectbox("Seleccionar Sucursal", opciones_suc)
+    etiqueta_sucursal = "Seleccionar Sucursal" if len(registro_datasets) == 1 else f"Sucursal dentro de {nombre_dataset}"
+    seleccion_sucursal = st.sidebar.selectbox(etiqueta_sucursal, opciones_suc)
 
 # Tipo de producto (si existe)
 if col_tipo_producto:
-    tipos_producto = ["Todos"] + sorted(df[col_tipo_producto].dropna().unique())
+    tipos_producto = ["Todos"] + sorted(motor_filtros.valores("tipo", sucursal=sucursal_fija))
     seleccion_tipo_producto = st.sidebar.selectbox("Seleccionar Tipo Producto / Servicio", tipos_producto)
 else:
     seleccion_tipo_producto = None
 
 # Productos filtrados por tipo
-df_productos = df.copy()
+filtro_tipo = None
 if seleccion_tipo_producto and seleccion_tipo_producto != "Todos" and col_tipo_producto:
-    df_productos = df_productos[df_productos[col_tipo_producto] == seleccion_tipo_producto]
+    filtro_tipo = seleccion_tipo_producto
 
-productos = ["Todos"] + sorted(df_productos[col_producto].dropna().unique())
+productos = ["Todos"] + sorted(motor_filtros.valores("producto", sucursal=sucursal_fija, tipo=filtro_tipo))
 seleccion_producto = st.sidebar.selectbox("Seleccionar Producto", productos)
 
 # Mes
-meses = ["Todos"] + sorted(df[col_mes].dropna().unique())
+meses = ["Todos"] + sorted(motor_filtros.valores("mes", sucursal=sucursal_fija))
 seleccion_mes = st.sidebar.selectbox("Seleccionar Mes", meses)
 
-# --- Aplicar filtros ---
-df_filtrado = df.copy()
-
-if len(sucursales_disponibles) > 1 and seleccion_sucursal != "Todas":
-    df_filtrado = df_filtrado[df_filtrado[col_sucursal] == seleccion_sucursal]
-
-if seleccion_tipo_producto and seleccion_tipo_producto != "Todos":
-    df_filtrado = df_filtrado[df_filtrado[col_tipo_producto] == seleccion_tipo_producto]
-
-if seleccion_mes != "Todas" and seleccion_mes != "Todos":
-    df_filtrado = df_filtrado[df_filtrado[col_mes] == seleccion_mes]
-
-if seleccion_producto != "Todos":
-    df_filtrado = df_filtrado[df_filtrado[col_producto] == seleccion_producto]
+# Período (días completos, cualquier rango): el cubo está ordenado por fecha y el rango es un
+# tramo contiguo de filas que se ubica por búsqueda binaria
+primera_fecha, ultima_fecha = informes.periodo(df_cubo, col_fecha)
+periodo_desde, periodo_hasta = None, None
+if primera_fecha is not None:
+    seleccion_periodo = st.sidebar.date_input(
+        "Período",
+        value=(primera_fecha.date(), ultima_fecha.date()),
+        min_value=primera_fecha.date(),
+        max_value=ultima_fecha.date(),
+        format="DD/MM/YYYY",
+        key="periodo",
+    )
+    if isinstance(seleccion_periodo, (list, tuple)) and len(seleccion_periodo) == 2 \
+            and tuple(seleccion_periodo) != (primera_fecha.date(), ultima_fecha.date()):
+        periodo_desde, periodo_hasta = pd.Timestamp(seleccion_periodo[0]), pd.Timestamp(seleccion_periodo[1])
+
+# --- Aplicar filtros (intersección de índices sobre el cubo, sin copiar la base; el período
+# es un slice de la vista, que conserva el orden por fecha) ---
+with rendimiento.etapa("filtros"):
+    df_filtrado = motor_filtros.vista_filtrada(
+        sucursal=sucursal_fija or (seleccion_sucursal if len(sucursales_disponibles) > 1 and seleccion_sucursal != "Todas" else None),
+        tipo=filtro_tipo,
+        mes=seleccion_mes if seleccion_mes not in ("Todas", "Todos") else None,
+        producto=seleccion_producto if seleccion_producto != "Todos" else None,
+    )
+    df_filtrado = informes.entre_fechas(df_filtrado, col_fecha, periodo_desde, periodo_hasta)
 
 if df_filtrado.empty:
     st.warning("No hay datos para los filtros seleccionados.")
-    st.stop()
+    detener()
 
 # --- Función formato moneda ---
 def formato_moneda(x):
@@ -169,123 +350,147 @@ def formato_moneda(x):
     except Exception:
         return "$0"
 
+# --- Caché de cálculos por sesión ---
+# Cada cálculo pesado de las pestañas es una función pura memoizada por (versión de datos,
+# filtros que la afectan), en una LRU acotada guardada en la sesión.
+memo.usar_almacen(lambda: st.session_state.setdefault("_memo_calculos", {}))
+version_datos = stats_csv.get("version_datos", csv_url)
+clave_filtros = (seleccion_sucursal, filtro_tipo, seleccion_mes, seleccion_producto, periodo_desde, periodo_hasta)
+
+# Formatos numéricos de report.json para las descargas en Excel
+formatos_excel = exportar.formatos_config(config_dataset)
+
 # --- Pestañas ---
+# Pestañas perezosas: con on_change="rerun" solo la pestaña abierta ejecuta su contenido
+# (tab.open), así el catálogo y la cuadratura de stock no se calculan si nadie los mira.
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "Resumen y Detalle",
     "Análisis ABC",
     "Detalle por Día y Categoría",
     "🧾 Productos Repetidos / No Registrados",
     "📦 Cuadratura de Stock"
-])
-
-import io
+], key="pestaña_activa", on_change="rerun")
 
 # Define variables de columna según tu Excel
 col_producto = "+Producto / Servicio"  # nombre exacto de la columna producto
-col_fecha = "+Fecha Documento"         # nombre exacto de la columna fecha
 col_tipo_producto = "+Tipo de Producto / Servicio"  # para filtrar categoría
 
 
-import io
-
-import io
-
-import io
-
-with tab1:
-    st.markdown("## 📌 Resumen General")
-    resumen = {m: df_filtrado[m].sum() for m in medidas}
-    cols_metrics = st.columns(len(medidas))
-    for idx, m in enumerate(medidas):
-        valor = resumen.get(m, 0)
-        display_val = f"{int(valor):,}".replace(",", ".") if m == 'Cantidad' else formato_moneda(valor)
-        cols_metrics[idx].metric(m, display_val)
-
-    # --- Crear columna Producto Completo ---
-    if '+Variante' in df_filtrado.columns:
-        df_filtrado['Producto Completo'] = df_filtrado.apply(
-            lambda row: row[col_producto] if pd.isna(row['+Variante']) or str(row['+Variante']).strip() == ""
-            else f"{row[col_producto]} ({str(row['+Variante']).strip()})",
-            axis=1
-        )
-    else:
-        df_filtrado['Producto Completo'] = df_filtrado[col_producto]
-
-    df_filtrado['Producto Completo'] = df_filtrado['Producto Completo'].str.upper().str.strip()
-
-    st.markdown(f"## 🛒 Cantidades Vendidas por Producto en categoría '{seleccion_tipo_producto or 'Todos'}' " +
-                (f"y Mes '{seleccion_mes}'" if seleccion_mes != 'Todos' else "(todo el tiempo)"))
-
-    df_cantidades = df_filtrado.copy()
-    if seleccion_producto != "Todos":
-        df_cantidades = df_cantidades[df_cantidades['Producto Completo'] == seleccion_producto]
-
-    cantidades_por_producto = df_cantidades.groupby('Producto Completo')['Cantidad'].sum().reset_index().sort_values(by='Cantidad', ascending=False)
-    st.dataframe(cantidades_por_producto, use_container_width=True)
-
-    st.markdown(f"## 📅 Detalle Diario de Ventas " +
-                (f"para producto '{seleccion_producto}'" if seleccion_producto != "Todos" else "para todos los productos"))
-
-    if seleccion_producto == "Todos":
-        detalle_diario = df_filtrado.groupby(['Producto Completo', col_fecha])['Cantidad'].sum().reset_index()
-        pivot_diario = detalle_diario.pivot(index='Producto Completo', columns=col_fecha, values='Cantidad').fillna(0)
-        pivot_diario = pivot_diario.sort_index(axis=1)
-        fechas_formateadas = pivot_diario.columns.strftime('%d/%m/%Y')
-        pivot_diario.columns = fechas_formateadas
-
-        # Agregar totales por fila y columna
-        pivot_diario['Total'] = pivot_diario.sum(axis=1)
-        total_col = pivot_diario.sum(axis=0)
-        total_col.name = 'Total'
-        pivot_diario = pd.concat([pivot_diario, pd.DataFrame([total_col])])
-        pivot_diario = pivot_diario.astype(int)
-
-        # Mostrar tabla separando totales para evitar errores de .style
-        pivot_diario_reset = pivot_diario.reset_index()
-        ultima_fila = pivot_diario_reset.iloc[[-1]]
-        otras_filas = pivot_diario_reset.iloc[:-1]
-
-        st.dataframe(otras_filas, use_container_width=True)
-        st.markdown("### 🔢 Totales Generales")
-        try:
-            st.dataframe(
-                ultima_fila.style.set_properties(**{
-                    'background-color': '#d9ead3',
-                    'font-weight': 'bold'
-                }),
-                use_container_width=True
-            )
-        except:
-            st.dataframe(ultima_fila, use_container_width=True)
-
-        # Mostrar productos sin ventas (usando Producto Completo)
-        if seleccion_tipo_producto != "Todos" and seleccion_tipo_producto is not None:
-            # Filtrar productos base en la categoría
-            df_productos_categoria = df[df[col_tipo_producto] == seleccion_tipo_producto].copy()
-            if '+Variante' in df_productos_categoria.columns:
-                df_productos_categoria['Producto Completo'] = df_productos_categoria.apply(
-                    lambda row: row[col_producto] if pd.isna(row['+Variante']) or str(row['+Variante']).strip() == ""
-                    else f"{row[col_producto]} ({str(row['+Variante']).strip()})",
-                    axis=1
+# Productos por página en el detalle diario (pivot producto × día)
+PRODUCTOS_POR_PAGINA = 50
+
+
+@rendimiento.medir("pestaña 1 · cálculo")
+@memo.memoizar(max_entradas=8)
+def calcular_tab1(version, filtros_sel, _df_filtrado):
+    _, tipo, _, producto, _, _ = filtros_sel
+    df_categoria = motor_filtros.vista(tipo=tipo) if tipo is not None else None
+    return informes.resumen_y_detalle(_df_filtrado, medidas, agregaciones, col_fecha, producto, df_categoria)
+
+
+with tab1, rendimiento.etapa("pestaña 1"):
+    if tab1.open:
+        st.markdown("## 📌 Resumen General")
+        datos_tab1 = calcular_tab1(version_datos, clave_filtros, df_filtrado)
+        resumen = datos_tab1["resumen"]
+        cols_metrics = st.columns(len(medidas))
+        for idx, m in enumerate(medidas):
+            valor = resumen.get(m, 0)
+            display_val = f"{int(valor):,}".replace(",", ".") if m == 'Cantidad' else formato_moneda(valor)
+            cols_metrics[idx].metric(m, display_val)
+
+        # La columna "Producto Completo" (categórica) se construye una sola vez en la ingesta
+
+        texto_periodo = f" del {periodo_desde:%d/%m/%Y} al {periodo_hasta:%d/%m/%Y}" if periodo_desde is not None else ""
+        st.markdown(f"## 🛒 Cantidades Vendidas por Producto en categoría '{seleccion_tipo_producto or 'Todos'}' " +
+                    (f"y Mes '{seleccion_mes}'" if seleccion_mes != 'Todos' else "" if texto_periodo else "(todo el tiempo)") +
+                    texto_periodo)
+
+        st.dataframe(datos_tab1["cantidades_por_producto"], use_container_width=True)
+        tablas.descargas("cantidades_producto", "cantidades_por_producto",
+                         functools.partial(exportar.bloques_frame, datos_tab1["cantidades_por_producto"]), formatos_excel=formatos_excel)
+
+        st.markdown(f"## 📅 Detalle Diario de Ventas " +
+                    (f"para producto '{seleccion_producto}'" if seleccion_producto != "Todos" else "para todos los productos"))
+
+        detalle_diario = datos_tab1["detalle_diario"]
+
+        if seleccion_producto == "Todos":
+            pivot_diario = datos_tab1["pivot"]
+            inicio_fechas, fin_fechas = 0, pivot_diario.n_columnas
+            fila_desde, fila_hasta = 0, pivot_diario.n_filas
+
+            if pivot_diario.n_columnas > 0:
+                col_rango, col_pagina = st.columns([2, 1])
+                primera_fecha = pivot_diario.columnas[0].date()
+                ultima_fecha = pivot_diario.columnas[-1].date()
+                rango_fechas = col_rango.date_input(
+                    "Rango de fechas",
+                    value=(primera_fecha, ultima_fecha),
+                    min_value=primera_fecha,
+                    max_value=ultima_fecha,
+                    format="DD/MM/YYYY",
                 )
-            else:
-                df_productos_categoria['Producto Completo'] = df_productos_categoria[col_producto]
-            df_productos_categoria['Producto Completo'] = df_productos_categoria['Producto Completo'].str.upper().str.strip()
+                if isinstance(rango_fechas, (list, tuple)) and len(rango_fechas) == 2:
+                    inicio_fechas, fin_fechas = pivot_diario.rango_columnas(pd.Timestamp(rango_fechas[0]), pd.Timestamp(rango_fechas[1]))
+
+                paginas = max(1, -(-pivot_diario.n_filas // PRODUCTOS_POR_PAGINA))
+                pagina = col_pagina.number_input(f"Página de productos (de {paginas})", min_value=1, max_value=paginas, value=1, step=1)
+                fila_desde = (int(pagina) - 1) * PRODUCTOS_POR_PAGINA
+                fila_hasta = min(fila_desde + PRODUCTOS_POR_PAGINA, pivot_diario.n_filas)
+
+            st.dataframe(pivot_diario.ventana(fila_desde, fila_hasta, inicio_fechas, fin_fechas), use_container_width=True)
+            # Todos los productos del rango de fechas, por bloques de productos (sin armar la tabla densa completa)
+            tablas.descargas("pivot_diario", "detalle_diario",
+                             functools.partial(exportar.bloques_pivot, pivot_diario, inicio_fechas, fin_fechas),
+                             formatos_excel=formatos_excel, por_defecto="entero")
+            st.caption(
+                f"Productos {fila_desde + 1 if fila_hasta else 0}–{fila_hasta} de {pivot_diario.n_filas} · "
+                f"{fin_fechas - inicio_fechas} días · {pivot_diario.celdas:,} celdas con ventas".replace(",", ".")
+            )
 
-            productos_en_categoria = df_productos_categoria['Producto Completo'].drop_duplicates()
-            productos_vendidos = df_filtrado['Producto Completo'].drop_duplicates()
-            productos_no_vendidos = productos_en_categoria[~productos_en_categoria.isin(productos_vendidos)]
+            # Totales de todos los productos (no solo la página) en el rango de fechas
+            ultima_fila = pivot_diario.fila_totales(inicio_fechas, fin_fechas)
+            st.markdown("### 🔢 Totales Generales")
+            try:
+                st.dataframe(
+                    ultima_fila.style.set_properties(**{
+                        'background-color': '#d9ead3',
+                        'font-weight': 'bold'
+                    }),
+                    use_container_width=True
+                )
+            except:
+                st.dataframe(ultima_fila, use_container_width=True)
+
+            # Mostrar productos sin ventas (usando Producto Completo)
+            if "productos_no_vendidos" in datos_tab1:
+                productos_no_vendidos = datos_tab1["productos_no_vendidos"]
+                st.markdown(f"## 🚫 Productos SIN ventas en categoría '{seleccion_tipo_producto}'")
+                if not productos_no_vendidos.empty:
+                    st.dataframe(productos_no_vendidos.to_frame(name='Producto Completo'), use_container_width=True)
+                else:
+                    st.info("Todos los productos de esta categoría han sido vendidos en el periodo seleccionado.")
+
+            prod_para_graf = st.selectbox("Seleccionar Producto para gráfico diario", ["Todos"] + sorted(detalle_diario['Producto Completo'].unique()))
+            if prod_para_graf != "Todos":
+                df_graf = detalle_diario[detalle_diario['Producto Completo'] == prod_para_graf]
+                graf_diario = alt.Chart(df_graf).mark_line(point=True).encode(
+                    x=alt.X(col_fecha, title="Fecha", axis=alt.Axis(format='%d/%m/%Y')),
+                    y=alt.Y('Cantidad', title="Cantidad Vendida"),
+                    tooltip=[
+                        alt.Tooltip(col_fecha, title="Fecha", format='%d/%m/%Y'),
+                        alt.Tooltip('Cantidad')
+                    ]
+                ).properties(height=300)
+                st.altair_chart(graf_diario, use_container_width=True)
 
-            st.markdown(f"## 🚫 Productos SIN ventas en categoría '{seleccion_tipo_producto}'")
-            if not productos_no_vendidos.empty:
-                st.dataframe(productos_no_vendidos.to_frame(name='Producto Completo'), use_container_width=True)
-            else:
-                st.info("Todos los productos de esta categoría han sido vendidos en el periodo seleccionado.")
+        else:
+            st.dataframe(detalle_diario, use_container_width=True)
+            tablas.descargas("detalle_producto", "detalle_diario_producto",
+                             functools.partial(exportar.bloques_frame, detalle_diario), formatos_excel=formatos_excel)
 
-        prod_para_graf = st.selectbox("Seleccionar Producto para gráfico diario", ["Todos"] + sorted(detalle_diario['Producto Completo'].unique()))
-        if prod_para_graf != "Todos":
-            df_graf = detalle_diario[detalle_diario['Producto Completo'] == prod_para_graf]
-            graf_diario = alt.Chart(df_graf).mark_line(point=True).encode(
+            graf_diario = alt.Chart(detalle_diario).mark_line(point=True).encode(
                 x=alt.X(col_fecha, title="Fecha", axis=alt.Axis(format='%d/%m/%Y')),
                 y=alt.Y('Cantidad', title="Cantidad Vendida"),
                 tooltip=[
@@ -295,458 +500,490 @@ with tab1:
             ).properties(height=300)
             st.altair_chart(graf_diario, use_container_width=True)
 
-    else:
-        detalle_diario = df_filtrado[df_filtrado['Producto Completo'] == seleccion_producto].groupby(col_fecha)['Cantidad'].sum().reset_index().sort_values(col_fecha)
-        st.dataframe(detalle_diario, use_container_width=True)
-
-        graf_diario = alt.Chart(detalle_diario).mark_line(point=True).encode(
-            x=alt.X(col_fecha, title="Fecha", axis=alt.Axis(format='%d/%m/%Y')),
-            y=alt.Y('Cantidad', title="Cantidad Vendida"),
-            tooltip=[
-                alt.Tooltip(col_fecha, title="Fecha", format='%d/%m/%Y'),
-                alt.Tooltip('Cantidad')
-            ]
-        ).properties(height=300)
-        st.altair_chart(graf_diario, use_container_width=True)
-
-
-with tab2:
-    st.markdown("## 🔍 Análisis ABC de Productos")
 
-    df_abc = df_filtrado.copy()
+# ABC multi-métrica por grupo (global, tipo de producto, sucursal o ambos) + XYZ por la
+# variabilidad de las unidades vendidas por mes, sobre el cubo ya filtrado
+@rendimiento.medir("pestaña 2 · cálculo")
+@memo.memoizar(max_entradas=8)
+def calcular_abc(version, filtros_sel, metricas, grupos, grupo_col, n_meses, _df_abc):
+    return informes.abc(_df_abc, grupo_col, metricas, grupos, col_mes, n_meses)
 
-    if df_abc.empty:
-        st.warning("No hay datos para esta selección.")
-    else:
-        columna_valor = st.selectbox(
-            "Seleccionar métrica para Análisis ABC",
-            ["Margen Neto", "Subtotal Neto"]
-        )
-
-        def calcular_abc(df_abc, valor_col='Subtotal Neto', grupo_col=col_producto):
-            df_grouped = df_abc.groupby(grupo_col).agg({
-                valor_col: 'sum',
-                'Cantidad': 'sum'
-            }).reset_index()
-
-            df_grouped = df_grouped.sort_values(by=valor_col, ascending=False)
-            df_grouped['Acumulado'] = df_grouped[valor_col].cumsum()
-            total = df_grouped[valor_col].sum()
-            df_grouped['PorcAcum'] = df_grouped['Acumulado'] / total
-            bins = [0, 0.7, 0.9, 1]
-            labels = ['A', 'B', 'C']
-            df_grouped['tipo de producto'] = pd.cut(df_grouped['PorcAcum'], bins=bins, labels=labels, include_lowest=True)
-
-            # Si es Margen Neto, calculamos margen por unidad
-            if valor_col == "Margen Neto":
-                df_grouped['Margen por Unidad'] = df_grouped.apply(
-                    lambda x: x[valor_col] / x['Cantidad'] if x['Cantidad'] > 0 else 0, axis=1
-                )
-
-            return df_grouped
-
-        df_abc_result = calcular_abc(df_abc, valor_col=columna_valor)
 
-        # Crear copia para mostrar en tabla con formato CLP
-        df_tabla = df_abc_result.copy()
-        df_tabla[columna_valor] = df_tabla[columna_valor].apply(lambda x: f"${x:,.0f}".replace(",", "."))
-        df_tabla['Cantidad'] = df_tabla['Cantidad'].apply(lambda x: f"{x:,.0f}".replace(",", "."))
-        df_tabla['PorcAcum'] = (df_abc_result['PorcAcum'] * 100).round(2).astype(str) + '%'
-        if 'Margen por Unidad' in df_tabla.columns:
-            df_tabla['Margen por Unidad'] = df_tabla['Margen por Unidad'].apply(lambda x: f"${x:,.0f}".replace(",", "."))
+with tab2, rendimiento.etapa("pestaña 2"):
+    if tab2.open:
+        st.markdown("## 🔍 Análisis ABC de Productos")
 
-        # Mostrar tabla con formato
-        columnas_mostrar = [col_producto, columna_valor, 'Cantidad', 'PorcAcum', 'tipo de producto']
-        if 'Margen por Unidad' in df_tabla.columns:
-            columnas_mostrar.append('Margen por Unidad')
+        df_abc = df_filtrado
 
-        st.dataframe(
-            df_tabla[columnas_mostrar].sort_values(by='tipo de producto'),
-            use_container_width=True
-        )
-
-        # Gráfico con valores reales (sin formatear)
-        graf_abc = alt.Chart(df_abc_result).mark_bar().encode(
-            x=alt.X(col_producto, sort='-y'),
-            y=alt.Y(columna_valor, title=f'{columna_valor} CLP'),
-            color=alt.Color('tipo de producto', scale=alt.Scale(domain=['A', 'B', 'C'], range=['#1f77b4', '#ff7f0e', '#2ca02c'])),
-            tooltip=[
-                alt.Tooltip(col_producto, title='Producto'),
-                alt.Tooltip(columna_valor, format=",.0f", title=columna_valor),
-                alt.Tooltip('Cantidad', format=",.0f", title='Unidades Vendidas'),
-                alt.Tooltip('tipo de producto', title='Clasificación ABC')
-            ]
-        ).properties(height=400)
-
-        st.altair_chart(graf_abc, use_container_width=True)
-with tab3:
-    st.markdown("## 📋 Detalle de Ventas por Día y Categoría")
-
-    años_disponibles = sorted(df['Año'].dropna().unique())
-    año_seleccionado = st.selectbox("Seleccionar Año", años_disponibles)
-
-    meses_disponibles = df[df['Año'] == año_seleccionado][['MesNum', 'MesNombre']].drop_duplicates().sort_values('MesNum')
-    mes_seleccionado = st.selectbox("Seleccionar Mes", meses_disponibles['MesNombre'].tolist())
-
-    dias_disponibles = df[(df['Año'] == año_seleccionado) & (df['MesNombre'] == mes_seleccionado)]['Día'].dropna().unique()
-    dias_disponibles = sorted(dias_disponibles)
-    dia_seleccionado = st.selectbox("Seleccionar Día", dias_disponibles)
-
-    df_detalle_fecha = df[
-        (df['Año'] == año_seleccionado) &
-        (df['MesNombre'] == mes_seleccionado) &
-        (df['Día'] == dia_seleccionado)
-    ].copy()  # Copia para evitar SettingWithCopyWarning
-
-    # Agregar columna "Producto Completo" con lógica nombre + variante
-    if '+Variante' in df_detalle_fecha.columns:
-        df_detalle_fecha['Producto Completo'] = df_detalle_fecha.apply(
-            lambda row: row[col_producto] if pd.isna(row['+Variante']) or str(row['+Variante']).strip() == ""
-            else f"{row[col_producto]} ({str(row['+Variante']).strip()})",
-            axis=1
-        )
-    else:
-        df_detalle_fecha['Producto Completo'] = df_detalle_fecha[col_producto]
-
-    df_detalle_fecha['Producto Completo'] = df_detalle_fecha['Producto Completo'].str.upper().str.strip()
-
-    if df_detalle_fecha.empty:
-        st.warning("No hay datos para la fecha seleccionada.")
-    else:
-        ordenar_por = []
-        if col_tipo_producto:
-            ordenar_por.append(col_tipo_producto)
-        ordenar_por.append('Producto Completo')  # Ordenar por Producto Completo en vez de solo producto
-
-        df_detalle_fecha = df_detalle_fecha.sort_values(by=ordenar_por)
-
-        categorias_unicas = df_detalle_fecha[col_tipo_producto].dropna().unique() if col_tipo_producto else ["Sin Categoría"]
-
-        for cat in categorias_unicas:
-            st.markdown(f"### 📂 Categoría: {cat}")
+        if df_abc.empty:
+            st.warning("No hay datos para esta selección.")
+        else:
+            metricas_abc = [m for m in informes.METRICAS_ABC if m in df_abc.columns]
+            col_abc_1, col_abc_2 = st.columns(2)
+            columna_valor = col_abc_1.selectbox("Seleccionar métrica para Análisis ABC", metricas_abc)
+            opciones_grupo = {"Global": ()}
             if col_tipo_producto:
-                df_cat = df_detalle_fecha[df_detalle_fecha[col_tipo_producto] == cat]
-            else:
-                df_cat = df_detalle_fecha
-
-            df_cat = df_cat.copy()
-
-            # Columnas a mostrar incluyendo tipo de documento, número y vendedor
-            cols_mostrar = [
-                'Producto Completo',
-                '+Tipo de Documento',
-                '+Numero Documento',
-                '+Vendedor',
-                'Cantidad',
-                'Subtotal Neto'
-            ]
-            cols_mostrar = [c for c in cols_mostrar if c in df_cat.columns]
-
-            # Formato personalizado para las columnas numéricas
-            if 'Cantidad' in df_cat.columns:
-                df_cat['Cantidad'] = df_cat['Cantidad'].apply(lambda x: f"{int(x):,}".replace(",", "."))
-
-            if 'Subtotal Neto' in df_cat.columns:
-                df_cat['Subtotal Neto'] = df_cat['Subtotal Neto'].apply(lambda x: f"{int(x):,}".replace(",", "."))
-
-            # Estilos personalizados
-            styler = df_cat[cols_mostrar].style.set_properties(
-                subset=['Cantidad'], **{'text-align': 'center'}
-            ).set_properties(
-                subset=['Subtotal Neto'], **{'text-align': 'right'}
+                opciones_grupo["Por tipo de producto"] = (col_tipo_producto,)
+            if len(sucursales_disponibles) > 1:
+                opciones_grupo["Por sucursal"] = (col_sucursal,)
+                if col_tipo_producto:
+                    opciones_grupo["Por sucursal y tipo"] = (col_sucursal, col_tipo_producto)
+            seleccion_grupo = col_abc_2.selectbox("Clasificar", list(opciones_grupo), key="abc_grupo")
+            grupos_abc = opciones_grupo[seleccion_grupo]
+            otras = st.multiselect(
+                "Otras métricas a clasificar", [m for m in metricas_abc if m != columna_valor], key="abc_otras"
             )
+            metricas = tuple([columna_valor] + otras)
 
-            st.dataframe(styler, use_container_width=True)
-
+            n_meses_abc = informes.meses_periodo(
+                df_cubo, col_mes, col_fecha, seleccion_mes if seleccion_mes not in ("Todas", "Todos") else None,
+                periodo_desde, periodo_hasta,
+            )
+            datos_abc = calcular_abc(version_datos, clave_filtros, metricas, grupos_abc, col_producto, n_meses_abc, df_abc)
+            tabla_abc = datos_abc["tabla"]
 
-with tab4:
-    st.markdown("## 🧾 Productos Repetidos y No Registrados")
+            # Matriz ABC × XYZ de la métrica principal (X estable, Y variable, Z errática mes a mes)
+            st.markdown(f"**ABC ({columna_valor}) × XYZ (variabilidad mensual de unidades)**")
+            if datos_abc["matriz_productos"] is None:
+                st.caption("La clasificación XYZ necesita al menos dos meses en el período seleccionado.")
+            else:
+                col_mat_1, col_mat_2 = st.columns(2)
+                col_mat_1.caption("Productos")
+                col_mat_1.dataframe(datos_abc["matriz_productos"], use_container_width=True)
+                col_mat_2.caption(f"Participación en {columna_valor}")
+                col_mat_2.dataframe(
+                    datos_abc["matriz_participacion"].style.format("{:.1%}"), use_container_width=True
+                )
 
-    if df_catalogo.empty:
-        st.warning("No se pudo cargar el catálogo. Por favor revisa la URL en report.json")
-    else:
-        # Detectar columnas clave en catálogo: nombre, variante y SKU
-        col_nom_prod = None
-        col_variante = None
-        col_sku = None
-        for c in df_catalogo.columns:
-            c_lower = c.lower()
-            if "nombre" in c_lower:
-                col_nom_prod = c
-            if "variante" in c_lower:
-                col_variante = c
-            if "sku" == c_lower:
-                col_sku = c
-
-        st.write(f"Columna nombre producto detectada en catálogo: {col_nom_prod}")
-        st.write(f"Columna variante detectada en catálogo: {col_variante}")
-        st.write(f"Columna SKU detectada en catálogo: {col_sku}")
-
-        if not col_nom_prod:
-            st.error("No se encontró columna 'Nombre del Producto' en el catálogo.")
+            formatos_abc = {m: "numero" if m == "Cantidad" else "moneda" for m in metricas}
+            formatos_abc.update({clasificacion_abc.col_porcentaje(m): "porcentaje" for m in metricas})
+            formatos_abc.update({
+                "Cantidad": "numero",
+                clasificacion_abc.COL_MARGEN_UNIDAD: "moneda",
+                clasificacion_abc.COL_CV: lambda x: f"{x:.2f}" if x != float("inf") else "—",
+            })
+
+            datos_tabla_abc = tablas.tabla_paginada(tabla_abc[informes.columnas_abc(tabla_abc, col_producto, metricas, grupos_abc)], "abc", formatos=formatos_abc)
+            tablas.descargas("abc", "analisis_abc", functools.partial(exportar.bloques_frame, datos_tabla_abc),
+                             formatos=formatos_abc, formatos_excel=formatos_excel)
+
+            # Gráfico con valores reales (sin formatear); por grupo se muestra el grupo en el tooltip
+            clase_principal = clasificacion_abc.col_clase(columna_valor)
+            graf_abc = alt.Chart(tabla_abc).mark_bar().encode(
+                x=alt.X(col_producto, sort='-y'),
+                y=alt.Y(columna_valor, title=f'{columna_valor} CLP' if columna_valor != "Cantidad" else "Unidades"),
+                color=alt.Color(clase_principal, scale=alt.Scale(domain=['A', 'B', 'C'], range=['#1f77b4', '#ff7f0e', '#2ca02c'])),
+                tooltip=[alt.Tooltip(g) for g in grupos_abc] + [
+                    alt.Tooltip(col_producto, title='Producto'),
+                    alt.Tooltip(columna_valor, format=",.0f", title=columna_valor),
+                    alt.Tooltip('Cantidad', format=",.0f", title='Unidades Vendidas'),
+                    alt.Tooltip(clase_principal, title='Clasificación ABC'),
+                ] + ([alt.Tooltip(clasificacion_abc.COL_XYZ, title='Clasificación XYZ')]
+                     if clasificacion_abc.COL_XYZ in tabla_abc.columns else [])
+            ).properties(height=400)
+
+            st.altair_chart(graf_abc, use_container_width=True)
+
+
+@rendimiento.medir("pestaña 3 · cálculo")
+@memo.memoizar(max_entradas=16)
+def calcular_detalle_fechas(version, desde, hasta, _df):
+    # Con más de un día, la fecha va primero y ordena las líneas de cada categoría
+    extra = [col_fecha] if desde != hasta else []
+    return informes.detalle_por_categoria(informes.entre_fechas(_df, col_fecha, desde, hasta), col_tipo_producto, extra)
+
+
+with tab3, rendimiento.etapa("pestaña 3"):
+    if tab3.open:
+        st.markdown("## 📋 Detalle de Ventas por Día y Categoría")
+
+        # Un día o un rango de días; las líneas del rango son un slice de las ventas ordenadas por fecha
+        primer_dia, ultimo_dia = informes.periodo(df, col_fecha)
+        if primer_dia is None:
+            st.warning("Las ventas no tienen fechas válidas.")
+            tablas_fecha = []
         else:
-            # Para detectar duplicados se usa la combinación nombre + variante + sku (si existen)
-            columnas_para_duplicados = [col_nom_prod]
-            if col_variante:
-                columnas_para_duplicados.append(col_variante)
-            if col_sku:
-                columnas_para_duplicados.append(col_sku)
+            seleccion_dias = st.date_input(
+                "Seleccionar Día o Rango de Días",
+                value=(ultimo_dia.date(), ultimo_dia.date()),
+                min_value=primer_dia.date(),
+                max_value=ultimo_dia.date(),
+                format="DD/MM/YYYY",
+                key="detalle_dias",
+            )
+            if not isinstance(seleccion_dias, (list, tuple)):
+                seleccion_dias = (seleccion_dias,)
+            dia_desde = pd.Timestamp(seleccion_dias[0])
+            dia_hasta = pd.Timestamp(seleccion_dias[-1])
+
+            tablas_fecha = calcular_detalle_fechas(version_datos, dia_desde, dia_hasta, df)
+
+            if not tablas_fecha:
+                st.warning("No hay datos para la fecha seleccionada.")
+            else:
+                # Todas las categorías del día en un archivo, una categoría por bloque
+                tablas.descargas(
+                    "detalle_dia", f"detalle_{dia_desde:%Y-%m-%d}" + (f"_{dia_hasta:%Y-%m-%d}" if dia_hasta != dia_desde else ""),
+                    functools.partial(exportar.bloques_categorias, tablas_fecha),
+                    formatos={'Cantidad': "entero", 'Subtotal Neto': "entero"}, formatos_excel=formatos_excel,
+                )
+            for cat, df_cat in tablas_fecha:
+                st.markdown(f"### 📂 Categoría: {cat}")
+
+                # Formato y estilos personalizados (solo sobre la página visible)
+                tablas.tabla_paginada(
+                    df_cat,
+                    f"detalle_dia_{cat}",
+                    etiqueta="detalle_dia",
+                    formatos={'Cantidad': "entero", 'Subtotal Neto': "entero"},
+                    estilos=[
+                        (lambda _: 'text-align: center', ['Cantidad']),
+                        (lambda _: 'text-align: right', ['Subtotal Neto']),
+                    ],
+                )
 
-            st.write("### Productos con nombres duplicados en catálogo (mismo nombre + variante + SKU):")
-            dup_nombres = df_catalogo[df_catalogo.duplicated(subset=columnas_para_duplicados, keep=False)]
-            st.dataframe(dup_nombres.sort_values(columnas_para_duplicados), use_container_width=True)
 
+@rendimiento.medir("pestaña 4 · cálculo")
+@memo.memoizar(max_entradas=2)
+def calcular_catalogo(version, version_catalogo, _df_catalogo, _df):
+    # Detectar columnas clave en catálogo: nombre, variante y SKU
+    col_nom_prod = None
+    col_variante = None
+    col_sku = None
+    for c in _df_catalogo.columns:
+        c_lower = c.lower()
+        if "nombre" in c_lower:
+            col_nom_prod = c
+        if "variante" in c_lower:
+            col_variante = c
+        if "sku" == c_lower:
+            col_sku = c
+
+    resultado = {"col_nom_prod": col_nom_prod, "col_variante": col_variante, "col_sku": col_sku}
+
+    if col_nom_prod:
+        # Para detectar duplicados se usa la combinación nombre + variante + sku (si existen)
+        columnas_para_duplicados = [col_nom_prod]
+        if col_variante:
+            columnas_para_duplicados.append(col_variante)
         if col_sku:
-            st.write("### Productos con SKU duplicados en catálogo:")
-            dup_skus = df_catalogo[df_catalogo.duplicated(subset=[col_sku], keep=False)]
-            st.dataframe(dup_skus.sort_values(col_sku), use_container_width=True)
-
-        # Productos vendidos en CSV no encontrados en catálogo por nombre (normalizados)
-        st.write("### Productos vendidos que NO están en el catálogo (por nombre):")
-        nombres_catalogo = df_catalogo[col_nom_prod].dropna().str.strip().str.lower().unique()
-        nombres_ventas = df[col_producto].dropna().str.strip().str.lower().unique()
-        productos_no_catalogo = sorted(set(nombres_ventas) - set(nombres_catalogo))
-        if productos_no_catalogo:
-            st.dataframe(pd.DataFrame(productos_no_catalogo, columns=["Producto vendido no registrado"]))
+            columnas_para_duplicados.append(col_sku)
+
+        dup_nombres = _df_catalogo[_df_catalogo.duplicated(subset=columnas_para_duplicados, keep=False)]
+        resultado["dup_nombres"] = dup_nombres.sort_values(columnas_para_duplicados)
+
+    if col_sku:
+        dup_skus = _df_catalogo[_df_catalogo.duplicated(subset=[col_sku], keep=False)]
+        resultado["dup_skus"] = dup_skus.sort_values(col_sku)
+
+    # Cruce de productos vendidos con el catálogo: exacto (nombre normalizado o SKU),
+    # probable (similitud de trigramas) o no registrado
+    col_sku_ventas = columnas_clave["sku"]
+    col_completo = claves_producto.COL_PRODUCTO_COMPLETO
+    if col_nom_prod and col_completo in _df_catalogo.columns:
+        indice = coincidencias.IndiceCatalogo(_df_catalogo[col_completo], _df_catalogo[col_sku] if col_sku else None)
+        vendidos = _df[[col_completo] + ([col_sku_ventas] if col_sku_ventas else [])].drop_duplicates(col_completo)
+        cruce = indice.resolver(
+            vendidos[col_completo].astype(object),
+            vendidos[col_sku_ventas] if col_sku_ventas and col_sku else None,
+        )
+        resultado["cruce_catalogo"] = cruce.sort_values(["Estado", "Similitud", "Producto vendido"], ascending=[True, False, True]).reset_index(drop=True)
+
+        # Casi duplicados: el mismo producto ingresado dos veces con otra escritura
+        grupos = indice.casi_duplicados()
+        columnas = [c for c in [col_nom_prod, col_variante, col_sku] if c]
+        casi_duplicados = _df_catalogo.iloc[grupos["fila"].to_numpy()][columnas].reset_index(drop=True)
+        casi_duplicados.insert(0, "Grupo", grupos["Grupo"].to_numpy())
+        casi_duplicados["Similitud"] = grupos["Similitud"].to_numpy()
+        resultado["casi_duplicados"] = casi_duplicados
+
+    # Productos vendidos con SKU no encontrados en catálogo
+    if col_sku:
+        resultado["col_sku_ventas"] = col_sku_ventas
+        if col_sku_ventas:
+            skus_catalogo = _df_catalogo[col_sku].dropna().astype(str).str.strip().unique()
+            skus_ventas = _df[col_sku_ventas].dropna().astype(str).str.strip().unique()
+            resultado["skus_no_catalogo"] = sorted(set(skus_ventas) - set(skus_catalogo))
+
+    return resultado
+
+
+with tab4, rendimiento.etapa("pestaña 4"):
+    if tab4.open:
+        st.markdown("## 🧾 Productos Repetidos y No Registrados")
+
+        # El catálogo solo se descarga cuando se abre esta pestaña
+        df_catalogo = pd.DataFrame()
+        if catalogo_url:
+            df_catalogo = cargar_catalogo_excel(catalogo_url)
+
+        if df_catalogo.empty:
+            st.warning("No se pudo cargar el catálogo. Por favor revisa la URL en report.json")
         else:
-            st.success("Todos los productos vendidos están registrados en el catálogo.")
+            # La versión del almacén cambia cuando el refresco en segundo plano reemplaza el catálogo
+            version_catalogo = (catalogo_url, almacen_datasets.version(("catalogo", catalogo_url)))
+            datos_catalogo = calcular_catalogo(version_datos, version_catalogo, df_catalogo, df)
+            col_nom_prod = datos_catalogo["col_nom_prod"]
+            col_sku = datos_catalogo["col_sku"]
+
+            st.write(f"Columna nombre producto detectada en catálogo: {col_nom_prod}")
+            st.write(f"Columna variante detectada en catálogo: {datos_catalogo['col_variante']}")
+            st.write(f"Columna SKU detectada en catálogo: {col_sku}")
+
+            if not col_nom_prod:
+                st.error("No se encontró columna 'Nombre del Producto' en el catálogo.")
+            else:
+                st.write("### Productos con nombres duplicados en catálogo (mismo nombre + variante + SKU):")
+                tablas.tabla_paginada(datos_catalogo["dup_nombres"], "catalogo_dup_nombres")
 
-        # Productos vendidos con SKU no encontrados en catálogo
-        if col_sku:
-            col_sku_ventas = encontrar_col("sku")
-            if col_sku_ventas:
-                st.write("### Productos vendidos con SKU que NO están en el catálogo:")
-                skus_catalogo = df_catalogo[col_sku].dropna().astype(str).str.strip().unique()
-                skus_ventas = df[col_sku_ventas].dropna().astype(str).str.strip().unique()
-                skus_no_catalogo = sorted(set(skus_ventas) - set(skus_catalogo))
-                if skus_no_catalogo:
-                    st.dataframe(pd.DataFrame(skus_no_catalogo, columns=["SKU vendido no registrado"]))
+            if col_sku:
+                st.write("### Productos con SKU duplicados en catálogo:")
+                tablas.tabla_paginada(datos_catalogo["dup_skus"], "catalogo_dup_skus")
+
+            # Mismo producto ingresado con nombres o formatos escritos distinto
+            casi_duplicados = datos_catalogo.get("casi_duplicados")
+            if casi_duplicados is not None:
+                st.write("### Posibles duplicados en catálogo (nombres parecidos):")
+                if casi_duplicados.empty:
+                    st.success("No se encontraron productos con nombres casi iguales.")
                 else:
-                    st.success("Todos los SKUs vendidos están registrados en el catálogo.")
-
-
-
-# --- NUEVA PESTAÑA: Cuadratura de Stock ---
-with tab5:
-    st.markdown("## 📦 Cuadratura de Stock")
-
-    url_stock = "https://raw.githubusercontent.com/Adolfoignaciodg/Botillera-/main/stock.xlsx"
-
-    @st.cache_data
-    def cargar_stock(url):
-        try:
-            df_stock = pd.read_excel(url)
-            df_stock.columns = df_stock.columns.str.strip()
-            return df_stock
-        except Exception as e:
-            st.error(f"Error cargando archivo de stock: {e}")
-            return pd.DataFrame()
-
-    df_stock = cargar_stock(url_stock)
-
-    if df_stock.empty:
-        st.warning("No se pudo cargar el archivo de stock.")
-    else:
-        categorias_clave = [
-            'DESTILADOS', 'AGUAS. JUGOS Y TE HELADO', 'BEBIDAS',
-            'CERVEZAS', 'VINOS', 'TABAQUERIA', 'LICORES',
-            'ENERGETICAS E ISOTONICAS', 'ESPUMANTES'
-        ]
-
-        col_categoria_stock = next((c for c in df_stock.columns if "tipo de producto" in c.lower()), None)
-        if not col_categoria_stock:
-            st.error("No se encontró columna de categoría en archivo de stock.")
-            st.stop()
-
-        df_stock_filtrado = df_stock[df_stock[col_categoria_stock].str.upper().isin(categorias_clave)]
-
-        categorias_disponibles = sorted(df_stock_filtrado[col_categoria_stock].dropna().unique())
-        seleccion_cat_stock = st.selectbox("Seleccionar Categoría", ["Todas"] + categorias_disponibles)
+                    st.caption(f"{casi_duplicados['Grupo'].max()} grupos, {len(casi_duplicados)} productos")
+                    tablas.tabla_paginada(casi_duplicados, "catalogo_casi_duplicados", formatos={"Similitud": "porcentaje"})
+
+            # Productos vendidos contra el catálogo (nombres normalizados: tildes, espacios, unidades)
+            cruce = datos_catalogo.get("cruce_catalogo")
+            if cruce is not None:
+                st.write("### Productos vendidos vs catálogo:")
+                tablas.descargas("cruce_catalogo", "productos_vendidos_vs_catalogo", functools.partial(exportar.bloques_frame, cruce),
+                                 formatos={"Similitud": "porcentaje"}, formatos_excel=formatos_excel)
+                estados = cruce["Estado"].value_counts()
+                c1, c2, c3 = st.columns(3)
+                c1.metric("Exactos", int(estados.get(coincidencias.EXACTO, 0)))
+                c2.metric("Probables", int(estados.get(coincidencias.PROBABLE, 0)))
+                c3.metric("No registrados", int(estados.get(coincidencias.NO_REGISTRADO, 0)))
+
+                probables = cruce[cruce["Estado"] == coincidencias.PROBABLE]
+                if not probables.empty:
+                    st.write("#### Coincidencias probables (revisar nombre en catálogo):")
+                    tablas.tabla_paginada(probables, "catalogo_probables", formatos={"Similitud": "porcentaje"})
+
+                st.write("#### Productos vendidos que NO están en el catálogo:")
+                no_registrados = cruce[cruce["Estado"] == coincidencias.NO_REGISTRADO]
+                if not no_registrados.empty:
+                    tablas.tabla_paginada(no_registrados, "catalogo_no_registrados", formatos={"Similitud": "porcentaje"})
+                else:
+                    st.success("Todos los productos vendidos están registrados en el catálogo.")
 
-        if seleccion_cat_stock != "Todas":
-            df_stock_filtrado = df_stock_filtrado[df_stock_filtrado[col_categoria_stock] == seleccion_cat_stock]
+            # Productos vendidos con SKU no encontrados en catálogo
+            if col_sku:
+                if datos_catalogo.get("col_sku_ventas"):
+                    st.write("### Productos vendidos con SKU que NO están en el catálogo:")
+                    skus_no_catalogo = datos_catalogo["skus_no_catalogo"]
+                    if skus_no_catalogo:
+                        tablas.tabla_paginada(pd.DataFrame(skus_no_catalogo, columns=["SKU vendido no registrado"]), "catalogo_skus_no_registrados", use_container_width=False)
+                    else:
+                        st.success("Todos los SKUs vendidos están registrados en el catálogo.")
 
-        df_stock_filtrado['Producto Completo'] = df_stock_filtrado.apply(
-            lambda row: row['Producto'] if pd.isna(row['Variante']) or str(row['Variante']).strip() == ""
-            else f"{row['Producto']} ({str(row['Variante']).strip()})",
-            axis=1
-        )
-        df_stock_filtrado['Producto Completo'] = df_stock_filtrado['Producto Completo'].str.upper().str.strip()
 
-        col_producto = '+Producto / Servicio'
-        col_variante = '+Variante'
-        col_cantidad = 'Cantidad'
-        col_fecha = '+Fecha Documento'
 
-        df[col_fecha] = pd.to_datetime(df[col_fecha], errors='coerce')
+# Rango de meses/años presentes en las ventas (para "Ventas acumuladas desde mes")
+@rendimiento.medir("pestaña 5 · meses")
+@memo.memoizar(max_entradas=2)
+def calcular_rango_meses(version, col_fecha, _df_cubo):
+    return informes.rango_meses(_df_cubo, col_fecha)
 
-        meses_es = {
-            1: "enero", 2: "febrero", 3: "marzo", 4: "abril",
-            5: "mayo", 6: "junio", 7: "julio", 8: "agosto",
-            9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre"
-        }
 
-        meses_en_df = sorted(df[col_fecha].dt.month.dropna().unique())
-        meses_nombre = [meses_es[m].capitalize() for m in meses_en_df]
+@rendimiento.medir("pestaña 5 · cálculo")
+@memo.memoizar(max_entradas=8)
+def calcular_cuadratura(version, version_stock, version_packs, col_categoria_stock, col_fecha, seleccion_cat_stock, mes_desde_num, _df_stock, _df_cubo, _mapeo_packs):
+    resultado = informes.cuadratura_stock(_df_stock, _df_cubo, col_categoria_stock, col_fecha, seleccion_cat_stock, mes_desde_num, _mapeo_packs)
+    titulo_col_ventas = resultado["titulo_col_ventas"]
+    df_mostrar = resultado["detalle"]
+    columnas_mostrar = list(df_mostrar.columns)
 
-        seleccion_mes = st.selectbox("Ventas acumuladas desde mes:", ["Enero"] + meses_nombre)
+    # Columnas numéricas: el formato (entero / moneda) se aplica solo a la página visible
+    columnas_formato_entero = [c for c in columnas_mostrar if any(k in c.lower() for k in ["stock", "cantidad", "por recibir", "vendidas"])]
+    columnas_formato_moneda = [c for c in columnas_mostrar if any(k in c.lower() for k in ["precio", "costo", "margen", "valor"])]
+    formatos = {c: "entero" for c in columnas_formato_entero}
+    formatos.update({c: "moneda_decimal" for c in columnas_formato_moneda})
 
-        inv_meses_es = {v.lower(): k for k, v in meses_es.items()}
-        mes_desde_num = inv_meses_es.get(seleccion_mes.lower(), 1)
+    # PACK sin composición conocida: disponibilidad NaN, se muestra como "No aplica"
+    formatos[cuadratura.COL_DISPONIBLE] = lambda x: "No aplica" if pd.isna(x) else tablas.FORMATOS["entero"](x)
 
-        mes_max_num = int(df[col_fecha].dt.month.max())
-        mes_hasta_str = meses_es.get(mes_max_num, "mes desconocido")
+    # Formato moneda para valores con "valor" o "costo" en el nombre
+    resumen_stock = resultado["resumen"]
+    formatos_resumen = {}
+    if resumen_stock is not None:
+        for col in resumen_stock.columns:
+            if col != col_categoria_stock:
+                formatos_resumen[col] = "moneda" if "valor" in col.lower() or "costo" in col.lower() else "entero"
 
-        from pandas.tseries.offsets import MonthBegin
+    return {
+        "titulo_col_ventas": titulo_col_ventas,
+        "df_mostrar": df_mostrar,
+        "formatos": formatos,
+        "columnas_formato_entero": columnas_formato_entero,
+        "resumen_stock": resumen_stock,
+        "formatos_resumen": formatos_resumen,
+    }
 
-        anio_min = int(df[col_fecha].dt.year.min())
-        anio_max = int(df[col_fecha].dt.year.max())
 
-        fecha_inicio = pd.Timestamp(year=anio_min, month=mes_desde_num, day=1)
-        fecha_fin = (pd.Timestamp(year=anio_max, month=mes_max_num, day=1) + MonthBegin(1)) - pd.Timedelta(days=1)
+# --- NUEVA PESTAÑA: Cuadratura de Stock ---
+with tab5, rendimiento.etapa("pestaña 5"):
+    if tab5.open:
+        st.markdown("## 📦 Cuadratura de Stock")
 
-        ventas_rango = df[(df[col_fecha] >= fecha_inicio) & (df[col_fecha] <= fecha_fin)].copy()
+        df_stock = cargar_stock(url_stock) if url_stock else pd.DataFrame()
 
-        if col_variante in ventas_rango.columns:
-            ventas_rango['Producto Completo'] = ventas_rango.apply(
-                lambda row: row[col_producto] if pd.isna(row[col_variante]) or str(row[col_variante]).strip() == ""
-                else f"{row[col_producto]} ({str(row[col_variante]).strip()})",
-                axis=1
-            )
+        rango_meses = calcular_rango_meses(version_datos, col_fecha, df_cubo)
+        if df_stock.empty:
+            st.warning("No se pudo cargar el archivo de stock.")
+        elif rango_meses is None:
+            st.warning(f"Las ventas no tienen fechas válidas en '{col_fecha}': no se puede calcular la cuadratura de stock.")
         else:
-            ventas_rango['Producto Completo'] = ventas_rango[col_producto]
+            col_categoria_stock = informes.columna_categoria_stock(df_stock)
+            if not col_categoria_stock:
+                st.error("No se encontró columna de categoría en archivo de stock.")
+                detener()
 
-        ventas_rango['Producto Completo'] = ventas_rango['Producto Completo'].str.upper().str.strip()
+            categorias_disponibles = informes.categorias_stock(df_stock, col_categoria_stock)
+            seleccion_cat_stock = st.selectbox("Seleccionar Categoría", ["Todas"] + categorias_disponibles)
 
-        ventas_por_producto = ventas_rango.groupby('Producto Completo')[col_cantidad].sum().reset_index()
+            meses_nombre = [cuadratura.MESES[m].capitalize() for m in rango_meses["meses"]]
 
-        titulo_col_ventas = f"Vendidas desde {meses_es[mes_desde_num]} hasta {mes_hasta_str}"
-        ventas_por_producto.columns = ['Producto Completo', titulo_col_ventas]
-
-        df_stock_cuadrado = pd.merge(
-            df_stock_filtrado,
-            ventas_por_producto,
-            on='Producto Completo',
-            how='left'
-        )
+            seleccion_mes = st.selectbox("Ventas acumuladas desde mes:", ["Enero"] + meses_nombre)
 
-        df_stock_cuadrado[titulo_col_ventas] = df_stock_cuadrado[titulo_col_ventas].fillna(0)
+            inv_meses = {v.lower(): k for k, v in cuadratura.MESES.items()}
+            mes_desde_num = inv_meses.get(seleccion_mes.lower(), 1)
 
-        # --- LIMPieza y conversión antes de calcular valor en stock ---
-        def limpiar_a_numero_positivo(valor):
-            if pd.isna(valor):
-                return 0
-            if isinstance(valor, (int, float)):
-                return valor
-            try:
-                val_str = str(valor).replace("$", "").replace(".", "").replace(",", ".").strip()
-                return float(val_str)
-            except:
-                return 0
+            mapeo_packs = cargar_mapeo_packs(catalogo_url) if catalogo_url else packs.vacio()
+            if len(mapeo_packs):
+                st.caption(f"Packs: {mapeo_packs[packs.COL_PACK].nunique()} packs con {len(mapeo_packs)} componentes; "
+                           "sus ventas se descuentan del stock de cada componente. Los packs con algún componente "
+                           "fuera del stock quedan sin disponibilidad calculada.")
 
-        df_stock_cuadrado["Costo Neto Prom. Unitario"] = df_stock_cuadrado["Costo Neto Prom. Unitario"].apply(limpiar_a_numero_positivo)
-        df_stock_cuadrado["Stock"] = pd.to_numeric(df_stock_cuadrado["Stock"], errors='coerce').fillna(0)
+            datos_stock = calcular_cuadratura(
+                version_datos,
+                (url_stock, almacen_datasets.version(("stock", url_stock))),
+                (catalogo_url, almacen_datasets.version(("packs", catalogo_url))),
+                col_categoria_stock, col_fecha, seleccion_cat_stock, mes_desde_num, df_stock, df_cubo, mapeo_packs
+            )
+            titulo_col_ventas = datos_stock["titulo_col_ventas"]
+
+            def destacar_stock(val):
+                try:
+                    val_float = float(val)
+                    if val_float == 0:
+                        return 'background-color: #ff4d4d; color: white; font-weight: bold'
+                    elif val_float < 5:
+                        return 'background-color: #ffcc00; font-weight: bold'
+                except (TypeError, ValueError):
+                    pass
+                return ''
 
-        # --- NUEVO: Cálculo personalizado para "Cantidad Disponible" ---
-        def calcular_cantidad_disponible(row):
-            nombre_producto = row['Producto Completo']
-            if 'PACK' in nombre_producto:
-                return "No aplica"
+            st.markdown(f"### Tabla de stock + {titulo_col_ventas}")
+            datos_cuadratura = tablas.tabla_paginada(
+                datos_stock["df_mostrar"],
+                "cuadratura_stock",
+                formatos=datos_stock["formatos"],
+                estilos=[(destacar_stock, [c for c in datos_stock["columnas_formato_entero"] if "stock" in c.lower()])],
+            )
+            tablas.descargas("cuadratura_stock", "cuadratura_stock", functools.partial(exportar.bloques_frame, datos_cuadratura),
+                             formatos=datos_stock["formatos"], formatos_excel=formatos_excel)
+
+            if datos_stock["resumen_stock"] is not None:
+                st.markdown("### Resumen por Categoría")
+                tablas.tabla_paginada(datos_stock["resumen_stock"], "cuadratura_resumen", formatos=datos_stock["formatos_resumen"])
+                tablas.descargas("cuadratura_resumen", "cuadratura_resumen_categoria",
+                                 functools.partial(exportar.bloques_frame, datos_stock["resumen_stock"]),
+                                 formatos=datos_stock["formatos_resumen"], formatos_excel=formatos_excel)
             else:
-                disponible = row["Stock"] - row[titulo_col_ventas]
-                return max(disponible, 0)
+                st.warning("No se encontraron columnas esperadas en archivo de stock para mostrar.")
 
-        df_stock_cuadrado["Cantidad Disponible"] = df_stock_cuadrado.apply(calcular_cantidad_disponible, axis=1)
 
-        df_stock_cuadrado["Valor en Stock (Costo Total)"] = (
-            df_stock_cuadrado["Stock"] * df_stock_cuadrado["Costo Neto Prom. Unitario"]
+# --- Panel de depuración: aciertos/fallos de la caché de cálculos ---
+with st.sidebar.expander("🐞 Caché de cálculos"):
+    estadisticas_memo = pd.DataFrame(memo.estadisticas())
+    if estadisticas_memo.empty:
+        st.caption("Sin cálculos memoizados en esta sesión.")
+    else:
+        st.dataframe(
+            estadisticas_memo,
+            column_config={"Tasa de aciertos": st.column_config.ProgressColumn(min_value=0.0, max_value=1.0, format="percent")},
+            hide_index=True,
+            use_container_width=True,
         )
-
-        df_stock_cuadrado["Alerta"] = df_stock_cuadrado.apply(lambda row: (
-            "❗ Sin ventas" if row[titulo_col_ventas] == 0 else
-            "⚠️ Bajo Stock" if row[titulo_col_ventas] >= 20 and row.get("Stock", 0) < 5 else ""
-        ), axis=1)
-
-        columnas_mostrar = [
-            "Alerta",
-            "Producto Completo",
-            "Stock",
-            titulo_col_ventas,
-            "Cantidad por Despachar",
-            "Cantidad Disponible",
-            "Por Recibir",
-            "Precio Venta Bruto",
-            "Margen Unitario",
-            #"Margen x Vendidas periodo",
-            "Costo Neto Prom. Unitario",
-            #"Valor en Stock (Costo Total)",  # <--- NO mostrar en tabla detallada
-            "Marca"
-        ]
-        columnas_mostrar = [c for c in columnas_mostrar if c in df_stock_cuadrado.columns]
-
-        def formato_visual(val, tipo="entero"):
-            try:
-                val = float(val)
-                if tipo == "moneda":
-                    return f"${val:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                elif tipo == "entero":
-                    return f"{int(val):,}".replace(",", ".")
-                else:
-                    return val
-            except:
-                return val
-
-        columnas_formato_entero = [c for c in columnas_mostrar if any(k in c.lower() for k in ["stock", "cantidad", "por recibir", "vendidas"])]
-        columnas_formato_moneda = [c for c in columnas_mostrar if any(k in c.lower() for k in ["precio", "costo", "margen", "valor"])]
-
-        df_mostrar = df_stock_cuadrado[columnas_mostrar].copy()
-
-        for col in columnas_formato_entero:
-            if col in df_mostrar.columns:
-                df_mostrar[col] = df_mostrar[col].apply(lambda x: formato_visual(x, tipo="entero"))
-
-        for col in columnas_formato_moneda:
-            if col in df_mostrar.columns:
-                df_mostrar[col] = df_mostrar[col].apply(lambda x: formato_visual(x, tipo="moneda"))
-
-        df_mostrar["__orden_alerta__"] = df_stock_cuadrado["Alerta"].apply(lambda x: 0 if "❗" in x else 1 if "⚠️" in x else 2)
-        df_mostrar = df_mostrar.sort_values("__orden_alerta__").drop(columns="__orden_alerta__")
-
-        def destacar_stock(val):
-            try:
-                val_float = float(str(val).replace(".", "").replace("$", ""))
-                if val_float == 0:
-                    return 'background-color: #ff4d4d; color: white; font-weight: bold'
-                elif val_float < 5:
-                    return 'background-color: #ffcc00; font-weight: bold'
-            except:
-                return ''
-
-        st.markdown(f"### Tabla de stock + {titulo_col_ventas}")
-        styled_df = df_mostrar.style.applymap(
-            destacar_stock,
-            subset=[c for c in columnas_formato_entero if "stock" in c.lower()]
+        if st.button("Limpiar caché de cálculos"):
+            st.session_state.pop("_memo_calculos", None)
+            st.rerun()
+
+# --- Panel de depuración: datasets en memoria (compartidos por todas las sesiones) ---
+with st.sidebar.expander("🗄️ Datasets en memoria"):
+    st.caption(
+        f"{almacen_datasets.memoria_usada() / 1024 ** 2:.1f} de {almacen_datasets.memoria_max / 1024 ** 2:.0f} MB · "
+        f"{almacen_datasets.aciertos} aciertos, {almacen_datasets.fallos} cargas, {almacen_datasets.desalojos} desalojos"
+    )
+    st.dataframe(
+        pd.DataFrame(almacen_datasets.estadisticas()),
+        column_config={"MB": st.column_config.NumberColumn(format="%.1f"), "Edad (s)": st.column_config.NumberColumn(format="%.0f")},
+        hide_index=True,
+        use_container_width=True,
+    )
+    if st.checkbox("Memoria por columna (ventas)", key="memoria_por_columna"):
+        st.dataframe(
+            registro.memoria_por_columna(df),
+            column_config={"KB": st.column_config.NumberColumn(format="%.1f")},
+            hide_index=True,
+            use_container_width=True,
         )
-        st.dataframe(styled_df, use_container_width=True)
-
-        # Excluir "Cantidad Disponible" del resumen porque tiene valores mixtos (texto + números)
-        palabras_clave = ['stock', 'cantidad por despachar', 'por recibir', 'valor en stock (costo total)']
-        columnas_resumen = [c for c in df_stock_cuadrado.columns if any(p in c.lower() for p in palabras_clave)]
-
-        if columnas_resumen:
-            resumen_stock = df_stock_cuadrado.groupby(col_categoria_stock).agg(
-                {c: 'sum' for c in columnas_resumen if c in df_stock_cuadrado.columns}
-            ).reset_index()
-
-            for col in resumen_stock.columns:
-                if col != col_categoria_stock:
-                    # Formato moneda para valores con "valor" o "costo" en el nombre
-                    if "valor" in col.lower() or "costo" in col.lower():
-                        resumen_stock[col] = resumen_stock[col].apply(lambda x: f"${x:,.0f}".replace(",", "."))
-                    else:
-                        resumen_stock[col] = resumen_stock[col].apply(lambda x: f"{int(x):,}".replace(",", "."))
-
-            st.markdown("### Resumen por Categoría")
-            st.dataframe(resumen_stock, use_container_width=True)
-        else:
-            st.warning("No se encontraron columnas esperadas en archivo de stock para mostrar.")
+    # Revisión en segundo plano de las fuentes (petición condicional; si cambiaron se recargan
+    # y reemplazan sin bloquear a nadie: mientras tanto se sigue mostrando la versión anterior)
+    st.caption(f"Refresco de fuentes cada {refrescador.intervalo / 60:.0f} min")
+    st.dataframe(
+        pd.DataFrame(refrescador.estado()),
+        column_config={
+            "Última revisión (s)": st.column_config.NumberColumn(format="%.0f"),
+            "Próxima (s)": st.column_config.NumberColumn(format="%.0f"),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+    if st.button("Revisar fuentes ahora", key="revisar_fuentes"):
+        refrescador.despertar()
+
+# --- Tiempos de carga de cada fuente (en paralelo: el arranque lo marca la más lenta) ---
+with st.sidebar.expander("⏱️ Carga de fuentes"):
+    pared, suma = cargador_fuentes.arranque()
+    st.caption(f"Última carga: {pared:.2f} s en paralelo ({suma:.2f} s si fueran en serie)")
+    st.dataframe(
+        pd.DataFrame(cargador_fuentes.estadisticas()),
+        column_config={
+            c: st.column_config.NumberColumn(format="%.2f")
+            for c in ["Descarga (s)", "Parseo (s)", "Total (s)", "MB"]
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+# --- Rendimiento de esta ejecución: tiempo y variación de memoria por etapa ---
+# "Propio" es el tiempo de la etapa sin sus etapas internas (en una pestaña: el render).
+rendimiento.terminar()
+with st.sidebar.expander("⏱️ Rendimiento"):
+    etapas_ejecucion, total_ejecucion = rendimiento.ultima()
+    st.caption(f"Esta ejecución: {total_ejecucion * 1000:.0f} ms" +
+               (f" · log en {opciones_rendimiento['log']}" if opciones_rendimiento["log"] else ""))
+    st.dataframe(
+        pd.DataFrame(etapas_ejecucion),
+        column_config={c: st.column_config.NumberColumn(format="%.1f") for c in ["ms", "Propio (ms)", "Δ MB"]},
+        hide_index=True,
+        use_container_width=True,
+    )
+    historial_rendimiento = rendimiento.historial()
+    if len(historial_rendimiento) > 1:
+        # Ejecuciones recientes del proceso (todas las sesiones): total y etapas principales
+        df_historial = pd.json_normalize(historial_rendimiento[-50:], sep=" · ")
+        df_historial["hora"] = pd.to_datetime(df_historial["hora"], unit="s")
+        df_historial.columns = [c.removeprefix("etapas · ") for c in df_historial.columns]
+        st.caption(f"Últimas {len(df_historial)} ejecuciones del proceso")
+        st.line_chart(df_historial, x="hora", y="total_ms", height=150)
+        st.dataframe(df_historial.iloc[::-1], hide_index=True, use_container_width=True)
@@ -0,0 +1,119 @@
+# Benchmark: análisis ABC sobre un cubo sintético (sucursal × tipo × producto × mes) con decenas
+# de miles de productos. "antes" repite el cálculo anterior de la app (groupby + sort + cumsum +
+# pd.cut, margen por unidad con apply fila a fila) una vez por métrica y por grupo; "después" es
+# clasificacion_abc.clasificar: todas las métricas, todos los grupos y el XYZ en una pasada.
+#
+#   python benchmarks/bench_abc.py [productos] [sucursales] [meses]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import clasificacion_abc  # noqa: E402
+
+METRICAS = ["Margen Neto", "Subtotal Neto", "Cantidad"]
+COL_PRODUCTO = "+Producto / Servicio"
+COL_TIPO = "+Tipo de Producto / Servicio"
+COL_SUCURSAL = "+Sucursal"
+COL_MES = "+Mes"
+
+
+def cubo_sintetico(productos, sucursales, meses, semilla=0):
+    rng = np.random.default_rng(semilla)
+    tipo_producto = rng.integers(0, 40, productos)
+    filas = productos * sucursales * meses
+    producto = np.tile(np.arange(productos), sucursales * meses)
+    # Ventas con cola larga (pocos productos concentran el total), como en una botillería
+    peso = rng.pareto(1.2, productos) + 0.01
+    cantidad = rng.poisson(peso[producto] * rng.uniform(0.2, 1.8, filas))
+    precio = rng.uniform(500, 20_000, productos)[producto]
+    subtotal = cantidad * precio
+    df = pd.DataFrame({
+        COL_SUCURSAL: pd.Categorical.from_codes(np.repeat(np.arange(sucursales), productos * meses),
+                                                [f"SUCURSAL {i}" for i in range(sucursales)]),
+        COL_TIPO: pd.Categorical.from_codes(tipo_producto[producto], [f"TIPO {i}" for i in range(40)]),
+        COL_PRODUCTO: pd.Categorical.from_codes(producto, [f"PRODUCTO {i}" for i in range(productos)]),
+        COL_MES: pd.Categorical.from_codes(np.tile(np.repeat(np.arange(meses), productos), sucursales),
+                                           [f"2024-{m + 1:02d}" for m in range(meses)]),
+        "Cantidad": cantidad.astype(float),
+        "Subtotal Neto": subtotal,
+        "Margen Neto": subtotal * rng.uniform(-0.05, 0.4, productos)[producto],
+    })
+    return df[df["Cantidad"] > 0].reset_index(drop=True)
+
+
+# Cálculo anterior de la app, para una métrica sobre un subconjunto del detalle
+def abc_antes(df, valor_col):
+    df_grouped = df.groupby(COL_PRODUCTO, observed=True).agg({valor_col: 'sum', 'Cantidad': 'sum'}).reset_index()
+    df_grouped = df_grouped.sort_values(by=valor_col, ascending=False)
+    df_grouped['Acumulado'] = df_grouped[valor_col].cumsum()
+    df_grouped['PorcAcum'] = df_grouped['Acumulado'] / df_grouped[valor_col].sum()
+    df_grouped['tipo de producto'] = pd.cut(df_grouped['PorcAcum'], bins=[0, 0.7, 0.9, 1], labels=['A', 'B', 'C'],
+                                            include_lowest=True)
+    if valor_col == "Margen Neto":
+        df_grouped['Margen por Unidad'] = df_grouped.apply(
+            lambda x: x[valor_col] / x['Cantidad'] if x['Cantidad'] > 0 else 0, axis=1
+        )
+    return df_grouped
+
+
+def antes(df, grupos):
+    resultados = {}
+    for metrica in METRICAS:
+        if grupos:
+            for clave, parte in df.groupby(grupos, observed=True):
+                resultados[(metrica, clave)] = abc_antes(parte, metrica)
+        else:
+            resultados[(metrica, None)] = abc_antes(df, metrica)
+    return resultados
+
+
+def despues(df, grupos):
+    return clasificacion_abc.clasificar(df, COL_PRODUCTO, METRICAS, grupos, col_periodo=COL_MES)
+
+
+def medir(funcion, *args, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+# Mismo porcentaje acumulado por producto (la clase puede diferir solo en empates de valor)
+def comparar(resultados_antes, tabla, grupos):
+    diferencia = 0.0
+    for (metrica, clave), df_antes in resultados_antes.items():
+        parte = tabla
+        if grupos:
+            clave = clave if isinstance(clave, tuple) else (clave,)
+            for g, v in zip(grupos, clave):
+                parte = parte[parte[g] == v]
+        porcentaje = parte.set_index(COL_PRODUCTO)[clasificacion_abc.col_porcentaje(metrica)]
+        esperado = df_antes.set_index(COL_PRODUCTO)["PorcAcum"]
+        # Con empates el orden entre iguales puede variar: se compara el valor de cada producto
+        sin_empates = ~df_antes[metrica].duplicated(keep=False).to_numpy()
+        productos = esperado.index[sin_empates]
+        diferencia = max(diferencia, float(np.nanmax(np.abs(porcentaje[productos] - esperado[productos]), initial=0)))
+    return diferencia
+
+
+if __name__ == "__main__":
+    productos = int(sys.argv[1]) if len(sys.argv) > 1 else 30_000
+    sucursales = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    meses = int(sys.argv[3]) if len(sys.argv) > 3 else 12
+    df = cubo_sintetico(productos, sucursales, meses)
+    print(f"cubo: {len(df):,} filas, {productos:,} productos, {sucursales} sucursales, {meses} meses; "
+          f"métricas: {', '.join(METRICAS)}")
+
+    for nombre, grupos in [("global", []), ("por tipo", [COL_TIPO]), ("por sucursal y tipo", [COL_SUCURSAL, COL_TIPO])]:
+        t_antes, resultados_antes = medir(antes, df, grupos, repeticiones=1)
+        t_despues, tabla = medir(despues, df, grupos)
+        print(f"{nombre:22s} antes {t_antes * 1000:9.1f} ms  después {t_despues * 1000:8.1f} ms (+XYZ)  "
+              f"x{t_antes / t_despues:6.1f}  filas {len(tabla):,}  "
+              f"máx. dif. % acumulado {comparar(resultados_antes, tabla, grupos):.1e}")
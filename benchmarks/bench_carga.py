@@ -0,0 +1,92 @@
+# Benchmark: arranque en frío con las fuentes cargadas en serie vs. en paralelo (carga.py):
+# solo hilos (como el dashboard) y hilos + pool de procesos (como generar_informes.py). Con LATENCIA
+# (segundos) los archivos se sirven por HTTP local con esa demora por pedido, como una descarga real.
+#
+#   LATENCIA=0.5 python benchmarks/bench_carga.py [catalogo.xlsx] [stock.xlsx] [ventas.csv]
+import functools
+import http.server
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import carga  # noqa: E402
+import ingesta  # noqa: E402
+
+RAIZ = os.path.join(os.path.dirname(__file__), "..")
+
+
+class ManejadorLento(http.server.SimpleHTTPRequestHandler):
+    latencia = 0.0
+
+    def send_head(self):
+        time.sleep(self.latencia)
+        return super().send_head()
+
+    def log_message(self, *args):
+        pass
+
+
+# Sirve "/" por HTTP local y devuelve las URLs de las rutas
+def servir(rutas, latencia):
+    ManejadorLento.latencia = latencia
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(ManejadorLento, directory="/"))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    return [f"{base}{os.path.abspath(r)}" if r else r for r in rutas]
+
+
+def en_serie(catalogo, stock, ventas):
+    inicio = time.perf_counter()
+    df_cat = carga.leer_catalogo(catalogo)
+    carga.leer_packs(catalogo, df_cat)
+    carga.leer_stock(stock)
+    if ventas:
+        ingesta.leer_csv_tipado(ingesta.leer_bytes(ventas))
+    return time.perf_counter() - inicio
+
+
+def en_paralelo(catalogo, stock, ventas, procesos):
+    cargador = carga.CargadorFuentes(procesos=procesos)
+    if procesos:
+        # Forkserver y procesos ya creados: se mide el parseo y no el arranque del pool
+        list(cargador.procesos.map(abs, range(procesos)))
+    inicio = time.perf_counter()
+
+    def catalogo_y_packs():
+        df_cat = cargador.excel("catalogo", catalogo, carga.leer_catalogo)
+        cargador.excel("packs", catalogo, carga.leer_packs, df_cat)
+
+    futuros = cargador.lanzar({"catalogo": catalogo_y_packs, "stock": lambda: cargador.excel("stock", stock, carga.leer_stock)})
+    if ventas:
+        inicio_ventas = time.perf_counter()
+        ingesta.leer_csv_tipado(ingesta.leer_bytes(ventas))
+        cargador.registrar_tiempo("ventas", inicio_ventas)
+    for futuro in futuros.values():
+        futuro.result()
+    total = time.perf_counter() - inicio
+    cargador.cerrar()
+    return total, cargador
+
+
+if __name__ == "__main__":
+    catalogo = sys.argv[1] if len(sys.argv) > 1 else os.path.join(RAIZ, "catalogo.xlsx")
+    stock = sys.argv[2] if len(sys.argv) > 2 else os.path.join(RAIZ, "stock.xlsx")
+    ventas = sys.argv[3] if len(sys.argv) > 3 else None
+    latencia = float(os.environ.get("LATENCIA", 0))
+    if latencia:
+        catalogo, stock, ventas = servir([catalogo, stock, ventas], latencia)
+
+    t_serie = en_serie(catalogo, stock, ventas)
+    t_hilos, _ = en_paralelo(catalogo, stock, ventas, procesos=0)
+    t_procesos, cargador = en_paralelo(catalogo, stock, ventas, procesos=2)
+
+    print(f"{os.cpu_count()} CPU, latencia por descarga {latencia:.2f} s")
+    print(f"en serie:                 {t_serie:6.2f} s")
+    print(f"en paralelo (hilos):      {t_hilos:6.2f} s")
+    print(f"en paralelo (+ procesos): {t_procesos:6.2f} s")
+    print("tiempos por fuente (+ procesos):")
+    for t in cargador.estadisticas():
+        print(f"  {t['Fuente']:10s} total {t['Total (s)']:6.2f} s  (parseo {t['Parseo (s)']:6.2f} s)")
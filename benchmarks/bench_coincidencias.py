@@ -0,0 +1,102 @@
+# Benchmark: cruce de productos vendidos contra el catálogo (coincidencias.py) sobre nombres
+# sintéticos con variaciones típicas (tildes, espacios, "1,5 LT" vs "1.5L", letras cambiadas),
+# comparado con la búsqueda por fuerza bruta (Dice contra todo el catálogo) en una muestra
+#
+#   python benchmarks/bench_coincidencias.py [productos_catalogo] [nombres_vendidos]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import coincidencias  # noqa: E402
+
+MARCAS = ["CRISTAL", "ESCUDO", "KUNSTMANN", "AUSTRAL", "CORONA", "HEINEKEN", "MISTRAL", "CAPEL",
+          "ALTO DEL CARMEN", "CONCHA Y TORO", "SANTA RITA", "GATO", "COCA COLA", "FANTA", "SPRITE",
+          "ANDINA", "CACHANTUN", "RED BULL", "MONSTER", "BACARDI", "HAVANA CLUB", "JACK DANIELS"]
+TIPOS = ["CERVEZA", "PISCO", "VINO", "BEBIDA", "NÉCTAR", "AGUA MINERAL", "ENERGÉTICA", "RON", "WHISKY"]
+DETALLES = ["LATA", "RETORNABLE", "DESECHABLE", "SIN AZÚCAR", "ZERO", "RESERVA", "MERLOT", "CABERNET",
+            "CARMÉNÈRE", "TORONTEL", "DAMASCO", "DURAZNO", "LIGHT", "SIN GAS", "CON GAS"]
+FORMATOS = ["350 CC", "470 CC", "500 CC", "710 CC", "750 CC", "1 L", "1,5 LT", "2 LTS", "3 L", "1000 CC"]
+
+
+def catalogo_sintetico(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    nombres = set()
+    while len(nombres) < n:
+        partes = [TIPOS[rng.integers(len(TIPOS))], MARCAS[rng.integers(len(MARCAS))],
+                  DETALLES[rng.integers(len(DETALLES))], f"{rng.integers(1, 900)}" if rng.random() < 0.6 else "",
+                  FORMATOS[rng.integers(len(FORMATOS))]]
+        nombres.add(" ".join(p for p in partes if p))
+    return np.array(sorted(nombres), dtype=object)
+
+
+# Variaciones de escritura de un nombre del catálogo (agregar_palabra: a veces suma una palabra)
+def variar(nombre, rng, agregar_palabra=True):
+    cambio = rng.integers(0, 5)
+    if cambio == 0:
+        return nombre.lower().replace("É", "e").replace(" CC", "CC")
+    if cambio == 1:
+        return "  ".join(nombre.split()).replace("1,5 LT", "1.5L").replace(" LTS", " L")
+    if cambio == 2 and len(nombre) > 8:
+        i = rng.integers(1, len(nombre) - 1)
+        return nombre[:i] + nombre[i + 1:]
+    if cambio == 3:
+        palabras = nombre.split()
+        return " ".join(palabras[1:] + palabras[:1])
+    return nombre + " X" if agregar_palabra and rng.random() < 0.5 else nombre
+
+
+def fuerza_bruta(indice, normalizado):
+    grams = coincidencias.ngramas(normalizado)
+    mejor, puntaje = -1, 0.0
+    for fila, otro in enumerate(indice.normalizados):
+        otros = coincidencias.ngramas(otro)
+        dice = 2.0 * len(grams & otros) / (len(grams) + len(otros)) if grams or otros else 0.0
+        if dice > puntaje:
+            mejor, puntaje = fila, dice
+    return mejor, puntaje
+
+
+if __name__ == "__main__":
+    n_catalogo = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_vendidos = int(sys.argv[2]) if len(sys.argv) > 2 else 30_000
+    rng = np.random.default_rng(1)
+    catalogo = catalogo_sintetico(n_catalogo)
+    origen = rng.integers(0, len(catalogo), n_vendidos)
+    # 10% de los vendidos no existen en el catálogo
+    vendidos = np.array([variar(catalogo[i], rng) for i in origen], dtype=object)
+    nuevos = rng.random(n_vendidos) < 0.1
+    vendidos[nuevos] = [f"PRODUCTO NUEVO {i} {FORMATOS[i % len(FORMATOS)]}" for i in range(int(nuevos.sum()))]
+
+    inicio = time.perf_counter()
+    indice = coincidencias.IndiceCatalogo(catalogo)
+    t_indice = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    cruce = indice.resolver(vendidos)
+    t_cruce = time.perf_counter() - inicio
+
+    encontrado = cruce["Estado"] != coincidencias.NO_REGISTRADO
+    correcto = (cruce["Candidato en catálogo"].to_numpy() == catalogo[origen]) & ~nuevos
+    estados = cruce["Estado"].value_counts()
+
+    # Fuerza bruta sobre una muestra de nombres no exactos, extrapolada
+    pendientes = np.flatnonzero((cruce["Estado"] != coincidencias.EXACTO).to_numpy())
+    muestra = rng.choice(pendientes, min(50, len(pendientes)), replace=False) if len(pendientes) else []
+    inicio = time.perf_counter()
+    iguales = 0
+    for i in muestra:
+        normalizado = coincidencias.normalizar(vendidos[i])
+        _, puntaje_bruto = fuerza_bruta(indice, normalizado)
+        iguales += abs(puntaje_bruto - indice.mejor_candidato(normalizado)[1]) < 1e-9
+    t_bruta = (time.perf_counter() - inicio) / max(len(muestra), 1) * len(pendientes)
+
+    print(f"{n_catalogo:,} productos de catálogo, {n_vendidos:,} nombres vendidos ({len(pendientes):,} sin coincidencia exacta)")
+    print(f"índice:            {t_indice * 1000:8.1f} ms")
+    print(f"cruce:             {t_cruce * 1000:8.1f} ms  (fuerza bruta estimada: {t_bruta:.1f} s)")
+    print(f"estados:           " + ", ".join(f"{k}: {v:,}" for k, v in estados.items()))
+    print(f"recall existentes: {correcto.sum() / (~nuevos).sum():.1%}  (nuevos marcados como no registrados: {(~encontrado[nuevos]).mean():.1%})")
+    print(f"mismo puntaje que fuerza bruta: {iguales}/{len(muestra)}")
@@ -0,0 +1,111 @@
+# Benchmark: cuadratura de stock (pestaña 5) con apply fila a fila como el app.py original
+# vs el motor vectorizado de cuadratura.py, sobre un stock sintético
+#
+#   python benchmarks/bench_cuadratura.py [productos]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import cuadratura  # noqa: E402
+
+COL_CATEGORIA = "Tipo de Producto"
+COL_VENTAS = "Vendidas desde enero hasta diciembre"
+
+
+def datos_sinteticos(productos, semilla=0):
+    rng = np.random.default_rng(semilla)
+    nombres = np.array([f"PRODUCTO {i}" + (" PACK" if i % 17 == 0 else "") for i in range(productos)], dtype=object)
+    costos = rng.random(productos) * 20000
+    # Costos como vienen del Excel: mezcla de números y textos con formato CLP
+    costo_col = np.where(rng.random(productos) < 0.5, costos.round(2), None).astype(object)
+    textos = [f"${c:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for c in costos]
+    costo_col[costo_col == None] = np.array(textos, dtype=object)[costo_col == None]  # noqa: E711
+    costo_col[rng.random(productos) < 0.02] = np.nan
+    df_stock = pd.DataFrame({
+        "Producto Completo": nombres,
+        COL_CATEGORIA: np.array(cuadratura.CATEGORIAS_CLAVE, dtype=object)[rng.integers(0, len(cuadratura.CATEGORIAS_CLAVE), productos)],
+        "Stock": rng.integers(-2, 50, productos),
+        "Costo Neto Prom. Unitario": costo_col,
+    })
+    vendidos = rng.random(productos) < 0.8
+    ventas = pd.DataFrame({
+        "Producto Completo": nombres[vendidos],
+        COL_VENTAS: rng.integers(1, 60, int(vendidos.sum())).astype(float),
+    })
+    return df_stock, ventas
+
+
+# Versión original de app.py (pestaña 5)
+def conciliar_original(df_stock, ventas_por_producto, titulo_col_ventas, col_categoria_stock):
+    df_stock_cuadrado = pd.merge(df_stock, ventas_por_producto, on='Producto Completo', how='left')
+    df_stock_cuadrado[titulo_col_ventas] = df_stock_cuadrado[titulo_col_ventas].fillna(0)
+
+    def limpiar_a_numero_positivo(valor):
+        if pd.isna(valor):
+            return 0
+        if isinstance(valor, (int, float)):
+            return valor
+        try:
+            val_str = str(valor).replace("$", "").replace(".", "").replace(",", ".").strip()
+            return float(val_str)
+        except Exception:
+            return 0
+
+    df_stock_cuadrado["Costo Neto Prom. Unitario"] = df_stock_cuadrado["Costo Neto Prom. Unitario"].apply(limpiar_a_numero_positivo)
+    df_stock_cuadrado["Stock"] = pd.to_numeric(df_stock_cuadrado["Stock"], errors='coerce').fillna(0)
+
+    def calcular_cantidad_disponible(row):
+        if 'PACK' in row['Producto Completo']:
+            return "No aplica"
+        return max(row["Stock"] - row[titulo_col_ventas], 0)
+
+    df_stock_cuadrado["Cantidad Disponible"] = df_stock_cuadrado.apply(calcular_cantidad_disponible, axis=1)
+    df_stock_cuadrado["Valor en Stock (Costo Total)"] = df_stock_cuadrado["Stock"] * df_stock_cuadrado["Costo Neto Prom. Unitario"]
+    df_stock_cuadrado["Alerta"] = df_stock_cuadrado.apply(lambda row: (
+        "❗ Sin ventas" if row[titulo_col_ventas] == 0 else
+        "⚠️ Bajo Stock" if row[titulo_col_ventas] >= 20 and row.get("Stock", 0) < 5 else ""
+    ), axis=1)
+    orden = df_stock_cuadrado["Alerta"].apply(lambda x: 0 if "❗" in x else 1 if "⚠️" in x else 2)
+    df_stock_cuadrado = df_stock_cuadrado.iloc[np.argsort(orden.to_numpy(), kind="stable")].reset_index(drop=True)
+
+    palabras_clave = ['stock', 'cantidad por despachar', 'por recibir', 'valor en stock (costo total)']
+    columnas_resumen = [c for c in df_stock_cuadrado.columns if any(p in c.lower() for p in palabras_clave)]
+    resumen = df_stock_cuadrado.groupby(col_categoria_stock).agg({c: 'sum' for c in columnas_resumen}).reset_index()
+    return df_stock_cuadrado, resumen
+
+
+def medir(funcion, *args, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+if __name__ == "__main__":
+    productos = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    df_stock, ventas = datos_sinteticos(productos)
+
+    t_original, (orig, resumen_orig) = medir(conciliar_original, df_stock, ventas, COL_VENTAS, COL_CATEGORIA)
+    t_vector, (nuevo, resumen_nuevo) = medir(cuadratura.conciliar, df_stock, ventas, COL_VENTAS, COL_CATEGORIA)
+
+    # Mismos resultados: "No aplica" del original equivale a PACK + NaN en el motor vectorizado
+    disponible_orig = pd.to_numeric(orig["Cantidad Disponible"].where(orig["Cantidad Disponible"] != "No aplica"))
+    assert (orig["Producto Completo"].to_numpy() == nuevo["Producto Completo"].to_numpy()).all()
+    assert ((orig["Cantidad Disponible"] == "No aplica").to_numpy() == nuevo[cuadratura.COL_PACK].to_numpy()).all()
+    np.testing.assert_allclose(disponible_orig.to_numpy(dtype=float), nuevo[cuadratura.COL_DISPONIBLE].to_numpy(), equal_nan=True)
+    for col in ["Stock", "Costo Neto Prom. Unitario", "Valor en Stock (Costo Total)"]:
+        np.testing.assert_allclose(orig[col].to_numpy(dtype=float), nuevo[col].to_numpy(dtype=float))
+    assert (orig["Alerta"].to_numpy() == nuevo["Alerta"].to_numpy()).all()
+    for col in resumen_orig.columns[1:]:
+        np.testing.assert_allclose(resumen_orig[col].to_numpy(dtype=float), resumen_nuevo[col].to_numpy(dtype=float))
+
+    print(f"{productos:,} productos de stock")
+    print(f"original (apply por fila): {t_original * 1000:8.1f} ms")
+    print(f"vectorizado:               {t_vector * 1000:8.1f} ms  ({t_original / t_vector:.0f}x)")
@@ -0,0 +1,47 @@
+# Benchmark: casi duplicados del catálogo (coincidencias.IndiceCatalogo.casi_duplicados) sobre un
+# catálogo sintético con productos ingresados dos veces con otra escritura (tildes, espacios,
+# unidades, una letra menos, palabras en otro orden)
+#
+#   python benchmarks/bench_duplicados.py [productos_catalogo] [duplicados]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import coincidencias  # noqa: E402
+from bench_coincidencias import catalogo_sintetico, variar  # noqa: E402
+
+if __name__ == "__main__":
+    n_catalogo = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_duplicados = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rng = np.random.default_rng(2)
+    base = catalogo_sintetico(n_catalogo - n_duplicados)
+    originales = rng.choice(len(base), n_duplicados, replace=False)
+    catalogo = np.concatenate([base, [variar(base[i], rng, agregar_palabra=False) for i in originales]])
+
+    inicio = time.perf_counter()
+    indice = coincidencias.IndiceCatalogo(catalogo)
+    t_indice = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    duplicados = indice.casi_duplicados()
+    t_duplicados = time.perf_counter() - inicio
+
+    grupo = np.zeros(len(catalogo), dtype=np.int64)
+    grupo[duplicados["fila"].to_numpy()] = duplicados["Grupo"].to_numpy()
+    copias = np.arange(len(base), len(catalogo))
+    encontrados = (grupo[copias] > 0) & (grupo[copias] == grupo[originales])
+    # Una copia que cambió un número ("470 CC" -> "47 CC") es otro formato: no debe agruparse
+    numeros = np.array([" ".join(sorted(coincidencias._RE_NUMERO.findall(t))) for t in indice.normalizados], dtype=object)
+    mismos_numeros = numeros[copias] == numeros[originales]
+    pares_totales = len(catalogo) * (len(catalogo) - 1) // 2
+
+    print(f"{len(catalogo):,} productos de catálogo ({n_duplicados:,} ingresados dos veces), {pares_totales:,} pares posibles")
+    print(f"índice:            {t_indice * 1000:8.1f} ms")
+    print(f"casi duplicados:   {t_duplicados * 1000:8.1f} ms  ({duplicados['Grupo'].max() if len(duplicados) else 0:,} grupos, {len(duplicados):,} productos)")
+    print(f"duplicados sembrados encontrados: {encontrados[mismos_numeros].mean():.1%} de {mismos_numeros.sum():,} con los mismos números"
+          f" ({encontrados[~mismos_numeros].mean() if (~mismos_numeros).any() else 0:.1%} de los {(~mismos_numeros).sum():,} con números cambiados)")
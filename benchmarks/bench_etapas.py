@@ -0,0 +1,245 @@
+# Benchmark por etapa del pipeline del dashboard sobre datos sintéticos (datos_sinteticos.py) o
+# sobre un directorio con ventas.csv, stock.xlsx, catalogo.xlsx y report.json: ingesta del CSV,
+# carga de los Excel, cubo, filtros, detalle diario (pestaña 1), ABC (2), detalle por día (3),
+# cruce con el catálogo (4) y cuadratura de stock (5). Cada etapa usa las mismas funciones que
+# app.py, se repite N veces y se informa la mediana, el mínimo y la memoria que retiene.
+# Con --json se guardan los tiempos y con --comparar se contrastan con una corrida anterior
+# (p. ej. de otra revisión), para medir un cambio de rendimiento offline.
+#
+#   python benchmarks/bench_etapas.py [FILAS | directorio] [--repeticiones N] [--etapas ingesta abc ...]
+#                                     [--semilla N] [--json resultados.json] [--comparar base.json]
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import carga  # noqa: E402
+import claves_producto  # noqa: E402
+import coincidencias  # noqa: E402
+import datos_sinteticos  # noqa: E402
+import filtros  # noqa: E402
+import generar_informes  # noqa: E402
+import informes  # noqa: E402
+import rendimiento  # noqa: E402
+import snapshot  # noqa: E402
+
+# Selecciones de filtros por repetición y días consultados en el detalle por día
+SELECCIONES = 50
+DIAS_DETALLE = 10
+PRODUCTOS_POR_PAGINA = 50
+
+
+# --- Etapas: cada una recibe el contexto con los resultados de las anteriores y devuelve el suyo ---
+def ingesta(ctx):
+    df, _ = snapshot.procesar_ventas(ctx["contenido"], ctx["config"])
+    return informes.preparar_ventas(df)
+
+
+def excel(ctx):
+    df_stock = carga.leer_stock(ctx["rutas"]["stock.xlsx"])
+    df_catalogo = carga.leer_catalogo(ctx["rutas"]["catalogo.xlsx"])
+    return df_stock, df_catalogo, carga.leer_packs(ctx["rutas"]["catalogo.xlsx"], df_catalogo)
+
+
+def cubo(ctx):
+    df = ctx["ingesta"]
+    cols = informes.columnas_ventas(df.columns.tolist())
+    dims, agregaciones, columnas_filtros = informes.definir_cubo(ctx["config"], df.columns.tolist(), cols)
+    df_cubo, motor = informes.construir_cubo(df, dims, agregaciones, columnas_filtros)
+    return {"cols": cols, "agregaciones": agregaciones, "columnas_filtros": columnas_filtros, "df_cubo": df_cubo, "motor": motor}
+
+
+def selecciones(motor, n, semilla=1):
+    rng = np.random.default_rng(semilla)
+    valores = {nombre: sorted(motor.valores(nombre)) for nombre in ["sucursal", "tipo", "mes", "producto"]}
+    elegir = lambda nombre, p: valores[nombre][rng.integers(len(valores[nombre]))] if valores[nombre] and rng.random() < p else None  # noqa: E731
+    return [{"sucursal": elegir("sucursal", 0.5), "tipo": elegir("tipo", 0.5), "mes": elegir("mes", 0.5),
+             "producto": elegir("producto", 0.1)} for _ in range(n)]
+
+
+# Índices de los filtros (se arman de nuevo en cada repetición) y vistas de varias selecciones
+def filtrar(ctx):
+    motor = filtros.MotorFiltros(ctx["cubo"]["df_cubo"], ctx["cubo"]["columnas_filtros"])
+    return [len(motor.vista_filtrada(**seleccion)) for seleccion in ctx["selecciones"]]
+
+
+# Pestaña 1 con todas las sucursales: resumen, cantidades y pivot producto × día (primera página)
+def detalle_diario(ctx):
+    c = ctx["cubo"]
+    resultado = informes.resumen_y_detalle(c["df_cubo"], c["cols"]["medidas"], c["agregaciones"], c["cols"]["fecha"])
+    pivot = resultado["pivot"]
+    pivot.ventana(0, min(PRODUCTOS_POR_PAGINA, pivot.n_filas), 0, pivot.n_columnas)
+    return resultado
+
+
+# Pestaña 2: ABC de las tres métricas por tipo de producto, con XYZ mensual
+def abc(ctx):
+    c = ctx["cubo"]
+    grupos = tuple(g for g in [c["cols"]["tipo"]] if g)
+    metricas = [m for m in informes.METRICAS_ABC if m in c["df_cubo"].columns]
+    return informes.abc(c["df_cubo"], generar_informes.COL_PRODUCTO_ABC, metricas, grupos, c["cols"]["mes"])
+
+
+# Pestaña 3: detalle por categoría de varios días
+def detalle_por_dia(ctx):
+    df = ctx["ingesta"]
+    col_fecha = ctx["cubo"]["cols"]["fecha"]
+    col_tipo = ctx["cubo"]["cols"]["tipo"]
+    primera, ultima = informes.periodo(df, col_fecha)
+    dias = pd.date_range(primera, ultima, periods=DIAS_DETALLE).normalize()
+    return [informes.detalle_por_categoria(informes.entre_fechas(df, col_fecha, dia, dia), col_tipo) for dia in dias]
+
+
+# Pestaña 4: índice del catálogo, cruce de los productos vendidos y casi duplicados
+def cruce_catalogo(ctx):
+    _, df_catalogo, _ = ctx["excel"]
+    df = ctx["ingesta"]
+    col_completo = claves_producto.COL_PRODUCTO_COMPLETO
+    col_sku = next((c for c in df_catalogo.columns if c.lower() == "sku"), None)
+    col_sku_ventas = ctx["cubo"]["cols"]["sku"]
+    indice = coincidencias.IndiceCatalogo(df_catalogo[col_completo], df_catalogo[col_sku] if col_sku else None)
+    vendidos = df[[col_completo] + ([col_sku_ventas] if col_sku_ventas else [])].drop_duplicates(col_completo)
+    cruce = indice.resolver(vendidos[col_completo].astype(object), vendidos[col_sku_ventas] if col_sku_ventas and col_sku else None)
+    return cruce, indice.casi_duplicados()
+
+
+# Pestaña 5: cuadratura de todas las categorías con ventas desde enero y packs
+def cuadratura_stock(ctx):
+    df_stock, _, mapeo_packs = ctx["excel"]
+    col_categoria = informes.columna_categoria_stock(df_stock)
+    return informes.cuadratura_stock(df_stock, ctx["cubo"]["df_cubo"], col_categoria, ctx["cubo"]["cols"]["fecha"], "Todas", 1, mapeo_packs)
+
+
+ETAPAS = {
+    "ingesta": ingesta,
+    "excel": excel,
+    "cubo": cubo,
+    "filtros": filtrar,
+    "detalle diario": detalle_diario,
+    "abc": abc,
+    "detalle por día": detalle_por_dia,
+    "cruce catálogo": cruce_catalogo,
+    "cuadratura": cuadratura_stock,
+}
+# Etapas que usan el resultado de otras (esas se ejecutan una vez aunque no se pidan)
+DEPENDENCIAS = {
+    "cubo": ["ingesta"],
+    "filtros": ["cubo"],
+    "detalle diario": ["cubo"],
+    "abc": ["cubo"],
+    "detalle por día": ["cubo"],
+    "cruce catálogo": ["excel", "cubo"],
+    "cuadratura": ["excel", "cubo"],
+}
+
+
+def necesarias(nombres):
+    pendientes = set()
+
+    def agregar(nombre):
+        for dependencia in DEPENDENCIAS.get(nombre, []):
+            agregar(dependencia)
+        pendientes.add(nombre)
+
+    for nombre in nombres:
+        agregar(nombre)
+    return [n for n in ETAPAS if n in pendientes]
+
+
+def rutas_datos(origen, semilla):
+    if origen.isdigit():
+        directorio = tempfile.mkdtemp(prefix="bench_etapas_")
+        return datos_sinteticos.generar(directorio, int(origen), semilla=semilla), True
+    return {nombre: os.path.join(origen, nombre) for nombre in ["ventas.csv", "stock.xlsx", "catalogo.xlsx", "report.json"]}, False
+
+
+def medir(funcion, ctx, repeticiones):
+    tiempos = []
+    memoria = rendimiento.memoria_mb()
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(ctx)
+        tiempos.append(time.perf_counter() - inicio)
+    delta = rendimiento.memoria_mb() - memoria if memoria is not None else None
+    return resultado, {
+        "mediana_ms": statistics.median(tiempos) * 1000,
+        "min_ms": min(tiempos) * 1000,
+        "delta_mb": delta,
+        "tiempos_ms": [t * 1000 for t in tiempos],
+    }
+
+
+def ejecutar(rutas, nombres, repeticiones):
+    with open(rutas["report.json"], encoding="utf-8") as f:
+        config = json.load(f)
+    with open(rutas["ventas.csv"], "rb") as f:
+        ctx = {"config": config, "contenido": f.read(), "rutas": rutas}
+    resultados = {}
+    for nombre in necesarias(nombres):
+        if nombre == "filtros":
+            ctx["selecciones"] = selecciones(ctx["cubo"]["motor"], SELECCIONES)
+        ctx[nombre], medicion = medir(ETAPAS[nombre], ctx, repeticiones if nombre in nombres else 1)
+        if nombre in nombres:
+            resultados[nombre] = medicion
+    return ctx, resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempos por etapa del pipeline del dashboard.")
+    parser.add_argument("origen", nargs="?", default="100000", help="filas de ventas sintéticas o directorio con los datos")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--etapas", nargs="*", choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--json", help="guarda los resultados en este archivo")
+    parser.add_argument("--comparar", help="resultados de una corrida anterior (--json) para comparar")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    rutas, sinteticos = rutas_datos(args.origen, args.semilla)
+    if sinteticos:
+        print(f"datos sintéticos generados en {time.perf_counter() - inicio:.1f} s")
+    try:
+        ctx, resultados = ejecutar(rutas, args.etapas, args.repeticiones)
+    finally:
+        if sinteticos:
+            shutil.rmtree(os.path.dirname(rutas["ventas.csv"]), ignore_errors=True)
+
+    informe = {
+        "origen": args.origen,
+        "filas": len(ctx["ingesta"]),
+        "productos": int(ctx["ingesta"][claves_producto.COL_PRODUCTO_COMPLETO].nunique()),
+        "repeticiones": args.repeticiones,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "hora": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "etapas": resultados,
+    }
+    base = {}
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f).get("etapas", {})
+
+    print(f"{informe['filas']:,} filas de ventas, {informe['productos']:,} productos, {args.repeticiones} repeticiones")
+    print(f"  {'etapa':18s} {'mediana':>10s} {'mínimo':>10s} {'Δ MB':>8s}" + (f" {'base':>10s} {'cambio':>8s}" if base else ""))
+    for nombre, r in resultados.items():
+        linea = f"  {nombre:18s} {r['mediana_ms']:8.1f} ms {r['min_ms']:7.1f} ms "
+        linea += f"{r['delta_mb']:+8.1f}" if r["delta_mb"] is not None else f"{'-':>8s}"
+        if nombre in base:
+            linea += f" {base[nombre]['mediana_ms']:7.1f} ms {r['mediana_ms'] / base[nombre]['mediana_ms']:7.2f}x"
+        print(linea)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"resultados en {args.json}")
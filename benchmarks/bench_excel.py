@@ -0,0 +1,84 @@
+# Benchmark: lectura de catalogo.xlsx y stock.xlsx antes (pd.read_excel con openpyxl, todas las
+# columnas) y después (carga.leer_excel solo con las columnas usadas, con calamine u openpyxl en
+# modo streaming, y el snapshot columnar de las lecturas siguientes). Cada medición corre en un
+# proceso nuevo; el pico de memoria es el RSS máximo durante la lectura (muestreado de /proc, Linux)
+# sobre el RSS de antes de leer.
+#
+#   python benchmarks/bench_excel.py [catalogo.xlsx] [stock.xlsx]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd  # noqa: E402
+
+import carga  # noqa: E402
+import snapshot  # noqa: E402
+
+RAIZ = os.path.join(os.path.dirname(__file__), "..")
+MODOS = ["antes (read_excel)", "openpyxl streaming", "calamine", "snapshot"]
+
+
+def leer(modo, ruta, directorio):
+    columnas = carga.COLUMNAS_STOCK if "stock" in os.path.basename(ruta).lower() else carga.COLUMNAS_CATALOGO
+    if modo == "antes (read_excel)":
+        return pd.read_excel(ruta)
+    if modo == "openpyxl streaming":
+        return carga.leer_excel(ruta, columnas, motor="openpyxl")
+    if modo == "calamine":
+        return carga.leer_excel(ruta, columnas, motor="calamine")
+    return snapshot.tabla_vigente(ruta, validador="bench", directorio=directorio)
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def medir(modo, ruta, directorio):
+    import openpyxl  # noqa: F401
+    base = pico = rss_mb()
+    listo = threading.Event()
+
+    def muestrear():
+        nonlocal pico
+        while not listo.wait(0.001):
+            pico = max(pico, rss_mb())
+
+    hilo = threading.Thread(target=muestrear)
+    hilo.start()
+    inicio = time.perf_counter()
+    df = leer(modo, ruta, directorio)
+    segundos = time.perf_counter() - inicio
+    listo.set()
+    hilo.join()
+    pico = max(pico, rss_mb())
+    return {"segundos": segundos, "pico_mb": pico - base, "filas": len(df), "columnas": df.shape[1],
+            "mb_frame": df.memory_usage(deep=True).sum() / 1024 ** 2}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--medir":
+        print(json.dumps(medir(sys.argv[2], sys.argv[3], sys.argv[4])))
+        sys.exit()
+
+    rutas = sys.argv[1:] or [os.path.join(RAIZ, "catalogo.xlsx"), os.path.join(RAIZ, "stock.xlsx")]
+    directorio = tempfile.mkdtemp()
+    print(f"motor disponible: {carga.motor_excel()}")
+    for ruta in rutas:
+        columnas = carga.COLUMNAS_STOCK if "stock" in os.path.basename(ruta).lower() else carga.COLUMNAS_CATALOGO
+        snapshot.guardar_tabla(ruta, carga.leer_excel(ruta, columnas), "bench", None, directorio)
+        print(f"\n{os.path.basename(ruta)} ({os.path.getsize(ruta) / 1024:.0f} KB)")
+        for modo in MODOS:
+            if modo == "calamine" and carga.motor_excel() != "calamine":
+                continue
+            salida = subprocess.run([sys.executable, __file__, "--medir", modo, ruta, directorio],
+                                    capture_output=True, text=True, check=True).stdout
+            r = json.loads(salida.strip().splitlines()[-1])
+            print(f"  {modo:20s} {r['segundos'] * 1000:8.1f} ms  pico +{r['pico_mb']:6.1f} MB  "
+                  f"frame {r['mb_frame']:5.2f} MB ({r['filas']:,} x {r['columnas']})")
@@ -0,0 +1,93 @@
+# Benchmark: descarga del pivot producto × día de un año completo. "antes" arma la tabla densa
+# completa y la escribe con DataFrame.to_excel (lo que haría una descarga directa del pivot);
+# "después" es exportar.py: bloques de productos desde el pivot disperso y xlsxwriter en modo
+# constant_memory (y CSV por bloques). Cada modo corre en un proceso nuevo; el pico de memoria
+# es el RSS máximo durante el export (muestreado de /proc, Linux) sobre el RSS de antes.
+#
+#   python benchmarks/bench_exportar.py [productos] [días]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import exportar  # noqa: E402
+import pivote  # noqa: E402
+
+MODOS = ["antes (to_excel denso)", "xlsx por bloques", "csv por bloques"]
+
+
+def pivot_sintetico(productos, dias, semilla=0):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range("2024-01-01", periods=dias, freq="D")
+    # Cada producto se vende en una fracción de los días (productos de alta y baja rotación)
+    densidad = rng.uniform(0.05, 0.9, productos)
+    fila, columna = np.nonzero(rng.random((productos, dias)) < densidad[:, None])
+    detalle = pd.DataFrame({
+        "Producto Completo": np.array([f"PRODUCTO {i:05d}" for i in range(productos)], dtype=object)[fila],
+        "+Fecha Documento": fechas[columna],
+        "Cantidad": rng.integers(1, 20, len(fila)).astype(float),
+    })
+    return pivote.PivotDisperso(detalle, "Producto Completo", "+Fecha Documento", "Cantidad")
+
+
+def exportar_modo(modo, pivot, destino):
+    if modo == "antes (to_excel denso)":
+        denso = pd.concat([pivot.ventana(0, pivot.n_filas, 0, pivot.n_columnas), pivot.fila_totales(0, pivot.n_columnas)])
+        denso.to_excel(destino, index=False, engine="xlsxwriter")
+    elif modo == "xlsx por bloques":
+        with open(destino, "wb") as f:
+            exportar.escribir_xlsx(f, exportar.bloques_pivot(pivot), formatos_excel={"entero": "#,##0"}, por_defecto="entero")
+    else:
+        with open(destino, "w", encoding="utf-8-sig", newline="") as f:
+            exportar.escribir_csv(f, exportar.bloques_pivot(pivot))
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def medir(modo, productos, dias):
+    pivot = pivot_sintetico(productos, dias)
+    destino = os.path.join(tempfile.mkdtemp(), "pivot.xlsx" if "xlsx" in modo or "antes" in modo else "pivot.csv")
+    base = pico = rss_mb()
+    listo = threading.Event()
+
+    def muestrear():
+        nonlocal pico
+        while not listo.wait(0.005):
+            pico = max(pico, rss_mb())
+
+    hilo = threading.Thread(target=muestrear)
+    hilo.start()
+    inicio = time.perf_counter()
+    exportar_modo(modo, pivot, destino)
+    segundos = time.perf_counter() - inicio
+    listo.set()
+    hilo.join()
+    return {"segundos": segundos, "pico_mb": max(pico, rss_mb()) - base, "celdas": pivot.celdas,
+            "archivo_mb": os.path.getsize(destino) / 1024 ** 2}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--medir":
+        print(json.dumps(medir(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))))
+        sys.exit()
+
+    productos = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    dias = int(sys.argv[2]) if len(sys.argv) > 2 else 366
+    print(f"pivot {productos:,} productos × {dias} días")
+    for modo in MODOS:
+        salida = subprocess.run([sys.executable, __file__, "--medir", modo, str(productos), str(dias)],
+                                capture_output=True, text=True, check=True).stdout
+        r = json.loads(salida.strip().splitlines()[-1])
+        print(f"  {modo:24s} {r['segundos']:6.2f} s  pico +{r['pico_mb']:7.1f} MB  "
+              f"archivo {r['archivo_mb']:5.1f} MB ({r['celdas']:,} celdas con ventas)")
@@ -0,0 +1,89 @@
+# Benchmark: latencia de un cambio de filtro del sidebar sobre un dataset sintético
+# (copia + máscaras encadenadas como el app.py original vs MotorFiltros)
+#
+#   python benchmarks/bench_filtros.py [filas]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import filtros  # noqa: E402
+
+COLUMNAS = {
+    "sucursal": "+Sucursal",
+    "tipo": "+Tipo de Producto / Servicio",
+    "mes": "+Mes",
+    "producto": "+Producto / Servicio + Variante",
+}
+
+
+def datos_sinteticos(filas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    n_productos = 2000
+    productos = np.array([f"PRODUCTO {i}" for i in range(n_productos)], dtype=object)
+    tipos = np.array([f"TIPO {i}" for i in range(30)], dtype=object)
+    idx = rng.integers(0, n_productos, filas)
+    return pd.DataFrame({
+        "+Sucursal": pd.Categorical(np.array(["CENTRO", "NORTE", "SUR"], dtype=object)[rng.integers(0, 3, filas)]),
+        "+Tipo de Producto / Servicio": pd.Categorical(tipos[idx % 30]),
+        "+Mes": pd.Categorical(np.array([f"2024-{m:02d}" for m in range(1, 13)] + [f"2025-{m:02d}" for m in range(1, 13)], dtype=object)[rng.integers(0, 24, filas)]),
+        "+Producto / Servicio + Variante": pd.Categorical(productos[idx]),
+        "Cantidad": rng.integers(1, 6, filas).astype(float),
+        "Subtotal Neto": rng.random(filas) * 10000,
+    })
+
+
+# Versión original de app.py
+def filtrar_original(df, sucursal, tipo, mes, producto):
+    df_filtrado = df.copy()
+    if sucursal is not None:
+        df_filtrado = df_filtrado[df_filtrado["+Sucursal"] == sucursal]
+    if tipo is not None:
+        df_filtrado = df_filtrado[df_filtrado["+Tipo de Producto / Servicio"] == tipo]
+    if mes is not None:
+        df_filtrado = df_filtrado[df_filtrado["+Mes"] == mes]
+    if producto is not None:
+        df_filtrado = df_filtrado[df_filtrado["+Producto / Servicio + Variante"] == producto]
+    return df_filtrado
+
+
+def selecciones(n, semilla=1):
+    rng = np.random.default_rng(semilla)
+    for _ in range(n):
+        yield (
+            ["CENTRO", "NORTE", "SUR", None][rng.integers(0, 4)],
+            [f"TIPO {rng.integers(0, 30)}", None][rng.integers(0, 2)],
+            [f"2024-{rng.integers(1, 13):02d}", None][rng.integers(0, 2)],
+            None,
+        )
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    df = datos_sinteticos(filas)
+    casos = list(selecciones(20))
+
+    inicio = time.perf_counter()
+    motor = filtros.MotorFiltros(df, COLUMNAS, max_vistas=0)
+    t_indices = time.perf_counter() - inicio
+
+    tiempos_original, tiempos_motor = [], []
+    for sucursal, tipo, mes, producto in casos:
+        inicio = time.perf_counter()
+        esperado = filtrar_original(df, sucursal, tipo, mes, producto)
+        tiempos_original.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        obtenido = motor.vista_filtrada(sucursal, tipo, mes, producto)
+        tiempos_motor.append(time.perf_counter() - inicio)
+
+        assert len(obtenido) == len(esperado) and obtenido["Cantidad"].sum() == esperado["Cantidad"].sum()
+
+    print(f"filas: {filas:,}")
+    print(f"construcción de índices: {t_indices * 1000:10.1f} ms (una vez por carga)")
+    print(f"original  mediana: {np.median(tiempos_original) * 1000:10.1f} ms  máx: {max(tiempos_original) * 1000:10.1f} ms")
+    print(f"motor     mediana: {np.median(tiempos_motor) * 1000:10.1f} ms  máx: {max(tiempos_motor) * 1000:10.1f} ms")
@@ -0,0 +1,63 @@
+# Benchmark: memoria del frame de ventas como se cargaba antes (pd.read_csv sin tipos, todas las
+# columnas, año / mes / día como enteros de 64 bits y el nombre del mes con strftime por fila) vs.
+# la carga compacta (snapshot.procesar_ventas: categóricas, enteros chicos, columnas no usadas fuera)
+#
+#   python benchmarks/bench_memoria.py [ventas.csv]
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd  # noqa: E402
+
+import claves_producto  # noqa: E402
+import registro  # noqa: E402
+import snapshot  # noqa: E402
+
+RAIZ = os.path.join(os.path.dirname(__file__), "..")
+
+
+def carga_anterior(contenido):
+    df = pd.read_csv(io.BytesIO(contenido))
+    df.columns = df.columns.str.strip()
+    col_fecha = next(c for c in df.columns if "fecha" in c.lower())
+    df[col_fecha] = pd.to_datetime(df[col_fecha], errors="coerce", dayfirst=True)
+    df["Año"] = df[col_fecha].dt.year.astype("int64")
+    df["MesNum"] = df[col_fecha].dt.month.astype("int64")
+    df["MesNombre"] = df[col_fecha].dt.strftime("%B")
+    df["Día"] = df[col_fecha].dt.day.astype("int64")
+    producto = df["+Producto / Servicio"].astype(str).str.strip()
+    variante = df["+Variante"].fillna("").astype(str).str.strip()
+    df["Producto Completo"] = (producto + " (" + variante + ")").where(variante != "", producto).str.upper()
+    return df
+
+
+if __name__ == "__main__":
+    ruta = sys.argv[1] if len(sys.argv) > 1 else None
+    if ruta is None:
+        print("uso: python benchmarks/bench_memoria.py ventas.csv")
+        sys.exit(1)
+    with open(os.path.join(RAIZ, "report.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+
+    inicio = time.perf_counter()
+    antes = carga_anterior(contenido)
+    t_antes = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    despues, _ = snapshot.procesar_ventas(contenido, config)
+    t_despues = time.perf_counter() - inicio
+
+    informe = registro.informe_memoria(antes, despues)
+    pd.set_option("display.width", 200)
+    print(f"{len(despues):,} filas, CSV de {len(contenido) / 1024 ** 2:.1f} MB")
+    print(informe.to_string(index=False, float_format=lambda x: f"{x:,.1f}", na_rep="-"))
+    total_antes, total_despues = informe.iloc[-1]["KB antes"], informe.iloc[-1]["KB después"]
+    print(f"\nantes {total_antes / 1024:.1f} MB en {t_antes:.2f} s, después {total_despues / 1024:.1f} MB "
+          f"en {t_despues:.2f} s ({total_antes / total_despues:.1f}x menos memoria)")
+    print(f"{claves_producto.COL_PRODUCTO_COMPLETO} igual: "
+          f"{(antes[claves_producto.COL_PRODUCTO_COMPLETO].to_numpy() == despues[claves_producto.COL_PRODUCTO_COMPLETO].astype(str).to_numpy()).mean():.1%}")
@@ -0,0 +1,83 @@
+# Benchmark: expansión de ventas de packs a unidades de sus componentes (producto
+# matriz-vector disperso con np.bincount) y packs armables con lo disponible
+#
+#   python benchmarks/bench_packs.py [packs] [productos]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import packs  # noqa: E402
+
+
+def mapeo_sintetico(n_packs, n_productos, semilla=0):
+    rng = np.random.default_rng(semilla)
+    componentes_por_pack = rng.integers(1, 5, n_packs)
+    pack = np.repeat(np.arange(n_packs), componentes_por_pack)
+    componente = rng.integers(0, n_productos, len(pack))
+    # Un 5% de los componentes son a su vez packs (packs anidados, sin ciclos)
+    anidado = (rng.random(len(pack)) < 0.05) & (pack > 0)
+    nombres_componente = np.array([f"PRODUCTO {c}" for c in componente], dtype=object)
+    nombres_componente[anidado] = [f"PACK {rng.integers(0, p)}" for p in pack[anidado]]
+    return pd.DataFrame({
+        packs.COL_PACK: [f"PACK {p}" for p in pack],
+        packs.COL_COMPONENTE: nombres_componente,
+        packs.COL_CANTIDAD: rng.integers(1, 13, len(pack)).astype(float),
+    })
+
+
+# Referencia con bucles de Python (un pack a la vez, recursivo)
+def expandir_bucle(mapeo, ventas):
+    composicion = {}
+    for pack, comp, cant in mapeo.itertuples(index=False):
+        composicion.setdefault(pack, []).append((comp, cant))
+    consumo = {}
+
+    def consumir(nombre, unidades, nivel):
+        if nivel >= packs.MAX_NIVELES:
+            return
+        for comp, cant in composicion.get(nombre, []):
+            consumo[comp] = consumo.get(comp, 0.0) + unidades * cant
+            consumir(comp, unidades * cant, nivel + 1)
+
+    for nombre, unidades in ventas.items():
+        consumir(nombre, unidades, 0)
+    return consumo
+
+
+if __name__ == "__main__":
+    n_packs = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    n_productos = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    rng = np.random.default_rng(1)
+    mapeo = packs._limpiar_mapeo(*[s for _, s in mapeo_sintetico(n_packs, n_productos).items()])
+    nombres = np.array([f"PRODUCTO {i}" for i in range(n_productos)] + [f"PACK {i}" for i in range(n_packs)], dtype=object)
+    cantidades = rng.integers(0, 40, len(nombres)).astype(float)
+
+    inicio = time.perf_counter()
+    matriz = packs.MatrizPacks(mapeo)
+    t_matriz = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    consumo = matriz.expandir(matriz.vector(nombres, cantidades))
+    t_expandir = time.perf_counter() - inicio
+
+    disponible = np.where(matriz.es_pack, np.nan, rng.integers(0, 500, len(matriz.nombres)).astype(float))
+    inicio = time.perf_counter()
+    armables = matriz.disponibles(disponible)
+    t_armables = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    referencia = expandir_bucle(mapeo, dict(zip(nombres, cantidades)))
+    t_bucle = time.perf_counter() - inicio
+
+    pos = pd.Index(matriz.nombres).get_indexer(list(referencia))
+    np.testing.assert_allclose(consumo[pos], list(referencia.values()))
+
+    print(f"{n_packs:,} packs, {len(mapeo):,} aristas pack→componente, {n_productos:,} productos")
+    print(f"matriz:            {t_matriz * 1000:8.1f} ms")
+    print(f"expandir ventas:   {t_expandir * 1000:8.1f} ms  (bucle Python: {t_bucle * 1000:.1f} ms)")
+    print(f"packs armables:    {t_armables * 1000:8.1f} ms  ({int(np.isfinite(armables).sum()):,} packs)")
@@ -0,0 +1,67 @@
+# Benchmark: tiempo de un rerun de app.py con la pestaña por defecto abierta
+# (con caches ya calientes), usando el runner headless de Streamlit.
+#
+#   python benchmarks/bench_pestañas.py ventas.csv [directorio_app] [reruns]
+#
+# Copia la app a un directorio temporal y apunta report.json (y stock.xlsx) a archivos
+# locales. Para comparar con la versión anterior (todas las pestañas se ejecutan en cada
+# rerun) pasar como directorio_app un checkout de esa revisión.
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+URL_STOCK = "https://raw.githubusercontent.com/Adolfoignaciodg/Botillera-/main/stock.xlsx"
+
+
+def preparar_app(origen, csv):
+    destino = tempfile.mkdtemp(prefix="bench_pestanas_")
+    shutil.copytree(origen, destino, dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns(".git", "__pycache__", ".cache*"))
+    with open(os.path.join(destino, "report.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    config["dataSource"]["filename"] = os.path.abspath(csv)
+    config.setdefault("catalogoProductos", {})["url"] = os.path.join(destino, "catalogo.xlsx")
+    with open(os.path.join(destino, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=4)
+    ruta_app = os.path.join(destino, "app.py")
+    with open(ruta_app, encoding="utf-8") as f:
+        codigo = f.read()
+    with open(ruta_app, "w", encoding="utf-8") as f:
+        f.write(codigo.replace(URL_STOCK, os.path.join(destino, "stock.xlsx")))
+    return destino, ruta_app
+
+
+def medir(ruta_app, reruns):
+    os.environ["BOTILLERIA_CACHE_DIR"] = os.path.join(os.path.dirname(ruta_app), ".cache_botilleria")
+    at = AppTest.from_file(ruta_app, default_timeout=600)
+    inicio = time.perf_counter()
+    at.run()
+    primera = time.perf_counter() - inicio
+    tiempos = []
+    for _ in range(reruns):
+        inicio = time.perf_counter()
+        at.run()
+        tiempos.append(time.perf_counter() - inicio)
+    return primera, tiempos
+
+
+if __name__ == "__main__":
+    csv = sys.argv[1]
+    origen = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(__file__), "..")
+    reruns = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    destino, ruta_app = preparar_app(origen, csv)
+    os.chdir(destino)
+    try:
+        primera, tiempos = medir(ruta_app, reruns)
+    finally:
+        shutil.rmtree(destino, ignore_errors=True)
+    print(f"primera ejecución: {primera:.2f} s")
+    print(f"rerun (pestaña por defecto): mediana {statistics.median(tiempos) * 1000:.0f} ms, "
+          f"mín {min(tiempos) * 1000:.0f} ms en {reruns} reruns")
@@ -0,0 +1,56 @@
+# Benchmark: construcción de "Producto Completo" con apply fila a fila vs versión vectorizada
+#
+#   python benchmarks/bench_producto_completo.py [filas]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import claves_producto  # noqa: E402
+
+
+def datos_sinteticos(filas, n_productos=2000, semilla=0):
+    rng = np.random.default_rng(semilla)
+    nombres = np.array([f"Producto {i}" for i in range(n_productos)], dtype=object)
+    variantes = np.array([np.nan, "", "350 CC", "1,5 LT", " 750 ML "], dtype=object)
+    idx = rng.integers(0, n_productos, filas)
+    return pd.DataFrame({
+        "+Producto / Servicio": nombres[idx],
+        "+Variante": variantes[idx % len(variantes)],
+    })
+
+
+# Versión original de app.py
+def producto_completo_apply(df, col_producto="+Producto / Servicio", col_variante="+Variante"):
+    completo = df.apply(
+        lambda row: row[col_producto] if pd.isna(row[col_variante]) or str(row[col_variante]).strip() == ""
+        else f"{row[col_producto]} ({str(row[col_variante]).strip()})",
+        axis=1
+    )
+    return completo.str.upper().str.strip()
+
+
+def medir(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df = datos_sinteticos(filas)
+
+    t_apply, esperado = medir(lambda: producto_completo_apply(df), repeticiones=1)
+    t_vect, obtenido = medir(lambda: claves_producto.producto_completo(df["+Producto / Servicio"], df["+Variante"]))
+
+    assert (obtenido.astype(object).to_numpy() == esperado.to_numpy()).all()
+    print(f"filas: {filas:,}")
+    print(f"apply:       {t_apply * 1000:10.1f} ms")
+    print(f"vectorizado: {t_vect * 1000:10.1f} ms  ({t_apply / t_vect:,.0f}x)")
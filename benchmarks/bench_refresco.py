@@ -0,0 +1,146 @@
+# Benchmark: refresco en segundo plano (refresco.py) contra un servidor HTTP local con ETag /
+# Last-Modified y respuestas 304. Mide lo que ve una sesión mientras la fuente cambia:
+#   1. fuente sin cambios: revisión condicional (304, sin descarga ni parseo)
+#   2. fuente modificada: se descarga y parsea en el hilo de fondo; las lecturas del almacén
+#      siguen instantáneas y devuelven la versión anterior hasta el reemplazo
+#
+#   python benchmarks/bench_refresco.py [filas]
+import email.utils
+import hashlib
+import http.server
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import refresco  # noqa: E402
+import registro  # noqa: E402
+
+
+class Manejador(http.server.SimpleHTTPRequestHandler):
+    pedidos = {"200": 0, "304": 0, "HEAD": 0}
+
+    def send_head(self):
+        ruta = self.translate_path(self.path)
+        if not os.path.isfile(ruta):
+            return super().send_head()
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        etag = '"' + hashlib.md5(datos).hexdigest() + '"'
+        modificado = email.utils.formatdate(os.path.getmtime(ruta), usegmt=True)
+        if self.command == "HEAD":
+            Manejador.pedidos["HEAD"] += 1
+        elif self.headers.get("If-None-Match") == etag:
+            Manejador.pedidos["304"] += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return None
+        else:
+            Manejador.pedidos["200"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(datos)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", modificado)
+        self.end_headers()
+        return _Cuerpo(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Cuerpo:
+    def __init__(self, datos):
+        self.datos = datos
+
+    def read(self, *args):
+        datos, self.datos = self.datos, b""
+        return datos
+
+    def close(self):
+        pass
+
+
+def escribir_csv(ruta, filas, semilla):
+    rng = np.random.default_rng(semilla)
+    pd.DataFrame({
+        "Producto": rng.choice([f"PRODUCTO {i}" for i in range(500)], filas),
+        "Cantidad": rng.integers(1, 10, filas),
+        "Venta Total Neta": rng.integers(500, 50_000, filas),
+    }).to_csv(ruta, index=False)
+
+
+def lecturas_durante(almacen, clave, mientras):
+    # Lecturas del almacén desde una "sesión" mientras el refresco trabaja
+    tiempos, versiones = [], set()
+    while mientras():
+        inicio = time.perf_counter()
+        valor = almacen.obtener(clave, lambda: None)
+        tiempos.append(time.perf_counter() - inicio)
+        versiones.add(int(valor["Cantidad"].iloc[0]) if valor is not None else None)
+        time.sleep(0.001)
+    return np.array(tiempos or [0.0]), versiones
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    directorio = tempfile.mkdtemp()
+    ruta = os.path.join(directorio, "ventas.csv")
+    escribir_csv(ruta, filas, 0)
+
+    servidor = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), lambda *a, **k: Manejador(*a, directory=directorio, **k)
+    )
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/ventas.csv"
+
+    def cargar(contenido=None, cabeceras=None):
+        return pd.read_csv(io.BytesIO(contenido) if contenido is not None else url)
+
+    almacen = registro.AlmacenDatasets(registro.MEMORIA_MAX_MB * 1024 ** 2)
+    refrescador = refresco.Refrescador(almacen, intervalo=3600)
+    clave = ("ventas", url)
+
+    inicio = time.perf_counter()
+    almacen.obtener(clave, cargar)
+    t_carga = time.perf_counter() - inicio
+    refrescador.registrar(url, clave, cargar)
+    refrescador.refrescar(url)  # línea base: cabeceras de lo ya cargado
+
+    # 1. Sin cambios: petición condicional
+    inicio = time.perf_counter()
+    refrescador.refrescar(url)
+    t_304 = time.perf_counter() - inicio
+    version_antes = almacen.version(clave)
+
+    # 2. La fuente cambia: refresco en el hilo de fondo mientras una sesión lee
+    primera_antes = int(almacen.obtener(clave, cargar)["Cantidad"].iloc[0])
+    escribir_csv(ruta, filas, 1)
+    inicio = time.perf_counter()
+    refrescador.despertar()
+    tiempos, versiones = lecturas_durante(almacen, clave, lambda: almacen.version(clave) == version_antes)
+    t_refresco = time.perf_counter() - inicio
+    primera_despues = int(almacen.obtener(clave, cargar)["Cantidad"].iloc[0])
+
+    refrescador.detener()
+    servidor.shutdown()
+    estado = refrescador.estado()[0]
+
+    print(f"{filas:,} filas servidas por http.server local con ETag")
+    print(f"carga inicial:               {t_carga * 1000:8.1f} ms")
+    print(f"revisión sin cambios (304):  {t_304 * 1000:8.1f} ms")
+    print(f"refresco con cambios:        {t_refresco * 1000:8.1f} ms en segundo plano")
+    print(f"lecturas durante el refresco: {len(tiempos):,}, máx {tiempos.max() * 1000:.2f} ms, "
+          f"p50 {np.median(tiempos) * 1e6:.0f} µs; valores vistos: {sorted(v for v in versiones if v is not None)}")
+    print(f"primer valor antes/después:  {primera_antes} -> {primera_despues} "
+          f"(versión {version_antes} -> {almacen.version(clave)})")
+    print(f"pedidos al servidor: {Manejador.pedidos}; cambios {estado['Cambios']}, sin cambios {estado['Sin cambios']}, "
+          f"error: {estado['Error'] or '-'}")
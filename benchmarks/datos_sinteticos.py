@@ -0,0 +1,290 @@
+# Datos sintéticos con el formato de los exportes de Bsale para medir el dashboard sin las
+# fuentes reales: ventas.csv (reporte dinámico de ventas, mismas columnas que el CSV de
+# report.json), stock.xlsx (hoja "Stock Actual") y catalogo.xlsx (hoja de productos + hoja
+# "Packs"), más un report.json que apunta a esos archivos. Todo sale de una semilla: la misma
+# llamada genera siempre los mismos archivos.
+#
+#   python benchmarks/datos_sinteticos.py FILAS [directorio] [--productos N] [--sucursales N]
+#                                         [--dias N] [--semilla N] [--sep ,]
+#
+# Con el report.json generado se puede abrir el dashboard o generar los informes offline:
+#   python generar_informes.py --config directorio/report.json
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import claves_producto  # noqa: E402
+import cuadratura  # noqa: E402
+from bench_coincidencias import DETALLES, FORMATOS, MARCAS, variar  # noqa: E402
+
+RAIZ = os.path.join(os.path.dirname(__file__), "..")
+
+# Filas de ventas por bloque al escribir el CSV (10M filas no se arman de una vez)
+FILAS_POR_BLOQUE = 500_000
+
+SUCURSALES = ["Botilleria Maria Bonita", "PANDITA", "BODEGA", "CENTRO", "NORTE", "SUR"]
+VENDEDORES = ["ANA", "LUIS", "PEDRO", "CAMILA", "JAVIERA", "MATIAS"]
+TIPOS_DOCUMENTO = ["BOLETA ELECTRONICA", "FACTURA ELECTRONICA", "NOTA DE CREDITO"]
+# Categorías de la cuadratura (cuadratura.CATEGORIAS_CLAVE) y otras que quedan fuera de ella
+OTRAS_CATEGORIAS = ["LACTEOS", "SNACKS", "ARTICULOS DE HOGAR", "CONFITERIA", "HIELO", "MINI COCTEL"]
+CATEGORIAS = cuadratura.CATEGORIAS_CLAVE + OTRAS_CATEGORIAS
+
+# Fracciones del catálogo: productos vendidos que no están (no registrados), que están escritos
+# de otra forma (probables) y productos ingresados dos veces
+FRACCION_SIN_CATALOGO = 0.03
+FRACCION_OTRA_ESCRITURA = 0.05
+FRACCION_DUPLICADOS = 0.02
+# Productos que son packs de otro (p. ej. "PACK 6 ...") y unidades por pack
+FRACCION_PACKS = 0.03
+UNIDADES_PACK = [2, 4, 6, 12, 24]
+
+COLUMNAS_VENTAS = [
+    "+Sucursal", "+Tipo de Documento", "+Numero Documento", "+Fecha Documento", "+Mes", "+Vendedor",
+    "+Tipo de Producto / Servicio", "+Producto / Servicio", "+Variante", "+Producto / Servicio + Variante",
+    "+SKU", "Cantidad", "Subtotal Neto", "Impuestos", "Subtotal Bruto", "Costo Neto", "Margen Neto",
+]
+
+
+# Productos por cantidad de filas de ventas: de cientos (10 mil filas) a miles (millones de filas)
+def productos_para(filas):
+    return int(np.clip(3 * filas ** 0.5, 300, 30_000))
+
+
+# --- Maestro de productos: nombre, variante, categoría, SKU, precio, costo y popularidad ---
+def maestro_productos(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    categoria = rng.integers(0, len(CATEGORIAS), n)
+    marca = rng.integers(0, len(MARCAS), n)
+    detalle = rng.integers(0, len(DETALLES), n)
+    nombres = np.array([f"{CATEGORIAS[c].split()[0].rstrip('.')} {MARCAS[m]} {DETALLES[d]} {i}"
+                        for i, (c, m, d) in enumerate(zip(categoria, marca, detalle))], dtype=object)
+    variantes = np.array(FORMATOS + [""], dtype=object)[rng.integers(0, len(FORMATOS) + 1, n)]
+    precio = np.round(rng.lognormal(7.5, 0.8, n), -1) + 290
+    maestro = pd.DataFrame({
+        "Tipo de Producto": np.array(CATEGORIAS, dtype=object)[categoria],
+        "Producto": nombres,
+        "Variante": variantes,
+        "Marca": np.array(MARCAS, dtype=object)[marca],
+        "SKU": (rng.permutation(n) + 10_000_000).astype(str),
+        "Código Barras": (780_000_000_000 + rng.permutation(n)).astype(str),
+        "Precio Venta Bruto": precio,
+        "Costo Neto Prom. Unitario": np.round(precio / 1.19 * rng.uniform(0.45, 0.85, n), 2),
+        # Ventas con cola larga: pocos productos concentran la mayor parte
+        "peso": rng.pareto(1.1, n) + 0.05,
+        "pack_de": -1,
+        "unidades_pack": 0,
+    })
+    # Packs: un producto existente vendido de a varias unidades
+    packs = np.flatnonzero(rng.random(n) < FRACCION_PACKS)
+    componentes = rng.choice(np.setdiff1d(np.arange(n), packs), len(packs), replace=False) if len(packs) else packs
+    unidades = np.array(UNIDADES_PACK)[rng.integers(0, len(UNIDADES_PACK), len(packs))]
+    maestro.loc[packs, "Producto"] = [f"PACK {u} {nombres[c]}" for u, c in zip(unidades, componentes)]
+    maestro.loc[packs, "Variante"] = variantes[componentes]
+    maestro.loc[packs, "Tipo de Producto"] = maestro["Tipo de Producto"].to_numpy()[componentes]
+    maestro.loc[packs, "pack_de"] = componentes
+    maestro.loc[packs, "unidades_pack"] = unidades
+    maestro.loc[packs, "Precio Venta Bruto"] = np.round(precio[componentes] * unidades * 0.9, -1)
+    maestro.loc[packs, "Costo Neto Prom. Unitario"] = maestro["Costo Neto Prom. Unitario"].to_numpy()[componentes] * unidades
+    maestro[claves_producto.COL_PRODUCTO_COMPLETO] = claves_producto.producto_completo(
+        maestro["Producto"], maestro["Variante"].replace("", None)
+    ).astype(str).to_numpy()
+    return maestro
+
+
+# --- Ventas: una línea por producto vendido, documentos de 1 a 5 líneas, fechas ordenadas ---
+def bloque_ventas(maestro, filas, sucursales, inicio, dia_desde, dia_hasta, rng):
+    probabilidad = maestro["peso"].to_numpy() / maestro["peso"].sum()
+    producto = rng.choice(len(maestro), filas, p=probabilidad)
+    dia = np.sort(rng.integers(dia_desde, max(dia_hasta, dia_desde + 1), filas))
+    # strftime solo sobre los días del tramo y luego se expande por día
+    dias = pd.Timestamp(inicio) + pd.to_timedelta(np.arange(dia_desde, max(dia_hasta, dia_desde + 1)), unit="D")
+    fecha_texto = dias.strftime("%d/%m/%Y").to_numpy(dtype=object)[dia - dia_desde]
+    mes_texto = dias.strftime("%Y-%m").to_numpy(dtype=object)[dia - dia_desde]
+    # Documentos: líneas consecutivas del mismo día y sucursal
+    lineas_documento = rng.integers(1, 6, filas // 2 + 1)
+    documento = np.repeat(np.arange(len(lineas_documento)), lineas_documento)[:filas]
+    sucursal = rng.integers(0, sucursales, len(lineas_documento))[documento]
+    tipo_documento = rng.choice(len(TIPOS_DOCUMENTO), len(lineas_documento), p=[0.85, 0.13, 0.02])[documento]
+
+    cantidad = rng.geometric(0.55, filas).astype(float)
+    cantidad[tipo_documento == 2] *= -1  # notas de crédito restan
+    bruto = cantidad * maestro["Precio Venta Bruto"].to_numpy()[producto]
+    neto = np.round(bruto / 1.19, 2)
+    costo = np.round(cantidad * maestro["Costo Neto Prom. Unitario"].to_numpy()[producto], 2)
+    productos = maestro["Producto"].to_numpy()[producto]
+    variantes = maestro["Variante"].to_numpy()[producto]
+    con_variante = pd.Series(productos) + np.where(variantes != "", " - ", "") + variantes
+    return pd.DataFrame({
+        "+Sucursal": np.array(SUCURSALES[:sucursales], dtype=object)[sucursal],
+        "+Tipo de Documento": np.array(TIPOS_DOCUMENTO, dtype=object)[tipo_documento],
+        "+Numero Documento": documento,
+        "+Fecha Documento": fecha_texto,
+        "+Mes": mes_texto,
+        "+Vendedor": np.array(VENDEDORES, dtype=object)[rng.integers(0, len(VENDEDORES), len(lineas_documento))[documento]],
+        "+Tipo de Producto / Servicio": maestro["Tipo de Producto"].to_numpy()[producto],
+        "+Producto / Servicio": productos,
+        "+Variante": variantes,
+        "+Producto / Servicio + Variante": con_variante.to_numpy(),
+        "+SKU": maestro["SKU"].to_numpy()[producto],
+        "Cantidad": cantidad,
+        "Subtotal Neto": neto,
+        "Impuestos": np.round(bruto - neto, 2),
+        "Subtotal Bruto": bruto,
+        "Costo Neto": costo,
+        "Margen Neto": np.round(neto - costo, 2),
+    }, columns=COLUMNAS_VENTAS)
+
+
+def escribir_ventas(ruta, maestro, filas, dias=365, sucursales=2, inicio="2024-01-01", semilla=0, sep=","):
+    rng = np.random.default_rng(semilla + 1)
+    bloques = max(-(-filas // FILAS_POR_BLOQUE), 1)
+    numero = 1000
+    with open(ruta, "wb") as f:
+        for i in range(bloques):
+            n = min(FILAS_POR_BLOQUE, filas - i * FILAS_POR_BLOQUE)
+            # Cada bloque cubre un tramo de días consecutivo: el archivo queda ordenado por fecha
+            bloque = bloque_ventas(maestro, n, sucursales, inicio, dias * i // bloques, dias * (i + 1) // bloques, rng)
+            bloque["+Numero Documento"] += numero
+            numero = int(bloque["+Numero Documento"].iloc[-1]) + 1 if n else numero
+            escribir_csv(f, bloque, sep, cabecera=i == 0)
+
+
+# pyarrow escribe el CSV unas diez veces más rápido que to_csv (con 10M filas son minutos);
+# sin pyarrow se usa pandas. Los textos quedan entre comillas en ambos casos.
+def escribir_csv(archivo, bloque, sep, cabecera):
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        archivo.write(bloque.to_csv(sep=sep, header=cabecera, index=False, quoting=csv.QUOTE_NONNUMERIC).encode("utf-8"))
+        return
+    opciones = pa_csv.WriteOptions(include_header=cabecera, delimiter=sep, quoting_style="needed")
+    pa_csv.write_csv(pa.Table.from_pandas(bloque, preserve_index=False), archivo, opciones)
+
+
+# --- Stock actual (hoja "Stock Actual" del exporte de stock de Bsale) ---
+def tabla_stock(maestro, semilla=0):
+    rng = np.random.default_rng(semilla + 2)
+    n = len(maestro)
+    stock = rng.poisson(maestro["peso"].to_numpy() * 8 + 1).astype(int)
+    stock[rng.random(n) < 0.05] = 0
+    por_despachar = np.where(rng.random(n) < 0.05, rng.integers(1, 5, n), 0)
+    costo = maestro["Costo Neto Prom. Unitario"].to_numpy()
+    return pd.DataFrame({
+        "Tipo de Producto": maestro["Tipo de Producto"],
+        "Producto": maestro["Producto"],
+        "Variante": maestro["Variante"].replace("", None),
+        "Código Barras": maestro["Código Barras"],
+        "SKU": maestro["SKU"],
+        "Stock": stock,
+        "Costo Neto Prom. Unitario": costo,
+        "Costo Neto Prom. Total": np.round(costo * stock),
+        "Cantidad por Despachar": por_despachar,
+        "Cantidad Disponible": stock - por_despachar,
+        "Por Recibir": np.where(rng.random(n) < 0.1, rng.integers(6, 48, n), 0),
+        "Marca": maestro["Marca"],
+        "Lista de Precios": "Lista de Precios Base",
+        "Precio Venta Bruto": maestro["Precio Venta Bruto"],
+        "Margen Unitario": np.round(maestro["Precio Venta Bruto"].to_numpy() / 1.19 - costo, 2),
+    })
+
+
+# --- Catálogo: productos (con faltantes, otras escrituras y duplicados) y hoja de packs ---
+def tabla_catalogo(maestro, sucursales=2, semilla=0):
+    rng = np.random.default_rng(semilla + 3)
+    n = len(maestro)
+    sorteo = rng.random(n)
+    en_catalogo = sorteo >= FRACCION_SIN_CATALOGO
+    nombres = maestro["Producto"].to_numpy().copy()
+    otra_escritura = np.flatnonzero(en_catalogo & (sorteo < FRACCION_SIN_CATALOGO + FRACCION_OTRA_ESCRITURA))
+    nombres[otra_escritura] = [variar(nombres[i], rng, agregar_palabra=False).upper() for i in otra_escritura]
+    duplicados = rng.choice(np.flatnonzero(en_catalogo), int(n * FRACCION_DUPLICADOS), replace=False)
+    filas = np.concatenate([np.flatnonzero(en_catalogo), duplicados])
+    nombres = np.concatenate([nombres[en_catalogo], [variar(nombres[i], rng).upper() for i in duplicados]])
+    creacion = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 500 * 86_400, len(filas)), unit="s")
+    catalogo = pd.DataFrame({
+        "Nombre del Producto": nombres,
+        "Clasificación": "Producto",
+        "Tipo de Producto": maestro["Tipo de Producto"].to_numpy()[filas],
+        "¿Posible vender en cantidad decimal?": "No",
+        "¿Controlarás el stock del producto?": "Si",
+        "Estado": np.where(rng.random(len(filas)) < 0.97, "Activo", "Inactivo"),
+        "Impuestos": "IVA",
+        "Variante": maestro["Variante"].to_numpy()[filas],
+        "¿permitirás ventas sin stock?": np.where(rng.random(len(filas)) < 0.8, "No", "Si"),
+        "Código de Barras": maestro["Código Barras"].to_numpy()[filas],
+        "SKU": maestro["SKU"].to_numpy()[filas],
+        "Marca": maestro["Marca"].to_numpy()[filas],
+        "Sucursales": " | ".join(SUCURSALES[:sucursales]),
+        "Fecha de creacion": creacion.strftime("%Y/%m/%d %H:%M:%S"),
+        "Estado Variante": "Activo",
+    })
+    catalogo["Variante"] = catalogo["Variante"].replace("", None)
+
+    es_pack = maestro["pack_de"].to_numpy() >= 0
+    completo = maestro[claves_producto.COL_PRODUCTO_COMPLETO].to_numpy()
+    hoja_packs = pd.DataFrame({
+        "Pack": completo[es_pack],
+        "Componente": completo[maestro["pack_de"].to_numpy()[es_pack]],
+        "Cantidad": maestro["unidades_pack"].to_numpy()[es_pack],
+    })
+    return catalogo, hoja_packs
+
+
+def escribir_excel(ruta, hojas):
+    with pd.ExcelWriter(ruta, engine="xlsxwriter") as libro:
+        for nombre, tabla in hojas.items():
+            tabla.to_excel(libro, sheet_name=nombre, index=False)
+
+
+# report.json del repositorio con las fuentes apuntando a los archivos generados
+def escribir_config(directorio):
+    with open(os.path.join(RAIZ, "report.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    config.pop("sucursales", None)
+    config["dataSource"]["filename"] = os.path.abspath(os.path.join(directorio, "ventas.csv"))
+    config.setdefault("catalogoProductos", {})["url"] = os.path.abspath(os.path.join(directorio, "catalogo.xlsx"))
+    config.setdefault("stock", {})["url"] = os.path.abspath(os.path.join(directorio, "stock.xlsx"))
+    with open(os.path.join(directorio, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=4)
+
+
+# Genera los cuatro archivos en directorio; devuelve sus rutas
+def generar(directorio, filas, productos=None, sucursales=2, dias=365, semilla=0, sep=","):
+    os.makedirs(directorio, exist_ok=True)
+    maestro = maestro_productos(productos or productos_para(filas), semilla)
+    rutas = {nombre: os.path.join(directorio, nombre) for nombre in ["ventas.csv", "stock.xlsx", "catalogo.xlsx", "report.json"]}
+    escribir_ventas(rutas["ventas.csv"], maestro, filas, dias, sucursales, semilla=semilla, sep=sep)
+    escribir_excel(rutas["stock.xlsx"], {"Stock Actual": tabla_stock(maestro, semilla)})
+    catalogo, hoja_packs = tabla_catalogo(maestro, sucursales, semilla)
+    escribir_excel(rutas["catalogo.xlsx"], {"Sheet1": catalogo, "Packs": hoja_packs})
+    escribir_config(directorio)
+    return rutas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera ventas, stock y catálogo sintéticos con el formato de Bsale.")
+    parser.add_argument("filas", type=int, help="filas de ventas (p. ej. 10000 a 10000000)")
+    parser.add_argument("directorio", nargs="?", default="datos_sinteticos")
+    parser.add_argument("--productos", type=int, help="productos distintos (por defecto según las filas)")
+    parser.add_argument("--sucursales", type=int, default=2, choices=range(1, len(SUCURSALES) + 1))
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sep", default=",")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    rutas = generar(args.directorio, args.filas, args.productos, args.sucursales, args.dias, args.semilla, args.sep)
+    print(f"{args.filas:,} filas de ventas, {args.productos or productos_para(args.filas):,} productos "
+          f"en {time.perf_counter() - inicio:.1f} s")
+    for ruta in rutas.values():
+        print(f"  {ruta:50s} {os.path.getsize(ruta) / 1024 ** 2:8.1f} MB")
@@ -0,0 +1,209 @@
+import concurrent.futures
+import io
+import multiprocessing
+import os
+import threading
+import time
+
+import pandas as pd
+
+import claves_producto
+import ingesta
+import packs
+import snapshot
+
+HILOS_POR_DEFECTO = 4
+# Con una sola CPU el pool de procesos solo suma el costo de serializar los frames
+PROCESOS_POR_DEFECTO = max(min(2, (os.cpu_count() or 1) - 1), 0)
+
+
+# Se incrementa cuando cambian las columnas leídas o su tipo (invalida los snapshots de los Excel)
+VERSION_EXCEL = 2
+
+# Columnas de cada Excel que usa la app (subcadenas, sin distinguir mayúsculas); el resto no se carga.
+# Las tablas de duplicados de la pestaña 4 muestran la fila completa del catálogo: se cargan
+# todas las columnas del export de productos de Bsale, no solo las que se usan para cruzar.
+COLUMNAS_CATALOGO = (
+    "nombre", "variante", "sku", "código", "tipo de producto", "clasificación", "marca", "estado",
+    "impuestos", "sucursales", "fecha de creaci", "cantidad decimal", "controlarás el stock", "ventas sin stock",
+) + packs.COLUMNAS_COMPONENTE + packs.COLUMNAS_UNIDADES
+COLUMNAS_STOCK = (
+    "tipo de producto", "producto", "variante", "sku", "stock", "costo neto prom. unitario",
+    "cantidad por despachar", "cantidad disponible", "por recibir", "precio venta bruto",
+    "margen unitario", "marca",
+)
+
+
+# --- Lector rápido de Excel ---
+# calamine (python-calamine, en Rust) si está instalado; si no, openpyxl en modo solo lectura
+# recorriendo valores sin crear objetos celda. En ambos casos solo se conservan las columnas pedidas.
+def motor_excel():
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "openpyxl"
+
+
+def _usar(columna, columnas):
+    nombre = str(columna).strip().lower()
+    return any(clave in nombre for clave in columnas)
+
+
+def _leer_openpyxl(origen, usar):
+    import openpyxl
+
+    libro = openpyxl.load_workbook(origen, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        cabecera = next(filas, ())
+        indices = [i for i, c in enumerate(cabecera) if c is not None and (usar is None or usar(c))]
+        valores = {i: [] for i in indices}
+        for fila in filas:
+            for i in indices:
+                valor = fila[i] if i < len(fila) else None
+                # Celdas con texto vacío cuentan como vacías, igual que en pd.read_excel
+                valores[i].append(None if valor == "" else valor)
+    finally:
+        libro.close()
+    df = pd.DataFrame({str(cabecera[i]): valores[i] for i in indices})
+    return df.dropna(how="all").reset_index(drop=True).infer_objects()
+
+
+def leer_excel(origen, columnas=None, motor=None):
+    motor = motor or motor_excel()
+    usar = (lambda c: _usar(c, columnas)) if columnas else None
+    if motor == "calamine":
+        df = pd.read_excel(origen, engine="calamine", usecols=usar)
+    else:
+        df = _leer_openpyxl(origen, usar)
+    # El primer encabezado puede traer BOM (pandas lo quita al parsear, openpyxl no)
+    df.columns = df.columns.str.replace("\ufeff", "").str.strip()
+    # Columnas con valores de distinto tipo (números y textos): texto, para el snapshot columnar
+    for col in df.columns[df.dtypes == object]:
+        if df[col].dropna().map(type).nunique() > 1:
+            df[col] = df[col].astype(str)
+    return df
+
+
+# --- Parseo de los Excel (funciones de módulo: se importan en los procesos del pool) ---
+def leer_catalogo(origen):
+    df_cat = leer_excel(origen, COLUMNAS_CATALOGO)
+    col_nombre = next((c for c in df_cat.columns if "nombre" in c.lower()), None)
+    col_var = next((c for c in df_cat.columns if "variante" in c.lower()), None)
+    if col_nombre:
+        claves_producto.agregar_clave_producto(df_cat, col_nombre, col_var)
+    return df_cat
+
+
+def leer_stock(origen):
+    df_stock = leer_excel(origen, COLUMNAS_STOCK)
+    claves_producto.agregar_clave_producto(df_stock, 'Producto', 'Variante')
+    return df_stock
+
+
+def leer_packs(origen, df_catalogo):
+    try:
+        return packs.leer_mapeo(origen, df_catalogo, motor=motor_excel())
+    except Exception:
+        return packs.vacio()
+
+
+def _parsear(funcion, contenido, args):
+    return funcion(io.BytesIO(contenido), *args)
+
+
+# --- Carga concurrente de fuentes ---
+# Descargas (I/O) en un pool de hilos y parseo de Excel (CPU) en un pool de procesos: el arranque
+# en frío queda acotado por la fuente más lenta y no por la suma. Los procesos salen de un
+# forkserver (un proceso nuevo, con carga y openpyxl ya importados) y no de un fork del proceso
+# actual, que puede tener otros hilos con locks tomados. Cada proceso vuelve a ejecutar __main__,
+# que bajo Streamlit es el script de la app completo: la app usa procesos=0 y parsea en los hilos
+# (calamine suelta el GIL mientras lee el libro). Sin forkserver (Windows) también se usan los hilos.
+class CargadorFuentes:
+    def __init__(self, hilos=HILOS_POR_DEFECTO, procesos=PROCESOS_POR_DEFECTO):
+        self.hilos = concurrent.futures.ThreadPoolExecutor(hilos, thread_name_prefix="carga-fuentes")
+        self.procesos = None
+        if procesos and "forkserver" in multiprocessing.get_all_start_methods():
+            contexto = multiprocessing.get_context("forkserver")
+            contexto.set_forkserver_preload(["carga", "openpyxl"])
+            self.procesos = concurrent.futures.ProcessPoolExecutor(procesos, mp_context=contexto)
+        self.tiempos = {}
+        self.cerrojo = threading.Lock()
+
+    # Parseo de un Excel ya descargado; sin pool de procesos (o si se cayó) se parsea aquí
+    def parsear(self, funcion, contenido, *args):
+        if self.procesos is not None:
+            try:
+                return self.procesos.submit(_parsear, funcion, contenido, args).result()
+            except concurrent.futures.process.BrokenProcessPool:
+                self.procesos = None
+        return _parsear(funcion, contenido, args)
+
+    # Descarga + parseo de un Excel (contenido ya descargado: solo parseo), con tiempos por etapa.
+    # El resultado se guarda como snapshot columnar: mientras la fuente no cambie (mismo validador
+    # o mismo contenido) se lee el snapshot en vez de volver a parsear el Excel.
+    def excel(self, fuente, url, funcion, *args, contenido=None, validador=None):
+        inicio = time.perf_counter()
+        clave = f"{url}#{funcion.__name__}.{VERSION_EXCEL}"
+        if contenido is None:
+            validador = snapshot.validador_fuente(url)
+            df = snapshot.tabla_vigente(clave, validador=validador)
+            if df is not None:
+                self.registrar_tiempo(fuente, inicio, origen="snapshot")
+                return df
+            contenido = ingesta.leer_bytes(url)
+        descarga = time.perf_counter() - inicio
+        huella = snapshot.hash_contenido(contenido)
+        df = snapshot.tabla_vigente(clave, validador=validador, huella=huella)
+        origen = "snapshot"
+        if df is None:
+            df = self.parsear(funcion, contenido, *args)
+            snapshot.guardar_tabla(clave, df, validador, huella)
+            origen = motor_excel()
+        self.registrar_tiempo(fuente, inicio, descarga, len(contenido), origen)
+        return df
+
+    # descarga None: la fuente no separa descarga de parseo (ventas, que puede venir del snapshot)
+    def registrar_tiempo(self, fuente, inicio, descarga=None, tamano=None, origen=None):
+        fin = time.perf_counter()
+        with self.cerrojo:
+            self.tiempos[fuente] = {
+                "Fuente": fuente,
+                "Origen": origen or "",
+                "Descarga (s)": descarga,
+                "Parseo (s)": fin - inicio - (descarga or 0.0),
+                "Total (s)": fin - inicio,
+                "MB": tamano / 1024 ** 2 if tamano is not None else None,
+                "inicio": inicio,
+                "fin": fin,
+            }
+
+    # Lanza las tareas {nombre: función sin argumentos} en el pool de hilos sin esperar
+    def lanzar(self, tareas):
+        return {nombre: self.hilos.submit(tarea) for nombre, tarea in tareas.items()}
+
+    # Para el panel de depuración: la carga más reciente de cada fuente
+    def estadisticas(self):
+        with self.cerrojo:
+            return [{k: v for k, v in t.items() if k not in ("inicio", "fin")} for t in self.tiempos.values()]
+
+    # Último grupo de cargas solapadas en el tiempo: (tiempo de pared, suma de los tiempos de cada fuente)
+    def arranque(self):
+        with self.cerrojo:
+            tiempos = sorted(self.tiempos.values(), key=lambda t: t["inicio"])
+        grupo, fin = [], None
+        for t in tiempos:
+            if fin is None or t["inicio"] > fin:
+                grupo, fin = [], t["fin"]
+            grupo.append(t)
+            fin = max(fin, t["fin"])
+        if not grupo:
+            return 0.0, 0.0
+        return fin - grupo[0]["inicio"], sum(t["Total (s)"] for t in grupo)
+
+    # esperar=True: vuelve con los hilos y procesos del cargador ya terminados
+    def cerrar(self, esperar=False):
+        self.hilos.shutdown(wait=esperar)
+        if self.procesos is not None:
+            self.procesos.shutdown(wait=esperar)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+# ABC por participación acumulada: A hasta el 70% del total, B hasta el 90%, C el resto
+CLASES_ABC = np.array(["A", "B", "C"])
+UMBRALES_ABC = (0.7, 0.9)
+
+# XYZ por variabilidad de la demanda mensual (coeficiente de variación de las unidades):
+# X estable (CV <= 0.5), Y variable (<= 1), Z errática o sin ventas
+CLASES_XYZ = np.array(["X", "Y", "Z"])
+UMBRALES_XYZ = (0.5, 1.0)
+
+COL_CV = "CV demanda"
+COL_XYZ = "XYZ"
+COL_ABC_XYZ = "ABC-XYZ"
+COL_MARGEN_UNIDAD = "Margen por Unidad"
+
+
+def col_porcentaje(metrica):
+    return f"% Acum. {metrica}"
+
+
+def col_clase(metrica):
+    return f"ABC {metrica}"
+
+
+# --- ABC de una métrica para todos los grupos a la vez ---
+# Orden (grupo, valor descendente) con un solo lexsort; el acumulado por grupo es el cumsum
+# global menos el acumulado al inicio de cada grupo. Devuelve (porcentaje acumulado, clase)
+# alineados con la entrada.
+def abc(valores, grupo, umbrales=UMBRALES_ABC):
+    valores = np.nan_to_num(np.asarray(valores, dtype=float))
+    grupo = np.asarray(grupo, dtype=np.int64)
+    orden = np.lexsort((-valores, grupo))
+    v = valores[orden]
+    g = grupo[orden]
+
+    acumulado = np.cumsum(v)
+    inicio = np.r_[True, g[1:] != g[:-1]] if len(g) else np.zeros(0, dtype=bool)
+    primera = np.maximum.accumulate(np.where(inicio, np.arange(len(v)), 0))
+    acumulado -= np.r_[0.0, acumulado][primera]
+    total = np.bincount(g, weights=v)[g] if len(g) else np.zeros(0)
+
+    # Grupos con total <= 0 (p. ej. margen negativo) quedan en C
+    porcentaje = np.divide(acumulado, total, out=np.full(len(v), np.nan), where=total > 0)
+    clase = np.searchsorted(np.asarray(umbrales), np.nan_to_num(porcentaje, nan=np.inf), side="left")
+
+    salida_porcentaje = np.empty(len(v))
+    salida_clase = np.empty(len(v), dtype=np.int8)
+    salida_porcentaje[orden] = porcentaje
+    salida_clase[orden] = np.minimum(clase, len(umbrales))
+    return salida_porcentaje, salida_clase
+
+
+# --- XYZ: coeficiente de variación de la demanda por período ---
+# suma y suma de cuadrados por fila con bincount; los períodos sin ventas cuentan como cero
+def xyz(fila, cantidades, n_filas, n_periodos, umbrales=UMBRALES_XYZ):
+    cantidades = np.nan_to_num(np.asarray(cantidades, dtype=float))
+    n_periodos = max(n_periodos, 1)
+    media = np.bincount(fila, weights=cantidades, minlength=n_filas) / n_periodos
+    cuadrados = np.bincount(fila, weights=cantidades ** 2, minlength=n_filas) / n_periodos
+    desviacion = np.sqrt(np.maximum(cuadrados - media ** 2, 0.0))
+    cv = np.divide(desviacion, media, out=np.full(n_filas, np.inf), where=media > 0)
+    clase = np.searchsorted(np.asarray(umbrales), cv, side="left")
+    return cv, np.minimum(clase, len(umbrales)).astype(np.int8)
+
+
+# --- Clasificación completa sobre el detalle agregado (cubo) ---
+# Una sola agrupación (grupos + producto + período) de la que salen los totales por producto y
+# la demanda por período; luego ABC para cada métrica y XYZ, todo vectorizado por grupo.
+# n_periodos: períodos del rango consultado (sin los demás filtros), para que los meses sin ventas
+# del detalle filtrado cuenten como demanda cero; por defecto los períodos presentes en el detalle.
+# Con menos de dos períodos no hay variabilidad que medir y la tabla sale sin XYZ.
+def clasificar(detalle, col_producto, metricas, grupos=(), col_periodo=None, col_cantidad="Cantidad",
+               umbrales_abc=UMBRALES_ABC, umbrales_xyz=UMBRALES_XYZ, n_periodos=None):
+    grupos = [g for g in grupos if g]
+    claves = grupos + [col_producto]
+    valores = list(dict.fromkeys(list(metricas) + [col_cantidad]))
+    por = claves + ([col_periodo] if col_periodo else [])
+
+    por_periodo = detalle.groupby(por, observed=True, sort=False)[valores].sum()
+    fila, unicos = pd.MultiIndex.from_frame(por_periodo.index.to_frame(index=False)[claves]).factorize()
+    tabla = unicos.to_frame(index=False, name=claves)
+    for col in valores:
+        tabla[col] = np.bincount(fila, weights=np.nan_to_num(por_periodo[col].to_numpy(dtype=float)), minlength=len(tabla))
+
+    if grupos:
+        grupo = pd.MultiIndex.from_frame(tabla[grupos]).factorize()[0]
+    else:
+        grupo = np.zeros(len(tabla), dtype=np.int64)
+
+    for metrica in metricas:
+        porcentaje, clase = abc(tabla[metrica].to_numpy(), grupo, umbrales_abc)
+        tabla[col_porcentaje(metrica)] = porcentaje
+        tabla[col_clase(metrica)] = pd.Categorical.from_codes(clase, categories=CLASES_ABC)
+
+    if col_periodo and n_periodos is None:
+        n_periodos = por_periodo.index.get_level_values(col_periodo).nunique()
+    if col_periodo and n_periodos >= 2:
+        cv, clase = xyz(fila, por_periodo[col_cantidad].to_numpy(), len(tabla), n_periodos, umbrales_xyz)
+        tabla[COL_CV] = cv
+        tabla[COL_XYZ] = pd.Categorical.from_codes(clase, categories=CLASES_XYZ)
+
+    if "Margen Neto" in tabla.columns:
+        cantidad = tabla[col_cantidad].to_numpy()
+        tabla[COL_MARGEN_UNIDAD] = np.divide(
+            tabla["Margen Neto"].to_numpy(), cantidad, out=np.zeros(len(tabla)), where=cantidad > 0
+        )
+
+    # Presentación: por grupo y de mayor a menor en la primera métrica
+    orden = np.lexsort((-tabla[metricas[0]].to_numpy(), grupo))
+    return tabla.iloc[orden].reset_index(drop=True)
+
+
+# ABC de una métrica combinada con XYZ ("AX", "BZ", ...)
+def combinar_abc_xyz(tabla, metrica):
+    return tabla[col_clase(metrica)].astype(str) + tabla[COL_XYZ].astype(str)
+
+
+# Matriz ABC × XYZ: cantidad de productos y participación en la métrica
+def matriz_abc_xyz(tabla, metrica):
+    productos = pd.crosstab(tabla[col_clase(metrica)], tabla[COL_XYZ], dropna=False)
+    valor = pd.crosstab(tabla[col_clase(metrica)], tabla[COL_XYZ], values=tabla[metrica], aggfunc="sum", dropna=False)
+    total = tabla[metrica].sum()
+    participacion = valor.fillna(0) / total if total else valor.fillna(0) * 0
+    # Ejes como texto: los índices categóricos no viajan bien a Arrow (st.dataframe)
+    for matriz in (productos, participacion):
+        matriz.index = matriz.index.astype(str)
+        matriz.columns = matriz.columns.astype(str)
+    return productos, participacion
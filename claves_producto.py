@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+COL_PRODUCTO_COMPLETO = "Producto Completo"
+COL_ID_PRODUCTO = "ID Producto"
+
+
+# Texto "PRODUCTO (VARIANTE)" en mayúsculas; sin variante queda solo el producto
+def _texto_producto(producto, variante):
+    producto = pd.Series(producto, dtype=object)
+    if variante is None:
+        texto = producto
+    else:
+        variante = pd.Series(variante, dtype=object)
+        var_limpia = variante.where(variante.isna(), variante.astype(str).str.strip())
+        con_variante = var_limpia.notna() & (var_limpia != "")
+        texto = producto.where(~con_variante, producto.astype(str) + " (" + var_limpia + ")")
+    return texto.str.upper().str.strip()
+
+
+# --- Clave "Producto Completo" vectorizada ---
+# Se arma una sola vez por par (producto, variante) distinto y se expande por código,
+# devolviendo una columna categórica.
+def producto_completo(producto, variante=None):
+    producto = pd.Series(producto)
+    cod_prod, unicos_prod = pd.factorize(producto, use_na_sentinel=False)
+    if variante is None:
+        codigos = cod_prod
+        textos = _texto_producto(unicos_prod, None)
+    else:
+        cod_var, unicos_var = pd.factorize(pd.Series(variante), use_na_sentinel=False)
+        combinado = cod_prod.astype(np.int64) * (len(unicos_var) + 1) + cod_var
+        codigos, pares = pd.factorize(combinado)
+        textos = _texto_producto(
+            np.asarray(unicos_prod, dtype=object)[pares // (len(unicos_var) + 1)],
+            np.asarray(unicos_var, dtype=object)[pares % (len(unicos_var) + 1)],
+        )
+
+    # Pares distintos pueden dar el mismo texto (mayúsculas/espacios): se unifican.
+    # Categorías ordenadas para que sort_values ordene alfabéticamente.
+    cod_texto, categorias = pd.factorize(textos, sort=True)
+    cod_final = cod_texto[codigos] if len(codigos) else codigos
+    return pd.Series(
+        pd.Categorical.from_codes(cod_final, categories=categorias),
+        index=producto.index,
+        name=COL_PRODUCTO_COMPLETO,
+    )
+
+
+# ID entero estable (hash del nombre normalizado): igual en ventas, stock y catálogo
+def id_producto(completo):
+    completo = pd.Series(completo)
+    if isinstance(completo.dtype, pd.CategoricalDtype):
+        hashes = pd.util.hash_array(np.asarray(completo.cat.categories, dtype=object))
+        codigos = completo.cat.codes.to_numpy()
+        ids = np.where(codigos >= 0, hashes.take(np.maximum(codigos, 0)), 0).astype(np.uint64)
+    else:
+        valores = completo.to_numpy(dtype=object)
+        ids = pd.util.hash_array(valores)
+        ids[completo.isna().to_numpy()] = 0
+    return pd.Series(ids, index=completo.index, name=COL_ID_PRODUCTO)
+
+
+# --- Agrega clave e ID a un frame (ventas, stock o catálogo) ---
+def agregar_clave_producto(df, col_producto, col_variante=None):
+    if col_producto not in df.columns:
+        return df
+    variante = df[col_variante] if col_variante and col_variante in df.columns else None
+    df[COL_PRODUCTO_COMPLETO] = producto_completo(df[col_producto], variante)
+    df[COL_ID_PRODUCTO] = id_producto(df[COL_PRODUCTO_COMPLETO])
+    return df
@@ -0,0 +1,314 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+# Estados del cruce ventas -> catálogo
+EXACTO = "Exacto"
+PROBABLE = "Probable"
+NO_REGISTRADO = "No registrado"
+
+UMBRAL_PROBABLE = 0.6      # similitud (Dice sobre trigramas) mínima para proponer un candidato
+UMBRAL_DUPLICADO = 0.85    # similitud mínima entre dos productos del catálogo para agruparlos
+SIMILITUD_PALABRA = 0.75   # parecido mínimo (difflib) entre palabras distintas de dos duplicados
+TAM_NGRAMA = 3
+MAX_CANDIDATOS = 16            # candidatos que se puntúan exactamente por consulta
+PRESUPUESTO_POSTINGS = 2000    # filas del índice invertido que recorre cada consulta (bloqueo)
+TAM_BLOQUE = 2048              # consultas que se resuelven juntas (acota la memoria)
+
+UNIDADES = {
+    "L": "L", "LT": "L", "LTS": "L", "LITRO": "L", "LITROS": "L",
+    "CC": "ML", "ML": "ML",
+    "G": "G", "GR": "G", "GRS": "G", "GRAMOS": "G",
+    "KG": "KG", "KILO": "KG", "KILOS": "KG",
+}
+_RE_CANTIDAD = re.compile(r"(\d+(?:[.,]\d+)?)\s*(" + "|".join(sorted(UNIDADES, key=len, reverse=True)) + r")\b")
+_RE_NO_ALFANUM = re.compile(r"[^A-Z0-9.]+")
+_RE_PUNTO_SUELTO = re.compile(r"(?<!\d)\.|\.(?!\d)")
+_RE_NUMERO = re.compile(r"\d+(?:\.\d+)?[A-Z]*")
+
+
+def _cantidad(m):
+    numero = float(m.group(1).replace(",", "."))
+    return f" {numero:g}{UNIDADES[m.group(2)]} "
+
+
+# --- Normalización: sin tildes, mayúsculas, "1,5 LT" == "1.5L", "500 CC" == "500ML", sin signos ---
+def normalizar(texto):
+    if not isinstance(texto, str):
+        return ""
+    if not texto.isascii():
+        texto = unicodedata.normalize("NFKD", texto)
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = texto.upper()
+    texto = _RE_CANTIDAD.sub(_cantidad, texto)
+    texto = _RE_PUNTO_SUELTO.sub(" ", _RE_NO_ALFANUM.sub(" ", texto))
+    return " ".join(texto.split())
+
+
+# Normaliza solo los valores distintos (los nombres se repiten mucho)
+def normalizar_serie(serie):
+    codigos, valores = pd.factorize(pd.Series(serie, dtype=object))
+    normalizados = np.array([normalizar(v) for v in valores] + [""], dtype=object)
+    return normalizados[codigos]
+
+
+def normalizar_sku(serie):
+    return pd.Series(serie, dtype=object).astype("string").str.strip().str.upper().str.lstrip("0").fillna("").to_numpy(dtype=object)
+
+
+# Trigramas por token (con relleno): no dependen del orden de las palabras
+def ngramas(normalizado):
+    grams = set()
+    for token in normalizado.split():
+        token = f" {token} "
+        for i in range(max(len(token) - TAM_NGRAMA + 1, 1)):
+            grams.add(token[i:i + TAM_NGRAMA])
+    return grams
+
+
+# Pares de palabras sin orden ("CORONA|LATA"): como claves de bloqueo son mucho más
+# selectivos que los trigramas cuando el catálogo combina pocas palabras
+def pares_tokens(normalizado):
+    tokens = sorted(set(normalizado.split()))
+    return {f"{a}|{b}" for i, a in enumerate(tokens) for b in tokens[i + 1:]}
+
+
+# Dos nombres normalizados son el mismo producto escrito distinto si las palabras que no comparten
+# son errores de tipeo de otra ("CPEL" / "CAPEL") o juntas forman lo mismo ("SIN AZUCAR" / "SINAZUCAR").
+# Una palabra que no se parece a ninguna del otro nombre ("CHOKITO" / "CLASSIC") es otro producto.
+def misma_escritura(a, b):
+    tokens_a, tokens_b = a.split(), b.split()
+    solo_a = [t for t in tokens_a if t not in set(tokens_b)]
+    solo_b = [t for t in tokens_b if t not in set(tokens_a)]
+    if "".join(solo_a) == "".join(solo_b):
+        return True
+    if not solo_a or not solo_b:
+        return False
+    def parecida(t, otras):
+        return any(SequenceMatcher(None, t, o).ratio() >= SIMILITUD_PALABRA for o in otras)
+    return all(parecida(t, solo_b) for t in solo_a) and all(parecida(t, solo_a) for t in solo_b)
+
+
+# Claves de varios nombres en formato plano (primero los trigramas de cada nombre, luego sus pares),
+# con el total de claves y de trigramas por nombre
+def _claves_planas(normalizados):
+    grams = [ngramas(n) for n in normalizados]
+    pares = [pares_tokens(n) for n in normalizados]
+    n_ngramas = np.fromiter((len(g) for g in grams), dtype=np.int64, count=len(grams))
+    largos = n_ngramas + np.fromiter((len(p) for p in pares), dtype=np.int64, count=len(pares))
+    planos = [c for g, p in zip(grams, pares) for c in (*g, *p)]
+    return planos, largos, n_ngramas
+
+
+# Posiciones de varios rangos [inicio, inicio + largo) concatenados
+def _expandir_rangos(inicios, largos):
+    total = int(largos.sum())
+    desplazamiento = np.repeat(inicios - (np.cumsum(largos) - largos), largos)
+    return np.arange(total) + desplazamiento
+
+
+# --- Índice del catálogo: nombres normalizados exactos + índice invertido de trigramas ---
+class IndiceCatalogo:
+    def __init__(self, nombres, skus=None):
+        self.nombres = np.asarray(pd.Series(nombres, dtype=object).fillna(""), dtype=object)
+        self.normalizados = normalizar_serie(self.nombres)
+        # Primera fila de cada nombre normalizado (búsqueda exacta vectorizada)
+        exactos = pd.Series(np.arange(len(self.nombres)), index=self.normalizados)
+        self.exactos = exactos[~exactos.index.duplicated()]
+        self.exactos = self.exactos[self.exactos.index != ""]
+        self.skus = None
+        if skus is not None:
+            por_sku = pd.Series(np.arange(len(self.nombres)), index=normalizar_sku(skus))
+            por_sku = por_sku[~por_sku.index.duplicated()]
+            self.skus = por_sku[por_sku.index != ""]
+
+        # Matriz fila × clave en CSR: ids de las claves de cada fila, primero sus trigramas
+        # (la similitud se mide solo sobre trigramas) y después sus pares de palabras
+        planos, largos, self.n_ngramas = _claves_planas(self.normalizados)
+        ids, vocabulario = pd.factorize(pd.Series(planos, dtype=object))
+        self.vocabulario = pd.Index(vocabulario)
+        self.largos = largos
+        self.punteros = np.concatenate([[0], np.cumsum(largos)])
+        self.ids = ids.astype(np.int32)
+        filas = np.repeat(np.arange(len(self.nombres), dtype=np.int32), largos)
+
+        # Índice invertido (clave -> filas) con la misma técnica de filtros.py
+        orden = np.argsort(self.ids, kind="stable")
+        self.postings = filas[orden]
+        conteos = np.bincount(self.ids, minlength=len(self.vocabulario))
+        self.cortes = np.concatenate([[0], np.cumsum(conteos)])
+        self.frecuencia = conteos
+
+    def __len__(self):
+        return len(self.nombres)
+
+    # Claves de varias consultas en formato plano: (consulta, id de clave) y cuántos trigramas tiene cada una
+    def _claves_consultas(self, normalizados):
+        planos, largos, n_ngramas = _claves_planas(normalizados)
+        ids = self.vocabulario.get_indexer(planos).astype(np.int64)
+        consulta = np.repeat(np.arange(len(largos)), largos)
+        conocidos = ids >= 0
+        return consulta[conocidos], ids[conocidos], n_ngramas
+
+    # Las filas [desde, hasta) del propio catálogo como consultas (sin volver a generar sus claves)
+    def _claves_filas(self, desde, hasta):
+        consulta = np.repeat(np.arange(hasta - desde), self.largos[desde:hasta])
+        ids = self.ids[self.punteros[desde]:self.punteros[hasta]].astype(np.int64)
+        return consulta, ids, self.n_ngramas[desde:hasta]
+
+    # Candidatos de un bloque de consultas: pares (consulta, fila) con su similitud
+    def _candidatos_bloque(self, consulta, ids, n_consulta, presupuesto=PRESUPUESTO_POSTINGS):
+        if len(ids) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([])
+
+        # Bloqueo: por consulta, sus claves más raras hasta agotar un presupuesto de postings
+        frecuencia = self.frecuencia[ids]
+        orden = np.lexsort((frecuencia, consulta))
+        consulta, ids, frecuencia = consulta[orden], ids[orden], frecuencia[orden]
+        acumulado = np.cumsum(frecuencia)
+        inicio_grupo = np.r_[0, np.flatnonzero(np.diff(consulta)) + 1]
+        previo = acumulado - frecuencia
+        previo -= np.repeat(previo[inicio_grupo], np.diff(np.r_[inicio_grupo, len(consulta)]))
+        usar = previo < presupuesto
+        c_sel, g_sel = consulta[usar], ids[usar]
+
+        # Candidatos: filas que comparten claves raras, contadas por par (consulta, fila)
+        pos = _expandir_rangos(self.cortes[g_sel], self.frecuencia[g_sel])
+        n = len(self.nombres)
+        pares, compartidos = np.unique(np.repeat(c_sel, self.frecuencia[g_sel]) * n + self.postings[pos], return_counts=True)
+        c_par, fila_par = pares // n, pares % n
+        # Se descartan los que comparten menos de la mitad de claves que el mejor de su consulta
+        # y de los que quedan, los MAX_CANDIDATOS con más claves raras en común
+        inicio_grupo = np.r_[0, np.flatnonzero(np.diff(c_par)) + 1]
+        maximo = np.maximum.reduceat(compartidos, inicio_grupo)
+        cerca = 2 * compartidos >= np.repeat(maximo, np.diff(np.r_[inicio_grupo, len(c_par)]))
+        c_par, fila_par, compartidos = c_par[cerca], fila_par[cerca], compartidos[cerca]
+        orden = np.lexsort((-compartidos, c_par))
+        c_par, fila_par = c_par[orden], fila_par[orden]
+        inicio_grupo = np.r_[0, np.flatnonzero(np.diff(c_par)) + 1]
+        rango = np.arange(len(c_par)) - np.repeat(inicio_grupo, np.diff(np.r_[inicio_grupo, len(c_par)]))
+        c_par, fila_par = c_par[rango < MAX_CANDIDATOS], fila_par[rango < MAX_CANDIDATOS]
+
+        # Puntaje exacto (Dice) sobre todos los trigramas de cada candidato
+        claves_consulta = np.unique(consulta * len(self.vocabulario) + ids)
+        pos = _expandir_rangos(self.punteros[fila_par], self.n_ngramas[fila_par])
+        par = np.repeat(np.arange(len(c_par)), self.n_ngramas[fila_par])
+        claves = np.repeat(c_par, self.n_ngramas[fila_par]) * len(self.vocabulario) + self.ids[pos]
+        en_consulta = claves_consulta[np.minimum(np.searchsorted(claves_consulta, claves), len(claves_consulta) - 1)] == claves
+        comunes = np.bincount(par, weights=en_consulta, minlength=len(c_par))
+        dice = 2.0 * comunes / np.maximum(n_consulta[c_par] + self.n_ngramas[fila_par], 1)
+        return c_par, fila_par, dice
+
+    # Mejor candidato de un bloque de consultas normalizadas: (filas, similitud); fila -1 sin candidato
+    def _mejores_bloque(self, normalizados):
+        mejor = np.full(len(normalizados), -1, dtype=np.int64)
+        puntaje = np.zeros(len(normalizados))
+        c_par, fila_par, dice = self._candidatos_bloque(*self._claves_consultas(normalizados))
+        if len(c_par) == 0:
+            return mejor, puntaje
+
+        # Mejor por consulta (empates: la primera fila del catálogo)
+        orden = np.lexsort((fila_par, -dice, c_par))
+        primero = orden[np.r_[True, np.diff(c_par[orden]) != 0]]
+        mejor[c_par[primero]] = fila_par[primero]
+        puntaje[c_par[primero]] = dice[primero]
+        return mejor, puntaje
+
+    def mejores_candidatos(self, normalizados):
+        mejor = np.full(len(normalizados), -1, dtype=np.int64)
+        puntaje = np.zeros(len(normalizados))
+        for desde in range(0, len(normalizados), TAM_BLOQUE):
+            bloque = slice(desde, desde + TAM_BLOQUE)
+            mejor[bloque], puntaje[bloque] = self._mejores_bloque(normalizados[bloque])
+        return mejor, puntaje
+
+    def mejor_candidato(self, normalizado):
+        mejor, puntaje = self.mejores_candidatos([normalizado])
+        return int(mejor[0]), float(puntaje[0])
+
+    # --- Cruce de productos vendidos contra el catálogo ---
+    # Exacto por nombre normalizado o SKU (vectorizado); el resto por similitud de trigramas.
+    def resolver(self, consultas, skus=None, umbral=UMBRAL_PROBABLE):
+        consultas = np.asarray(pd.Series(consultas, dtype=object).fillna(""), dtype=object)
+        normalizados = normalizar_serie(consultas)
+        fila = self.exactos.reindex(normalizados).to_numpy(dtype=float, copy=True)
+        via = np.where(np.isnan(fila), "", "nombre").astype(object)
+        if skus is not None and self.skus is not None:
+            por_sku = self.skus.reindex(normalizar_sku(skus)).to_numpy(dtype=float)
+            usar_sku = np.isnan(fila) & ~np.isnan(por_sku)
+            fila[usar_sku] = por_sku[usar_sku]
+            via[usar_sku] = "SKU"
+        puntaje = np.where(np.isnan(fila), 0.0, 1.0)
+
+        # Similitud: una vez por nombre normalizado distinto
+        pendientes = np.isnan(fila)
+        distintos, inversa = np.unique(normalizados[pendientes], return_inverse=True)
+        mejores, puntajes = self.mejores_candidatos(distintos)
+        fila[pendientes] = np.where(mejores >= 0, mejores, np.nan)[inversa]
+        puntaje[pendientes] = puntajes[inversa]
+        via[pendientes] = "similitud"
+
+        estado = np.where(via == "similitud", np.where(puntaje >= umbral, PROBABLE, NO_REGISTRADO), EXACTO)
+        tiene = ~np.isnan(fila)
+        candidato = np.full(len(consultas), None, dtype=object)
+        candidato[tiene] = self.nombres[fila[tiene].astype(np.int64)]
+        return pd.DataFrame({
+            "Producto vendido": consultas,
+            "Candidato en catálogo": candidato,
+            "Similitud": puntaje.round(3),
+            "Estado": estado,
+            "Coincidencia por": via,
+        })
+
+    # --- Casi duplicados dentro del catálogo ---
+    # El catálogo se cruza consigo mismo usando el mismo bloqueo (sin comparar todos los pares).
+    # Un par es duplicado probable si su similitud supera el umbral, sus números (formato,
+    # graduación: "1.5L", "470ML", "35") coinciden y las palabras que cambian son errores de
+    # tipeo (misma_escritura); los pares se agrupan en componentes conexas.
+    # Devuelve fila del catálogo, grupo (1 = el más grande) y mejor similitud dentro del grupo.
+    def casi_duplicados(self, umbral=UMBRAL_DUPLICADO, presupuesto=PRESUPUESTO_POSTINGS):
+        n = len(self.nombres)
+        origen, destino, similitud = [], [], []
+        for desde in range(0, n, TAM_BLOQUE):
+            c_par, fila_par, dice = self._candidatos_bloque(*self._claves_filas(desde, min(desde + TAM_BLOQUE, n)), presupuesto)
+            c_par = c_par + desde
+            valido = (c_par != fila_par) & (dice >= umbral)
+            origen.append(np.minimum(c_par, fila_par)[valido])
+            destino.append(np.maximum(c_par, fila_par)[valido])
+            similitud.append(dice[valido])
+        origen, destino, similitud = np.concatenate(origen), np.concatenate(destino), np.concatenate(similitud)
+
+        numeros, _ = pd.factorize(pd.Series([" ".join(sorted(_RE_NUMERO.findall(t))) for t in self.normalizados], dtype=object))
+        mismos = numeros[origen] == numeros[destino]
+        origen, destino, similitud = origen[mismos], destino[mismos], similitud[mismos]
+        # Solo quedan pocos pares: se revisan palabra a palabra
+        mismos = np.array([misma_escritura(self.normalizados[i], self.normalizados[j]) for i, j in zip(origen, destino)], dtype=bool)
+        origen, destino, similitud = origen[mismos], destino[mismos], similitud[mismos]
+
+        grupo = _componentes(n, origen, destino)
+        mejor = np.zeros(n)
+        np.maximum.at(mejor, origen, similitud)
+        np.maximum.at(mejor, destino, similitud)
+
+        filas = np.flatnonzero(mejor > 0)
+        tam = np.bincount(grupo[filas], minlength=n)
+        # Grupos numerados de mayor a menor tamaño
+        orden = np.lexsort((filas, grupo[filas], -tam[grupo[filas]]))
+        filas = filas[orden]
+        _, numero = np.unique(-tam[grupo[filas]] * n + grupo[filas], return_inverse=True)
+        return pd.DataFrame({"fila": filas, "Grupo": numero + 1, "Similitud": mejor[filas].round(3)})
+
+
+# Componentes conexas de un grafo (n nodos, aristas origen-destino) por propagación del mínimo
+def _componentes(n, origen, destino):
+    etiqueta = np.arange(n)
+    while True:
+        anterior = etiqueta.copy()
+        np.minimum.at(etiqueta, origen, etiqueta[destino])
+        np.minimum.at(etiqueta, destino, etiqueta[origen])
+        etiqueta = etiqueta[etiqueta]
+        if np.array_equal(etiqueta, anterior):
+            return etiqueta
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+import indice_fechas
+import packs
+from claves_producto import COL_PRODUCTO_COMPLETO
+
+# Categorías de stock que entran en la cuadratura
+CATEGORIAS_CLAVE = [
+    'DESTILADOS', 'AGUAS. JUGOS Y TE HELADO', 'BEBIDAS',
+    'CERVEZAS', 'VINOS', 'TABAQUERIA', 'LICORES',
+    'ENERGETICAS E ISOTONICAS', 'ESPUMANTES'
+]
+
+MESES = {
+    1: "enero", 2: "febrero", 3: "marzo", 4: "abril",
+    5: "mayo", 6: "junio", 7: "julio", 8: "agosto",
+    9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre"
+}
+
+COL_STOCK = "Stock"
+COL_COSTO = "Costo Neto Prom. Unitario"
+COL_PACK = "Es Pack"
+COL_DISPONIBLE = "Cantidad Disponible"
+COL_VALOR = "Valor en Stock (Costo Total)"
+COL_ALERTA = "Alerta"
+
+ALERTA_SIN_VENTAS = "❗ Sin ventas"
+ALERTA_BAJO_STOCK = "⚠️ Bajo Stock"
+
+# Columnas que se suman en el resumen por categoría
+PALABRAS_RESUMEN = ['stock', 'cantidad por despachar', 'cantidad disponible', 'por recibir', 'valor en stock (costo total)', 'vendidas en packs']
+
+
+# --- Limpieza numérica: "$1.234,5" -> 1234.5; números quedan igual; vacíos o inválidos -> 0 ---
+def limpiar_numero(serie):
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.fillna(0)
+    # .str devuelve NaN en los elementos que no son texto: así se separan textos de números
+    es_texto = serie.str.len().notna().to_numpy()
+    texto = (serie.where(es_texto).astype("string")
+             .str.replace("$", "", regex=False)
+             .str.replace(".", "", regex=False)
+             .str.replace(",", ".", regex=False)
+             .str.strip())
+    desde_texto = pd.to_numeric(texto, errors="coerce").astype(float).fillna(0).to_numpy()
+    numeros = pd.to_numeric(serie.where(~es_texto), errors="coerce").astype(float).fillna(0).to_numpy()
+    return pd.Series(np.where(es_texto, desde_texto, numeros), index=serie.index)
+
+
+# Productos PACK (no tienen stock propio): se decide una vez por categoría si es categórica
+def es_pack(productos):
+    if isinstance(productos.dtype, pd.CategoricalDtype):
+        packs = productos.cat.categories.astype(str).str.contains("PACK", regex=False)
+        codigos = productos.cat.codes.to_numpy()
+        # Código -1 (nulo) toma el False agregado al final
+        return pd.Series(np.append(packs, False)[codigos], index=productos.index)
+    return productos.astype("string").str.contains("PACK", regex=False).fillna(False).astype(bool)
+
+
+def filtrar_categorias(df_stock, col_categoria, seleccion=None):
+    df_stock = df_stock[df_stock[col_categoria].str.upper().isin(CATEGORIAS_CLAVE)]
+    if seleccion and seleccion != "Todas":
+        df_stock = df_stock[df_stock[col_categoria] == seleccion]
+    return df_stock
+
+
+# --- Rango de ventas acumuladas: desde el mes elegido del primer año hasta el último mes con ventas ---
+# Sobre el índice de fechas (indice_fechas.IndiceFechas): primera y última fecha y meses con
+# ventas salen por búsqueda binaria. Sin fechas válidas no hay rango: None
+def rango_fechas(indice, mes_desde):
+    if not indice.n_validas:
+        return None
+    mes_max = max(m.month for m in indice.meses())
+    fecha_inicio = pd.Timestamp(year=indice.primera().year, month=mes_desde, day=1)
+    fecha_fin = (pd.Timestamp(year=indice.ultima().year, month=mes_max, day=1) + pd.offsets.MonthBegin(1)) - pd.Timedelta(days=1)
+    return fecha_inicio, fecha_fin, mes_max
+
+
+def titulo_ventas(mes_desde, mes_max):
+    return f"Vendidas desde {MESES[mes_desde]} hasta {MESES.get(mes_max, 'mes desconocido')}"
+
+
+# en_rango: las ventas del período (un slice del índice de fechas)
+def ventas_por_producto(en_rango, col_ventas, col_cantidad="Cantidad"):
+    por_producto = en_rango.groupby(COL_PRODUCTO_COMPLETO, observed=True)[col_cantidad].sum().reset_index()
+    por_producto.columns = [COL_PRODUCTO_COMPLETO, col_ventas]
+    return por_producto
+
+
+# --- Cuadratura: stock + ventas del periodo, disponibilidad, alertas y resumen en una pasada ---
+# Todas las columnas calculadas son numéricas; los PACK quedan marcados en COL_PACK.
+# Sin mapeo de packs su Cantidad Disponible es NaN (no aplica). Con una packs.MatrizPacks, las
+# ventas de packs descuentan unidades de sus componentes y la disponibilidad de cada pack es
+# la cantidad que se puede armar con lo disponible de sus componentes.
+def conciliar(df_stock, ventas_producto, col_ventas, col_categoria, matriz_packs=None):
+    cuadrado = pd.merge(df_stock, ventas_producto, on=COL_PRODUCTO_COMPLETO, how="left")
+    vendidas = cuadrado[col_ventas].fillna(0).to_numpy(dtype=float)
+    cuadrado[col_ventas] = vendidas
+
+    costo = limpiar_numero(cuadrado[COL_COSTO]).to_numpy(dtype=float) if COL_COSTO in cuadrado.columns else np.zeros(len(cuadrado))
+    stock = pd.to_numeric(cuadrado[COL_STOCK], errors="coerce").fillna(0).to_numpy(dtype=float)
+    pack = es_pack(cuadrado[COL_PRODUCTO_COMPLETO]).to_numpy(dtype=bool, copy=True)
+
+    en_packs = np.zeros(len(cuadrado))
+    pos_matriz = None
+    if matriz_packs is not None and len(matriz_packs):
+        # Ventas de todos los productos (no solo los del stock filtrado) expandidas a componentes
+        ventas_vector = matriz_packs.vector(ventas_producto[COL_PRODUCTO_COMPLETO], ventas_producto[col_ventas].to_numpy(dtype=float))
+        consumo = matriz_packs.expandir(ventas_vector)
+        pos_matriz = matriz_packs.posiciones(cuadrado[COL_PRODUCTO_COMPLETO])
+        en_matriz = pos_matriz >= 0
+        en_packs[en_matriz] = consumo[pos_matriz[en_matriz]]
+        pack |= en_matriz & matriz_packs.es_pack[np.maximum(pos_matriz, 0)]
+        cuadrado[packs.COL_VENDIDAS_EN_PACKS] = en_packs
+    vendidas_total = vendidas + en_packs
+
+    disponible = np.where(pack, np.nan, np.maximum(stock - vendidas_total, 0))
+    if pos_matriz is not None:
+        en_matriz = pos_matriz >= 0
+        disponible_matriz = np.full(len(matriz_packs.nombres), np.nan)
+        disponible_matriz[pos_matriz[en_matriz]] = disponible[en_matriz]
+        armables = matriz_packs.disponibles(disponible_matriz)
+        disponible[en_matriz] = np.where(pack[en_matriz], armables[pos_matriz[en_matriz]], disponible[en_matriz])
+
+    if COL_COSTO in cuadrado.columns:
+        cuadrado[COL_COSTO] = costo
+    cuadrado[COL_STOCK] = stock
+    cuadrado[COL_PACK] = pack
+    cuadrado[COL_DISPONIBLE] = disponible
+    cuadrado[COL_VALOR] = stock * costo
+
+    # Las alertas consideran también las unidades vendidas dentro de packs
+    sin_ventas = vendidas_total == 0
+    bajo_stock = (vendidas_total >= 20) & (stock < 5)
+    cuadrado[COL_ALERTA] = np.select([sin_ventas, bajo_stock], [ALERTA_SIN_VENTAS, ALERTA_BAJO_STOCK], "")
+
+    # Primero sin ventas, después bajo stock, el resto al final (orden estable)
+    orden = np.select([sin_ventas, bajo_stock], [0, 1], 2)
+    cuadrado = cuadrado.iloc[np.argsort(orden, kind="stable")].reset_index(drop=True)
+
+    columnas_resumen = [c for c in cuadrado.columns if any(p in c.lower() for p in PALABRAS_RESUMEN)]
+    resumen = None
+    if columnas_resumen:
+        # La disponibilidad de un pack son packs armables, no unidades: no entra en la suma
+        base = cuadrado.assign(**{COL_DISPONIBLE: cuadrado[COL_DISPONIBLE].where(~cuadrado[COL_PACK])})
+        resumen = base.groupby(col_categoria)[columnas_resumen].sum().reset_index()
+    return cuadrado, resumen
+
+
+# --- Flujo completo, usable fuera de Streamlit (p. ej. un proceso nocturno por sucursal) ---
+# Con packs se concilian todas las categorías clave (un pack y sus componentes pueden estar en
+# categorías distintas) y la categoría elegida se filtra al final.
+# ventas: ordenadas por fecha (el cubo de informes.construir_cubo)
+def cuadrar(df_stock, ventas, col_categoria, col_fecha, mes_desde=1, categoria=None, col_cantidad="Cantidad", matriz_packs=None):
+    indice = indice_fechas.IndiceFechas(ventas, col_fecha)
+    rango = rango_fechas(indice, mes_desde)
+    if rango is None:
+        return None
+    fecha_inicio, fecha_fin, mes_max = rango
+    col_ventas = titulo_ventas(mes_desde, mes_max)
+    ventas_producto = ventas_por_producto(indice.dias(fecha_inicio, fecha_fin), col_ventas, col_cantidad)
+    if matriz_packs is None or not len(matriz_packs):
+        cuadrado, resumen = conciliar(filtrar_categorias(df_stock, col_categoria, categoria), ventas_producto, col_ventas, col_categoria)
+    else:
+        cuadrado, resumen = conciliar(filtrar_categorias(df_stock, col_categoria), ventas_producto, col_ventas, col_categoria, matriz_packs)
+        if categoria and categoria != "Todas":
+            cuadrado = cuadrado[cuadrado[col_categoria] == categoria].reset_index(drop=True)
+            resumen = resumen[resumen[col_categoria] == categoria].reset_index(drop=True) if resumen is not None else None
+    return {"titulo_col_ventas": col_ventas, "cuadratura": cuadrado, "resumen": resumen}
@@ -0,0 +1,61 @@
+import pandas as pd
+
+import ingesta
+from claves_producto import COL_ID_PRODUCTO, COL_PRODUCTO_COMPLETO
+
+# Agregaciones de Flexmonster que se pueden precalcular en el cubo y cómo se
+# vuelven a agregar al consultar un nivel más grueso
+AGREGACIONES = {"sum": "sum", "count": "count", "min": "min", "max": "max"}
+REAGREGACION = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+# Dimensiones que usan las pestañas además de las del slice
+DIMENSIONES_EXTRA = ["Tipo de Producto / Servicio", "Producto / Servicio", COL_PRODUCTO_COMPLETO, COL_ID_PRODUCTO]
+
+
+# --- Medidas del cubo según slice.measures de report.json ---
+def medidas_cubo(config, columnas):
+    por_nombre = {ingesta.nombre_base(c): c for c in columnas}
+    medidas = {}
+    for m in (config or {}).get("slice", {}).get("measures", []):
+        col = por_nombre.get(m.get("uniqueName", ""))
+        agregacion = m.get("aggregation", "sum")
+        if col and agregacion in AGREGACIONES:
+            medidas[col] = agregacion
+    return medidas
+
+
+# --- Dimensiones: fecha (grano día) + filas/columnas del slice + claves de producto ---
+def dimensiones_cubo(config, columnas, extra=()):
+    slice_cfg = (config or {}).get("slice", {})
+    por_nombre = {ingesta.nombre_base(c): c for c in columnas}
+    dims = []
+    col_fecha = next((c for c in columnas if "fecha" in c.lower()), None)
+    if col_fecha:
+        dims.append(col_fecha)
+    nombres = [d.get("uniqueName", "") for d in slice_cfg.get("rows", []) + slice_cfg.get("columns", [])]
+    for nombre in nombres + DIMENSIONES_EXTRA:
+        col = por_nombre.get(nombre)
+        if col and col not in dims:
+            dims.append(col)
+    for col in extra:
+        if col and col in columnas and col not in dims:
+            dims.append(col)
+    return dims
+
+
+# --- Materializa el cubo una vez por carga de datos ---
+def construir_cubo(df, dimensiones, medidas):
+    dims = [d for d in dimensiones if d in df.columns]
+    agregaciones = {m: AGREGACIONES[a] for m, a in medidas.items() if m in df.columns}
+    # dropna=False: las líneas sin producto/sucursal siguen sumando en los totales
+    cubo = df.groupby(dims, observed=True, dropna=False, sort=False).agg(agregaciones)
+    return cubo.reset_index()
+
+
+# --- Consulta agregada sobre el cubo (en vez de hacer groupby sobre las líneas) ---
+def reagregar(cubo, por, medidas, agregaciones=None):
+    agregaciones = agregaciones or {}
+    funciones = {m: REAGREGACION.get(agregaciones.get(m, "sum"), "sum") for m in medidas}
+    if not por:
+        return pd.Series({m: cubo[m].agg(f) for m, f in funciones.items()})
+    return cubo.groupby(por, observed=True).agg(funciones).reset_index()
@@ -0,0 +1,154 @@
+import io
+import tempfile
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+# Filas por bloque al recorrer un frame y productos por bloque al recorrer el pivot disperso:
+# en memoria solo está el bloque que se escribe, nunca la tabla completa
+FILAS_POR_BLOQUE = 20_000
+PRODUCTOS_POR_BLOQUE = 1_000
+
+FORMATO_FECHA_EXCEL = "dd/mm/yyyy"
+FORMATO_PORCENTAJE = "0.00%"
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MIME_CSV = "text/csv"
+
+
+# --- Formatos numéricos de report.json ("formats" de Flexmonster) como formato nativo de Excel ---
+# Los separadores de miles y decimales los pone Excel según la configuración regional de quien
+# abre el archivo; del formato se toman símbolo, su posición, decimales y porcentaje.
+def formato_numero(formato, decimales=None):
+    if decimales is None:
+        decimales = int(formato.get("decimalPlaces", formato.get("maxDecimalPlaces", 0)) or 0)
+    codigo = "#,##0" + ("." + "0" * decimales if decimales > 0 else "")
+    if formato.get("isPercent"):
+        return codigo + "%"
+    simbolo = formato.get("currencySymbol", "")
+    if simbolo:
+        if formato.get("currencySymbolAlign", "left") == "left":
+            codigo = f'"{simbolo}"{codigo}'
+        else:
+            codigo = f'{codigo}" {simbolo}"'
+    return codigo
+
+
+# Formato de Excel por nombre de formato de las tablas (tablas.FORMATOS) y por medida del slice
+def formatos_config(config):
+    formatos = {f.get("name"): f for f in (config or {}).get("formats", [])}
+    moneda = formatos.get("currency", {"currencySymbol": "$"})
+    cantidad = formatos.get("qty", {})
+    resultado = {
+        "moneda": formato_numero(moneda),
+        "moneda_decimal": formato_numero(moneda, decimales=2),
+        "entero": formato_numero(cantidad, decimales=0),
+        "numero": formato_numero(cantidad, decimales=0),
+        "porcentaje": FORMATO_PORCENTAJE,
+    }
+    for medida in (config or {}).get("slice", {}).get("measures", []):
+        formato = formatos.get(medida.get("format"))
+        if formato is not None and medida.get("uniqueName"):
+            resultado[medida["uniqueName"]] = formato_numero(formato)
+    return resultado
+
+
+# Formato por columna: el de la tabla (nombre de tablas.FORMATOS; las funciones se ignoran), el de
+# la medida en report.json o, para columnas numéricas sin formato, el de por_defecto
+def formatos_columnas(bloque, formatos, formatos_excel, por_defecto=None):
+    resultado = {}
+    for col in bloque.columns:
+        nombre = (formatos or {}).get(col)
+        if not isinstance(nombre, str):
+            nombre = col if col in formatos_excel else None
+        if nombre is None and por_defecto and pd.api.types.is_numeric_dtype(bloque[col]):
+            nombre = por_defecto
+        if pd.api.types.is_datetime64_any_dtype(bloque[col]):
+            resultado[col] = FORMATO_FECHA_EXCEL
+        elif nombre in formatos_excel:
+            resultado[col] = formatos_excel[nombre]
+    return resultado
+
+
+# --- Bloques de filas ---
+def bloques_frame(df, filas=FILAS_POR_BLOQUE):
+    for inicio in range(0, max(len(df), 1), filas):
+        yield df.iloc[inicio:inicio + filas]
+
+
+# Pivot producto × día (pivote.PivotDisperso) por páginas de productos, con la fila de totales al final
+def bloques_pivot(pivot, inicio=0, fin=None, productos=PRODUCTOS_POR_BLOQUE):
+    fin = pivot.n_columnas if fin is None else fin
+    for desde in range(0, pivot.n_filas, productos):
+        yield pivot.ventana(desde, min(desde + productos, pivot.n_filas), inicio, fin)
+    yield pivot.fila_totales(inicio, fin)
+
+
+# Detalle por categoría [(categoría, frame)] como un solo archivo, una categoría por bloque
+def bloques_categorias(tablas, col_categoria="Categoría"):
+    for categoria, df in tablas:
+        yield df.assign(**{col_categoria: categoria})[[col_categoria] + list(df.columns)]
+
+
+# Valores de una columna listos para el escritor: tipos de Python y None en vez de NaN / NaT / inf
+def _valores(serie):
+    valores = serie.astype(object)
+    validos = serie.notna().to_numpy()
+    if pd.api.types.is_float_dtype(serie.dtype):
+        validos = validos & np.isfinite(serie.to_numpy(dtype=float, na_value=np.nan))
+    return valores.where(validos, None).tolist()
+
+
+def _ancho(col):
+    return min(max(len(str(col)) + 2, 12), 60)
+
+
+# --- XLSX en modo de memoria constante ---
+# xlsxwriter con constant_memory escribe cada fila al archivo temporal en cuanto se completa;
+# las celdas numéricas van como números con el formato nativo de su columna.
+def escribir_xlsx(destino, bloques, formatos=None, formatos_excel=None, por_defecto=None, hoja="Datos"):
+    libro = xlsxwriter.Workbook(destino, {"constant_memory": True})
+    hoja_excel = libro.add_worksheet(hoja[:31])
+    negrita = libro.add_format({"bold": True})
+    fila = 0
+    for bloque in bloques:
+        if fila == 0:
+            columnas = list(bloque.columns)
+            por_columna = formatos_columnas(bloque, formatos, formatos_excel or {}, por_defecto)
+            for i, col in enumerate(columnas):
+                formato = libro.add_format({"num_format": por_columna[col]}) if col in por_columna else None
+                hoja_excel.set_column(i, i, _ancho(col), formato)
+            hoja_excel.write_row(0, 0, [str(c) for c in columnas], negrita)
+            hoja_excel.freeze_panes(1, 0)
+            fila = 1
+        for valores in zip(*(_valores(bloque[c]) for c in columnas)):
+            hoja_excel.write_row(fila, 0, valores)
+            fila += 1
+    libro.close()
+    return fila
+
+
+# --- CSV por bloques (UTF-8 con BOM para que Excel respete las tildes) ---
+def escribir_csv(destino, bloques):
+    primero = True
+    for bloque in bloques:
+        bloque.to_csv(destino, header=primero, index=False)
+        primero = False
+
+
+# Archivo temporal en disco con el export, abierto al inicio (st.download_button lo lee y lo cierra)
+def archivo_xlsx(bloques, **kwargs):
+    archivo = tempfile.TemporaryFile()
+    escribir_xlsx(archivo, bloques, **kwargs)
+    archivo.seek(0)
+    return archivo
+
+
+def archivo_csv(bloques):
+    archivo = tempfile.TemporaryFile()
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    escribir_csv(texto, bloques)
+    texto.flush()
+    texto.detach()
+    archivo.seek(0)
+    return archivo
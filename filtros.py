@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+_VACIO = np.empty(0, dtype=np.int64)
+
+
+# --- Índice invertido por columna: valor -> posiciones de fila ordenadas ---
+def _indexar_columna(serie):
+    codigos, valores = pd.factorize(serie, sort=True)
+    # Con pocos valores los códigos caben en int16 y numpy ordena por radix (lineal)
+    if len(valores) < np.iinfo(np.int16).max:
+        codigos = codigos.astype(np.int16)
+    # Orden estable por código: dentro de cada valor las posiciones quedan ordenadas
+    orden = np.argsort(codigos, kind="stable")
+    conteos = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+    inicio = int((codigos < 0).sum())  # los nulos (-1) quedan al principio y no se indexan
+    cortes = inicio + np.concatenate([[0], np.cumsum(conteos)])
+    valores = valores.tolist()
+    posiciones = {}
+    for i, valor in enumerate(valores):
+        posiciones[valor] = orden[cortes[i]:cortes[i + 1]]
+    return codigos, valores, posiciones
+
+
+# Bytes propios de un frame: las columnas de texto de una vista apuntan a los mismos objetos
+# que el frame base, así que se cuentan sin deep
+def _bytes_frame(df):
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+# Intersección de arreglos ordenados: búsqueda binaria del más chico en el más grande
+def _intersectar(chico, grande):
+    if len(chico) == 0 or len(grande) == 0:
+        return _VACIO
+    idx = np.searchsorted(grande, chico)
+    idx[idx == len(grande)] = len(grande) - 1
+    return chico[grande[idx] == chico]
+
+
+# --- Motor de filtros del sidebar ---
+# Se construye una vez por versión de los datos. Las vistas devueltas son compartidas:
+# no se deben modificar. Se guardan las últimas max_vistas mientras no pasen de
+# max_bytes_vistas en total (por defecto lo que ocupa el frame base); el almacén de datasets
+# cuenta ese tope como parte del motor (bytes_reservados).
+class MotorFiltros:
+    def __init__(self, df, columnas, max_vistas=32, max_bytes_vistas=None):
+        self.df = df
+        self.columnas = {nombre: col for nombre, col in columnas.items() if col and col in df.columns}
+        self.codigos = {}
+        self.valores_col = {}
+        self.indices = {}
+        for nombre, col in self.columnas.items():
+            self.codigos[nombre], self.valores_col[nombre], self.indices[nombre] = _indexar_columna(df[col])
+        self.max_vistas = max_vistas
+        self.max_bytes_vistas = _bytes_frame(df) if max_bytes_vistas is None else max_bytes_vistas
+        self._vistas = OrderedDict()
+        self._bytes_vistas = 0
+        self._lock = threading.Lock()
+
+    # Posiciones que cumplen todos los filtros (None = sin filtro, todas las filas)
+    def posiciones(self, **filtros):
+        listas = []
+        for nombre, valor in filtros.items():
+            if valor is None or nombre not in self.indices:
+                continue
+            listas.append(self.indices[nombre].get(valor, _VACIO))
+        if not listas:
+            return None
+        listas.sort(key=len)
+        resultado = listas[0]
+        for otra in listas[1:]:
+            resultado = _intersectar(resultado, otra)
+        return resultado
+
+    def vista(self, **filtros):
+        clave = tuple(sorted((k, v) for k, v in filtros.items() if v is not None))
+        with self._lock:
+            if clave in self._vistas:
+                self._vistas.move_to_end(clave)
+                return self._vistas[clave][0]
+        pos = self.posiciones(**filtros)
+        vista = self.df if pos is None else self.df.take(pos)
+        # Sin filtros la vista es el frame base: no ocupa memoria aparte
+        tamano = 0 if pos is None else _bytes_frame(vista)
+        with self._lock:
+            if clave not in self._vistas and tamano <= self.max_bytes_vistas:
+                self._vistas[clave] = (vista, tamano)
+                self._bytes_vistas += tamano
+                while len(self._vistas) > self.max_vistas or self._bytes_vistas > self.max_bytes_vistas:
+                    self._bytes_vistas -= self._vistas.popitem(last=False)[1][1]
+        return vista
+
+    # Memoria que pueden llegar a ocupar las vistas guardadas
+    def bytes_reservados(self):
+        return self.max_bytes_vistas
+
+    def vista_filtrada(self, sucursal=None, tipo=None, mes=None, producto=None):
+        return self.vista(sucursal=sucursal, tipo=tipo, mes=mes, producto=producto)
+
+    # Valores distintos de una columna (ordenados) dentro de la selección dada
+    def valores(self, nombre, **filtros):
+        if nombre not in self.indices:
+            return []
+        pos = self.posiciones(**filtros)
+        if pos is None:
+            return list(self.valores_col[nombre])
+        codigos = np.unique(self.codigos[nombre][pos])
+        return [self.valores_col[nombre][c] for c in codigos if c >= 0]
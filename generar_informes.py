@@ -0,0 +1,242 @@
+# Informes por lotes sin servidor de Streamlit: para cada sucursal de report.json genera las
+# salidas de las pestañas 1, 2, 3 y 5 (resumen y detalle diario, ABC, detalle por día y
+# cuadratura de stock) en Parquet o XLSX, con los mismos cálculos del dashboard (informes.py).
+# Cada combinación sucursal × mes es una tarea independiente y se reparten en un pool de procesos.
+#
+#   python generar_informes.py [--config report.json] [--salida informes] [--formato parquet|xlsx]
+#                              [--dataset NOMBRE ...] [--mes 2024-01 ...] [--procesos N]
+#
+# Estructura de la salida (Parquet: una carpeta con un archivo por tabla; XLSX: un libro con una
+# hoja por tabla):
+#   informes/<dataset>/<sucursal>/<mes>/       pestañas 1, 2 y 3 del mes
+#   informes/<dataset>/<sucursal>/todos/       pestañas 1 y 2 de todo el período (con XYZ mensual)
+#   informes/<dataset>/cuadratura_stock/       pestaña 5
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+
+import pandas as pd
+
+import carga
+import informes
+import packs
+import registro
+import snapshot
+
+TODOS = "todos"
+# Columna de producto del ABC y del detalle por día (igual que en el dashboard)
+COL_PRODUCTO_ABC = "+Producto / Servicio"
+COL_TIPO_PRODUCTO = "+Tipo de Producto / Servicio"
+
+# Datos cargados por dataset. Se llena antes de crear el pool: con fork los procesos lo heredan
+# sin serializarlo y cada tarea recibe solo (dataset, sucursal, mes).
+_DATASETS = {}
+
+
+# --- Carga de las fuentes de un dataset (ventas, catálogo + packs y stock) ---
+def cargar_dataset(nombre, config_dataset, cargador):
+    urls = registro.fuentes(config_dataset)
+    inicio = time.perf_counter()
+    df, stats = snapshot.cargar_ventas(urls["ventas"], config_dataset)
+    df = informes.preparar_ventas(df)
+    cargador.registrar_tiempo(f"ventas · {nombre}", inicio, origen=stats.get("origen"))
+    cols = informes.columnas_ventas(df.columns.tolist())
+    if not all([cols["sucursal"], cols["producto"], cols["mes"], cols["fecha"]]) or not cols["medidas"]:
+        raise ValueError(f"{nombre}: faltan columnas clave en las ventas ({', '.join(df.columns)})")
+
+    dims, agregaciones, columnas_filtros = informes.definir_cubo(config_dataset, df.columns.tolist(), cols)
+    df_cubo, motor = informes.construir_cubo(df, dims, agregaciones, columnas_filtros)
+
+    df_stock, mapeo_packs = None, None
+    # Stock y catálogo por separado: sin catálogo la cuadratura sigue, solo que sin packs
+    if urls["stock"]:
+        try:
+            df_stock = cargador.excel(f"stock · {nombre}", urls["stock"], carga.leer_stock)
+        except Exception as e:
+            print(f"{nombre}: sin cuadratura de stock ({e})", file=sys.stderr)
+    if urls["catalogo"]:
+        try:
+            df_catalogo = cargador.excel(f"catalogo · {nombre}", urls["catalogo"], carga.leer_catalogo)
+            mapeo_packs = cargador.excel(f"packs · {nombre}", urls["catalogo"], carga.leer_packs, df_catalogo)
+        except Exception as e:
+            print(f"{nombre}: cuadratura sin packs, no se pudo cargar el catálogo ({e})", file=sys.stderr)
+            mapeo_packs = packs.vacio()
+
+    return {
+        "df": df,
+        "cols": cols,
+        "df_cubo": df_cubo,
+        "motor": motor,
+        "agregaciones": agregaciones,
+        "df_stock": df_stock,
+        "mapeo_packs": mapeo_packs,
+    }
+
+
+def _nombre_archivo(texto):
+    return re.sub(r"[^\w.-]+", "_", str(texto)).strip("_") or "_"
+
+
+# Tablas por nombre -> carpeta de Parquet o libro XLSX
+def escribir(tablas, ruta, formato):
+    if formato == "xlsx":
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with pd.ExcelWriter(f"{ruta}.xlsx", engine="xlsxwriter") as libro:
+            for nombre, tabla in tablas.items():
+                tabla.to_excel(libro, sheet_name=nombre[:31], index=False)
+        return [f"{ruta}.xlsx"]
+    os.makedirs(ruta, exist_ok=True)
+    rutas = []
+    for nombre, tabla in tablas.items():
+        rutas.append(os.path.join(ruta, f"{nombre}.parquet"))
+        tabla.to_parquet(rutas[-1], index=False)
+    return rutas
+
+
+# --- Pestañas 1, 2 y 3 para una sucursal y un mes (mes None: todo el período) ---
+def tablas_sucursal_mes(datos, sucursal, mes):
+    cols = datos["cols"]
+    vista = datos["motor"].vista(sucursal=sucursal, mes=mes)
+    if vista.empty:
+        return {}
+
+    tab1 = informes.resumen_y_detalle(vista, cols["medidas"], datos["agregaciones"], cols["fecha"])
+    pivot = tab1["pivot"]
+    tablas = {
+        "resumen": tab1["resumen"].rename_axis("Medida").reset_index(name="Total"),
+        "cantidades_por_producto": tab1["cantidades_por_producto"],
+        "detalle_diario": pd.concat([
+            pivot.ventana(0, pivot.n_filas, 0, pivot.n_columnas),
+            pivot.fila_totales(0, pivot.n_columnas),
+        ], ignore_index=True),
+    }
+
+    metricas = [m for m in informes.METRICAS_ABC if m in vista.columns]
+    # XYZ sobre los meses del dataset completo (un mes: sin XYZ)
+    n_meses = informes.meses_periodo(datos["df_cubo"], cols["mes"], cols["fecha"], mes)
+    for nombre, grupos in [("abc", ()), ("abc_por_tipo", (COL_TIPO_PRODUCTO,))]:
+        if not all(g in vista.columns for g in grupos):
+            continue
+        tab2 = informes.abc(vista, COL_PRODUCTO_ABC, metricas, grupos, cols["mes"], n_meses)
+        tablas[nombre] = tab2["tabla"][informes.columnas_abc(tab2["tabla"], COL_PRODUCTO_ABC, metricas, grupos)]
+        if not grupos and tab2["matriz_productos"] is not None:
+            tablas["abc_xyz"] = tab2["matriz_productos"].rename_axis(index="ABC", columns=None).reset_index()
+
+    # Detalle por día: todas las líneas del mes, por fecha, categoría y producto
+    if mes is not None:
+        # Las ventas están ordenadas por fecha: el mes es un slice y la máscara solo recorre ese tramo
+        df = datos["df"]
+        desde, hasta = informes.periodo(vista, cols["fecha"])
+        lineas = informes.entre_fechas(df, cols["fecha"], desde, hasta)
+        lineas = lineas[(lineas[cols["sucursal"]] == sucursal) & (lineas[cols["mes"]] == mes)]
+        tablas["detalle_por_dia"] = informes.detalle_lineas(
+            lineas, COL_TIPO_PRODUCTO if COL_TIPO_PRODUCTO in df.columns else None, extra=[cols["fecha"]]
+        )
+    return tablas
+
+
+def tablas_cuadratura(datos, mes_desde):
+    df_stock = datos["df_stock"]
+    col_categoria = informes.columna_categoria_stock(df_stock)
+    if not col_categoria:
+        return {}
+    resultado = informes.cuadratura_stock(df_stock, datos["df_cubo"], col_categoria, datos["cols"]["fecha"], "Todas", mes_desde, datos["mapeo_packs"])
+    if resultado is None:
+        print(f"sin cuadratura de stock: las ventas no tienen fechas válidas en {datos['cols']['fecha']}", file=sys.stderr)
+        return {}
+    tablas = {"cuadratura": resultado["detalle"]}
+    if resultado["resumen"] is not None:
+        tablas["resumen_categoria"] = resultado["resumen"]
+    return tablas
+
+
+# Una tarea del pool: (dataset, sucursal, mes) o (dataset, None, None) para la cuadratura
+def ejecutar(tarea, salida, formato, mes_desde):
+    nombre, sucursal, mes = tarea
+    inicio = time.perf_counter()
+    datos = _DATASETS[nombre]
+    carpeta = os.path.join(salida, _nombre_archivo(nombre))
+    if sucursal is None:
+        tablas = tablas_cuadratura(datos, mes_desde)
+        ruta = os.path.join(carpeta, "cuadratura_stock")
+    else:
+        tablas = tablas_sucursal_mes(datos, sucursal, mes)
+        ruta = os.path.join(carpeta, _nombre_archivo(sucursal), _nombre_archivo(mes or TODOS))
+    rutas = escribir(tablas, ruta, formato) if tablas else []
+    return tarea, rutas, time.perf_counter() - inicio
+
+
+def tareas(meses_sel=None):
+    lista = []
+    for nombre, datos in _DATASETS.items():
+        motor = datos["motor"]
+        for sucursal in motor.valores("sucursal"):
+            meses = [m for m in motor.valores("mes", sucursal=sucursal) if not meses_sel or m in meses_sel]
+            lista += [(nombre, sucursal, mes) for mes in meses]
+            if not meses_sel:
+                lista.append((nombre, sucursal, None))
+        if datos["df_stock"] is not None:
+            lista.append((nombre, None, None))
+    return lista
+
+
+# Pool de procesos con fork (heredan _DATASETS); sin fork o con --procesos 0, hilos. El fork solo
+# es seguro sin otros hilos vivos (un hilo con un lock tomado lo deja tomado en el hijo): se crea
+# después de cerrar el cargador esperando a sus hilos, y si queda alguno se usan hilos.
+def crear_pool(procesos):
+    if procesos and "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1:
+        return concurrent.futures.ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context("fork"))
+    return concurrent.futures.ThreadPoolExecutor(max(procesos, 1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los informes del dashboard sin Streamlit.")
+    parser.add_argument("--config", default="report.json")
+    parser.add_argument("--salida", default="informes")
+    parser.add_argument("--formato", choices=["parquet", "xlsx"], default="parquet")
+    parser.add_argument("--dataset", nargs="*", help="datasets de report.json (por defecto todos)")
+    parser.add_argument("--mes", nargs="*", help="meses a generar, p. ej. 2024-01 (por defecto todos)")
+    parser.add_argument("--mes-desde", type=int, default=1, help="ventas acumuladas desde este mes en la cuadratura")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    registro_datasets = registro.leer_registro(config)
+    nombres = args.dataset or list(registro_datasets)
+    desconocidos = [n for n in nombres if n not in registro_datasets]
+    if desconocidos:
+        parser.error(f"datasets desconocidos: {', '.join(desconocidos)} (hay: {', '.join(registro_datasets)})")
+
+    # Carga de todos los datasets en paralelo (descargas en hilos, parseo de Excel en procesos)
+    inicio = time.perf_counter()
+    cargador = carga.CargadorFuentes(*registro.pools_carga(config))
+    futuros = cargador.lanzar({n: (lambda n=n: cargar_dataset(n, registro_datasets[n], cargador)) for n in nombres})
+    for nombre, futuro in futuros.items():
+        _DATASETS[nombre] = futuro.result()
+    cargador.cerrar(esperar=True)
+    t_carga = time.perf_counter() - inicio
+    for t in cargador.estadisticas():
+        print(f"  {t['Fuente']:40s} {t['Origen']:10s} {t['Total (s)']:6.2f} s")
+
+    lista = tareas(set(args.mes) if args.mes else None)
+    print(f"{len(nombres)} datasets cargados en {t_carga:.2f} s; {len(lista)} informes con {args.procesos} procesos")
+    archivos = 0
+    with crear_pool(args.procesos) as pool:
+        futuros = [pool.submit(ejecutar, t, args.salida, args.formato, args.mes_desde) for t in lista]
+        for futuro in concurrent.futures.as_completed(futuros):
+            (nombre, sucursal, mes), rutas, segundos = futuro.result()
+            archivos += len(rutas)
+            descripcion = "cuadratura de stock" if sucursal is None else f"{sucursal} · {mes or TODOS}"
+            print(f"  {nombre} · {descripcion}: {len(rutas)} archivos en {segundos:.2f} s")
+    print(f"{archivos} archivos en {args.salida} ({time.perf_counter() - inicio:.2f} s en total)")
+
+
+if __name__ == "__main__":
+    main()
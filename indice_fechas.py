@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# --- Índice temporal sobre un frame ordenado por fecha ---
+# Las ventas (y el cubo, y sus vistas filtradas) quedan ordenadas por fecha al cargar, con las
+# fechas vacías al final. Un rango de fechas es entonces un tramo contiguo de filas: sus límites
+# salen por búsqueda binaria sobre la columna (sin recorrer el frame) y el resultado es un
+# slice posicional que no copia los datos. Los frames devueltos son compartidos: no se modifican.
+
+
+# Fechas ordenadas con los NaT al final (en numpy los NaT ordenan después de cualquier fecha)
+def esta_ordenado(fechas):
+    fechas = np.asarray(fechas)
+    validas = ~np.isnat(fechas)
+    n = int(validas.sum())
+    return bool(validas[:n].all()) and bool((fechas[1:n] >= fechas[:n - 1]).all())
+
+
+# Orden estable por fecha (NaT al final) solo si hace falta; el índice queda 0..n-1
+def ordenar_por_fecha(df, col_fecha):
+    if col_fecha not in df.columns or esta_ordenado(df[col_fecha].to_numpy()):
+        return df
+    return df.sort_values(col_fecha, kind="stable", na_position="last", ignore_index=True)
+
+
+class IndiceFechas:
+    # df debe venir ordenado por col_fecha (ordenar_por_fecha); construirlo no recorre los datos
+    def __init__(self, df, col_fecha):
+        self.df = df
+        self.col_fecha = col_fecha
+        self.fechas = df[col_fecha].to_numpy()
+        self.n_validas = int(np.searchsorted(self.fechas, np.datetime64("NaT"), side="left"))
+
+    def __len__(self):
+        return self.n_validas
+
+    # Fecha como escalar de la misma unidad que la columna (si no, numpy convierte toda la columna)
+    def _escalar(self, fecha):
+        return pd.Timestamp(fecha).to_datetime64().astype(self.fechas.dtype)
+
+    def _posicion(self, fecha, defecto):
+        if fecha is None:
+            return defecto
+        return int(np.searchsorted(self.fechas[:self.n_validas], self._escalar(fecha), side="left"))
+
+    # Posiciones [inicio, fin) de las filas con desde <= fecha < hasta (None: sin límite)
+    def limites(self, desde=None, hasta=None):
+        inicio = self._posicion(desde, 0)
+        fin = self._posicion(hasta, self.n_validas)
+        return inicio, max(inicio, fin)
+
+    def rango(self, desde=None, hasta=None):
+        inicio, fin = self.limites(desde, hasta)
+        if inicio == 0 and fin == len(self.df):
+            return self.df
+        return self.df.iloc[inicio:fin]
+
+    # Días calendario completos, ambos incluidos (hasta None: solo el día desde)
+    def dias(self, desde=None, hasta=None):
+        hasta = desde if hasta is None and desde is not None else hasta
+        desde = None if desde is None else pd.Timestamp(desde).normalize()
+        hasta = None if hasta is None else pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1)
+        return self.rango(desde, hasta)
+
+    def mes(self, año, mes):
+        inicio = pd.Timestamp(year=int(año), month=int(mes), day=1)
+        return self.rango(inicio, inicio + pd.offsets.MonthBegin(1))
+
+    def primera(self):
+        return pd.Timestamp(self.fechas[0]) if self.n_validas else None
+
+    def ultima(self):
+        return pd.Timestamp(self.fechas[self.n_validas - 1]) if self.n_validas else None
+
+    # Primer día de cada mes con ventas: una búsqueda binaria por mes del período
+    def meses(self):
+        if not self.n_validas:
+            return []
+        inicios = pd.date_range(self.primera().to_period("M").to_timestamp(), self.ultima(), freq="MS")
+        limites = np.searchsorted(self.fechas[:self.n_validas], inicios.to_numpy().astype(self.fechas.dtype), side="left")
+        limites = np.append(limites, self.n_validas)
+        return [m for m, i, j in zip(inicios, limites[:-1], limites[1:]) if j > i]
@@ -0,0 +1,248 @@
+import pandas as pd
+
+import clasificacion_abc
+import claves_producto
+import cubo
+import cuadratura
+import filtros
+import indice_fechas
+import ingesta
+import packs
+import pivote
+
+# Cálculos de las pestañas sin Streamlit: los usa app.py (memoizados por sesión) y
+# generar_informes.py (informes por lotes). Las funciones reciben frames ya filtrados y
+# devuelven tablas numéricas; el formato se aplica al mostrar o exportar.
+
+MEDIDAS_ESPERADAS = ["Subtotal Neto", "Subtotal Bruto", "Margen Neto", "Costo Neto", "Impuestos", "Cantidad"]
+METRICAS_ABC = ["Margen Neto", "Subtotal Neto", "Cantidad"]
+
+# Columnas del detalle por día (pestaña 3) además de la categoría
+COLUMNAS_DETALLE = [
+    claves_producto.COL_PRODUCTO_COMPLETO,
+    '+Tipo de Documento',
+    '+Numero Documento',
+    '+Vendedor',
+    'Cantidad',
+    'Subtotal Neto',
+]
+SIN_CATEGORIA = "Sin Categoría"
+
+
+def encontrar_col(busqueda, columnas):
+    busqueda = busqueda.lower()
+    for c in columnas:
+        if busqueda in c.lower():
+            return c
+    return None
+
+
+# --- Columnas clave de las ventas (detectadas por nombre) ---
+def columnas_ventas(columnas):
+    return {
+        "sucursal": encontrar_col("sucursal", columnas),
+        "producto": encontrar_col("producto / servicio + variante", columnas),
+        "mes": encontrar_col("mes", columnas),
+        "tipo": encontrar_col("tipo de producto / servicio", columnas),
+        "fecha": encontrar_col("fecha", columnas),
+        "sku": encontrar_col("sku", columnas),
+        "medidas": [m for m in MEDIDAS_ESPERADAS if m in columnas],
+    }
+
+
+# --- Tipos de las ventas: medidas a float, fecha a datetime y columnas de fecha derivadas ---
+# Se hace al cargar (solo lo que no vino tipado desde la ingesta): el frame se comparte entre
+# sesiones y después no se modifica. Queda ordenado por fecha (los snapshots ya vienen
+# ordenados) para consultar rangos de fechas con indice_fechas.
+def preparar_ventas(df):
+    for col in MEDIDAS_ESPERADAS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    col_fecha = next((c for c in df.columns if "fecha" in c.lower()), None)
+    if col_fecha:
+        if not pd.api.types.is_datetime64_any_dtype(df[col_fecha]):
+            df[col_fecha] = pd.to_datetime(df[col_fecha], errors='coerce', dayfirst=True)
+        # Extraer Año, Mes (numérico y nombre) y Día para filtros (ya vienen del snapshot)
+        if 'Año' not in df.columns:
+            ingesta.derivar_columnas_fecha(df, col_fecha)
+        df = indice_fechas.ordenar_por_fecha(df, col_fecha)
+    return df
+
+
+# --- Definición del cubo (dimensiones, medidas y columnas de los filtros) según report.json ---
+def definir_cubo(config_dataset, columnas, cols):
+    dims = cubo.dimensiones_cubo(
+        config_dataset, columnas, extra=[cols["fecha"], cols["sucursal"], cols["producto"], cols["mes"], cols["tipo"]]
+    )
+    agregaciones = cubo.medidas_cubo(config_dataset, columnas)
+    for m in cols["medidas"]:
+        agregaciones.setdefault(m, "sum")
+    columnas_filtros = {"sucursal": cols["sucursal"], "tipo": cols["tipo"], "mes": cols["mes"], "producto": cols["producto"]}
+    return dims, agregaciones, columnas_filtros
+
+
+# El cubo queda ordenado por fecha y las vistas del motor de filtros conservan ese orden
+def construir_cubo(df, dimensiones, agregaciones, columnas_filtros):
+    df_cubo = cubo.construir_cubo(df, dimensiones, agregaciones)
+    col_fecha = encontrar_col("fecha", df_cubo.columns)
+    if col_fecha:
+        df_cubo = indice_fechas.ordenar_por_fecha(df_cubo, col_fecha)
+    return df_cubo, filtros.MotorFiltros(df_cubo, columnas_filtros)
+
+
+# Filas (ventas, cubo o una vista filtrada, ordenados por fecha) entre dos días, ambos incluidos:
+# búsqueda binaria y slice sin copia. None: sin límite por ese lado.
+def entre_fechas(df, col_fecha, desde=None, hasta=None):
+    if desde is None and hasta is None:
+        return df
+    return indice_fechas.IndiceFechas(df, col_fecha).dias(desde, hasta)
+
+
+# Primera y última fecha con ventas (límites de los selectores de fechas)
+def periodo(df, col_fecha):
+    indice = indice_fechas.IndiceFechas(df, col_fecha)
+    return indice.primera(), indice.ultima()
+
+
+# --- Pestaña 1: resumen, cantidades por producto y detalle diario ---
+# df_categoria: el cubo de la categoría seleccionada (para los productos sin ventas)
+def resumen_y_detalle(df_filtrado, medidas, agregaciones, col_fecha, producto="Todos", df_categoria=None):
+    col_completo = claves_producto.COL_PRODUCTO_COMPLETO
+    resultado = {"resumen": cubo.reagregar(df_filtrado, [], medidas, agregaciones)}
+
+    df_cantidades = df_filtrado
+    if producto != "Todos":
+        df_cantidades = df_cantidades[df_cantidades[col_completo] == producto]
+    resultado["cantidades_por_producto"] = cubo.reagregar(df_cantidades, col_completo, ['Cantidad']).sort_values(by='Cantidad', ascending=False)
+
+    if producto == "Todos":
+        detalle_diario = cubo.reagregar(df_filtrado, [col_completo, col_fecha], ['Cantidad'])
+        # Pivot disperso: solo las celdas producto×día con ventas; la tabla densa se arma
+        # por ventana (página de productos × rango de fechas) al mostrarla
+        resultado["pivot"] = pivote.PivotDisperso(detalle_diario, col_completo, col_fecha, 'Cantidad')
+
+        # Productos sin ventas (usando Producto Completo)
+        if df_categoria is not None:
+            productos_en_categoria = df_categoria[col_completo].drop_duplicates()
+            productos_vendidos = df_filtrado[col_completo].drop_duplicates()
+            resultado["productos_no_vendidos"] = productos_en_categoria[~productos_en_categoria.isin(productos_vendidos)]
+    else:
+        detalle_diario = cubo.reagregar(df_filtrado[df_filtrado[col_completo] == producto], col_fecha, ['Cantidad']).sort_values(col_fecha)
+
+    resultado["detalle_diario"] = detalle_diario
+    return resultado
+
+
+# --- Pestaña 2: ABC multi-métrica por grupo + XYZ por la variabilidad mensual de las unidades ---
+def abc(df_filtrado, col_producto, metricas, grupos=(), col_mes=None, n_meses=None):
+    tabla = clasificacion_abc.clasificar(df_filtrado, col_producto, list(metricas), grupos, col_periodo=col_mes, n_periodos=n_meses)
+    principal = metricas[0]
+    if clasificacion_abc.COL_XYZ not in tabla.columns:
+        return {"tabla": tabla, "matriz_productos": None, "matriz_participacion": None}
+    tabla[clasificacion_abc.COL_ABC_XYZ] = clasificacion_abc.combinar_abc_xyz(tabla, principal)
+    productos, participacion = clasificacion_abc.matriz_abc_xyz(tabla, principal)
+    return {"tabla": tabla, "matriz_productos": productos, "matriz_participacion": participacion}
+
+
+# Meses del XYZ: los del mes o período elegido en el cubo completo, sin los filtros de sucursal,
+# tipo o producto (un mes sin ventas de la selección es demanda cero, no un mes menos)
+def meses_periodo(df_cubo, col_mes, col_fecha, mes=None, desde=None, hasta=None):
+    if mes is not None:
+        return 1
+    return int(entre_fechas(df_cubo, col_fecha, desde, hasta)[col_mes].nunique())
+
+
+# Columnas de la tabla ABC en el orden en que se muestran
+def columnas_abc(tabla, col_producto, metricas, grupos=()):
+    columnas = list(grupos) + [col_producto]
+    for m in metricas:
+        columnas += [m, clasificacion_abc.col_porcentaje(m), clasificacion_abc.col_clase(m)]
+    if "Cantidad" not in metricas:
+        columnas.append("Cantidad")
+    if "Margen Neto" in metricas:
+        columnas.append(clasificacion_abc.COL_MARGEN_UNIDAD)
+    columnas += [clasificacion_abc.COL_CV, clasificacion_abc.COL_XYZ, clasificacion_abc.COL_ABC_XYZ]
+    return [c for c in columnas if c in tabla.columns]
+
+
+# --- Pestaña 3: detalle de ventas (líneas) por categoría ---
+# Líneas ordenadas por (extra, categoría, producto) con las columnas del detalle
+def detalle_lineas(df_lineas, col_tipo_producto, extra=()):
+    ordenar_por = list(extra)
+    if col_tipo_producto:
+        ordenar_por.append(col_tipo_producto)
+    ordenar_por.append(claves_producto.COL_PRODUCTO_COMPLETO)  # Producto Completo en vez de solo producto
+    columnas = [c for c in ordenar_por[:-1] + COLUMNAS_DETALLE if c in df_lineas.columns]
+    return df_lineas.sort_values(by=ordenar_por)[columnas]
+
+
+# [(categoría, líneas)]; Cantidad y Subtotal Neto quedan numéricos. extra: columnas que van
+# primero y ordenan las líneas (la fecha cuando el rango tiene más de un día)
+def detalle_por_categoria(df_lineas, col_tipo_producto, extra=()):
+    if df_lineas.empty:
+        return []
+    detalle = detalle_lineas(df_lineas, col_tipo_producto, extra)
+    if not col_tipo_producto:
+        return [(SIN_CATEGORIA, detalle)]
+    columnas = [c for c in list(extra) + COLUMNAS_DETALLE if c in detalle.columns]
+    return [(cat, detalle.loc[detalle[col_tipo_producto] == cat, columnas])
+            for cat in detalle[col_tipo_producto].dropna().unique()]
+
+
+# --- Pestaña 5: cuadratura de stock ---
+def columna_categoria_stock(df_stock):
+    return next((c for c in df_stock.columns if "tipo de producto" in c.lower()), None)
+
+
+def categorias_stock(df_stock, col_categoria_stock):
+    categorias = df_stock[df_stock[col_categoria_stock].str.upper().isin(cuadratura.CATEGORIAS_CLAVE)][col_categoria_stock]
+    return sorted(categorias.dropna().unique())
+
+
+# Meses presentes en las ventas (para "Ventas acumuladas desde mes"), sin recorrer el cubo.
+# None si ninguna venta tiene fecha válida
+def rango_meses(df_cubo, col_fecha):
+    indice = indice_fechas.IndiceFechas(df_cubo, col_fecha)
+    meses = sorted({m.month for m in indice.meses()})
+    if not meses:
+        return None
+    return {
+        "meses": meses,
+        "mes_max": max(meses),
+        "anio_min": indice.primera().year,
+        "anio_max": indice.ultima().year,
+    }
+
+
+COLUMNAS_CUADRATURA = [
+    "Alerta",
+    "Producto Completo",
+    "Stock",
+    None,  # ventas acumuladas del período (el título depende del mes desde)
+    packs.COL_VENDIDAS_EN_PACKS,
+    "Cantidad por Despachar",
+    "Cantidad Disponible",
+    "Por Recibir",
+    "Precio Venta Bruto",
+    "Margen Unitario",
+    "Costo Neto Prom. Unitario",
+    "Marca",
+]
+
+
+# Cuadratura vectorizada (limpieza, disponibilidad, alertas y resumen) en cuadratura.py;
+# las ventas de packs se descuentan de sus componentes si hay mapeo
+def cuadratura_stock(df_stock, df_cubo, col_categoria_stock, col_fecha, categoria="Todas", mes_desde=1, mapeo_packs=None):
+    matriz_packs = packs.MatrizPacks(mapeo_packs) if mapeo_packs is not None and len(mapeo_packs) else None
+    resultado = cuadratura.cuadrar(df_stock, df_cubo, col_categoria_stock, col_fecha, mes_desde, categoria, matriz_packs=matriz_packs)
+    if resultado is None:
+        return None
+    titulo_col_ventas = resultado["titulo_col_ventas"]
+    df_stock_cuadrado = resultado["cuadratura"]
+    columnas = [titulo_col_ventas if c is None else c for c in COLUMNAS_CUADRATURA]
+    # Ya viene ordenado por alerta (sin ventas, bajo stock, resto)
+    return {
+        "titulo_col_ventas": titulo_col_ventas,
+        "detalle": df_stock_cuadrado[[c for c in columnas if c in df_stock_cuadrado.columns]],
+        "resumen": resultado["resumen"],
+    }
@@ -0,0 +1,196 @@
+import csv
+import io
+import time
+import urllib.request
+
+import pandas as pd
+
+# Separadores que aceptamos en los exportes de Bsale
+SEPARADORES = [",", ";", "\t", "|"]
+
+# Bytes iniciales usados para detectar el separador
+TAM_MUESTRA = 64 * 1024
+
+# Columnas clave que se cargan como categóricas además de las del slice (pocas repeticiones
+# de valores largos: se guardan como códigos enteros + una tabla de valores)
+CLAVES_EXTRA = ["Tipo de Producto / Servicio", "Producto / Servicio", "Variante", "Tipo de Documento", "Vendedor"]
+
+# Columnas del CSV que usan las pestañas además de las del slice; el resto no se carga
+COLUMNAS_USADAS = CLAVES_EXTRA + [
+    "Sucursal", "Mes", "Producto / Servicio + Variante", "SKU", "Numero Documento",
+    "Cantidad", "Subtotal Neto", "Subtotal Bruto", "Margen Neto", "Costo Neto", "Impuestos",
+]
+
+# Una columna de texto se vuelve categórica si tiene a lo más esta fracción de valores distintos
+MAX_FRACCION_DISTINTOS = 0.5
+
+
+# --- Lectura de la fuente (URL o ruta local) ---
+def leer_bytes(url):
+    if url.startswith(("http://", "https://")):
+        with urllib.request.urlopen(url) as resp:
+            return resp.read()
+    with open(url, "rb") as f:
+        return f.read()
+
+
+# --- Detectar separador una sola vez a partir de la cabecera ---
+def detectar_separador(muestra):
+    if isinstance(muestra, bytes):
+        muestra = muestra[:TAM_MUESTRA].decode("utf-8-sig", errors="ignore")
+    # Descartamos la última línea porque puede venir cortada
+    lineas = muestra.splitlines()
+    if len(lineas) > 1:
+        lineas = lineas[:-1]
+    texto = "\n".join(lineas[:50])
+    try:
+        return csv.Sniffer().sniff(texto, delimiters="".join(SEPARADORES)).delimiter
+    except csv.Error:
+        cabecera = lineas[0] if lineas else ""
+        return max(SEPARADORES, key=cabecera.count)
+
+
+# Nombres de columna tal como vienen (sin limpiar) en la primera línea
+def leer_cabecera(muestra, sep):
+    if isinstance(muestra, bytes):
+        muestra = muestra[:TAM_MUESTRA].decode("utf-8-sig", errors="ignore")
+    primera = muestra.splitlines()[0] if muestra else ""
+    return next(csv.reader([primera], delimiter=sep), [])
+
+
+# Flexmonster marca las dimensiones de texto con "+" en la cabecera del CSV
+def nombre_base(columna):
+    return columna.strip().lstrip("+").strip()
+
+
+# --- Esquema declarado a partir de report.json ---
+def construir_esquema(config, columnas):
+    slice_cfg = (config or {}).get("slice", {})
+    por_nombre = {nombre_base(c): c for c in columnas}
+
+    medidas = []
+    for m in slice_cfg.get("measures", []):
+        col = por_nombre.get(m.get("uniqueName", ""))
+        if col and col not in medidas:
+            medidas.append(col)
+
+    claves = []
+    nombres_clave = [d.get("uniqueName", "") for d in slice_cfg.get("rows", []) + slice_cfg.get("columns", [])]
+    for nombre in nombres_clave + CLAVES_EXTRA:
+        col = por_nombre.get(nombre)
+        if col and col not in claves and col not in medidas:
+            claves.append(col)
+
+    fecha = next((c for c in columnas if "fecha" in c.lower()), None)
+
+    # Si el CSV no trae ninguna de las columnas conocidas (otro exporte) se cargan todas
+    usadas = set(medidas + claves + [fecha] + COLUMNAS_USADAS)
+    usar = [c for c in columnas if c in usadas or nombre_base(c) in usadas]
+    if not any(nombre_base(c) in COLUMNAS_USADAS for c in usar):
+        usar = None
+
+    return {"medidas": medidas, "categoricas": claves, "fecha": fecha, "usar": usar}
+
+
+def motor_disponible():
+    try:
+        import pyarrow  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "c"
+
+
+# Convierte solo los valores distintos de la fecha y luego expande por código
+def _fechas_desde_categorias(serie):
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return pd.to_datetime(serie, errors="coerce", dayfirst=True)
+    categorias = pd.to_datetime(pd.Series(serie.cat.categories.astype(str)), errors="coerce", dayfirst=True)
+    # Los códigos -1 (vacíos) quedan como NaT
+    valores = categorias.array.take(serie.cat.codes.to_numpy(), allow_fill=True)
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+# --- Parseo tipado del CSV ---
+def leer_csv_tipado(contenido, esquema=None, sep=None, motor=None, config=None):
+    if isinstance(contenido, str):
+        contenido = leer_bytes(contenido)
+
+    inicio = time.perf_counter()
+    sep = sep or detectar_separador(contenido)
+    motor = motor or motor_disponible()
+
+    cabecera = leer_cabecera(contenido, sep)
+    if esquema is None:
+        esquema = construir_esquema(config, [c.strip() for c in cabecera])
+
+    dtypes = {c: "float64" for c in esquema["medidas"]}
+    dtypes.update({c: "category" for c in esquema["categoricas"]})
+    if esquema["fecha"]:
+        dtypes[esquema["fecha"]] = "category"
+
+    # Las cabeceras pueden traer espacios: se tipan (y se eligen) por nombre original
+    dtype_original = {c: dtypes[c.strip()] for c in cabecera if c.strip() in dtypes}
+    usar = esquema.get("usar")
+    usecols = [c for c in cabecera if c.strip() in usar] if usar else None
+
+    try:
+        df = pd.read_csv(io.BytesIO(contenido), sep=sep, engine=motor, dtype=dtype_original, usecols=usecols)
+    except (ValueError, TypeError):
+        # Medidas con texto: se parsea sin tipos numéricos y se fuerza después
+        dtype_texto = {c: t for c, t in dtype_original.items() if t == "category"}
+        df = pd.read_csv(io.BytesIO(contenido), sep=sep, engine=motor, dtype=dtype_texto, usecols=usecols)
+
+    df.columns = df.columns.str.strip()
+
+    for col in esquema["medidas"]:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    if esquema["fecha"] in df.columns:
+        df[esquema["fecha"]] = _fechas_desde_categorias(df[esquema["fecha"]])
+
+    segundos = time.perf_counter() - inicio
+    stats = {
+        "motor": motor,
+        "separador": sep,
+        "filas": len(df),
+        "bytes": len(contenido),
+        "segundos": segundos,
+        "filas_por_segundo": len(df) / segundos if segundos > 0 else 0.0,
+    }
+    return df, stats
+
+
+# --- Columnas derivadas de la fecha usadas por los filtros de las pestañas ---
+# Enteros chicos (int16 / int8) y el nombre del mes como categórica en orden de calendario
+def derivar_columnas_fecha(df, col_fecha):
+    fechas = df[col_fecha].dt
+    df['Año'] = _entero_compacto(fechas.year, "int16")
+    df['MesNum'] = _entero_compacto(fechas.month, "int8")
+    # strftime solo sobre los 12 meses (respeta el locale) y luego se expande por código
+    nombres_mes = [pd.Timestamp(2000, m, 1).strftime('%B') for m in range(1, 13)]
+    codigos = df['MesNum'].fillna(0).to_numpy(dtype="int8") - 1
+    df['MesNombre'] = pd.Categorical.from_codes(codigos, categories=nombres_mes)
+    df['Día'] = _entero_compacto(fechas.day, "int8")
+    return df
+
+
+# Fechas vacías (NaT) dejan NaN: en ese caso float32, que también representa exacto estos valores
+def _entero_compacto(serie, dtype):
+    return serie.astype(dtype if serie.notna().all() else "float32")
+
+
+# --- Representación compacta en memoria ---
+# Enteros al tipo más chico que los contiene y texto con pocos valores distintos a categórica.
+# Las medidas quedan en float64: en float32 las sumas de montos pierden pesos.
+def compactar(df, excluir=()):
+    for col in df.columns:
+        if col in excluir:
+            continue
+        serie = df[col]
+        if pd.api.types.is_signed_integer_dtype(serie.dtype):
+            df[col] = pd.to_numeric(serie, downcast="integer")
+        elif pd.api.types.is_string_dtype(serie.dtype) and not isinstance(serie.dtype, pd.CategoricalDtype):
+            if len(serie) and serie.nunique() <= MAX_FRACCION_DISTINTOS * len(serie):
+                df[col] = serie.astype("category")
+    return df
@@ -0,0 +1,92 @@
+import functools
+import inspect
+from collections import OrderedDict
+
+# Almacén de cachés por función. Por defecto es global al proceso; app.py lo cambia por
+# uno guardado en st.session_state para que cada sesión tenga su propia caché acotada.
+_almacen_global = {}
+_proveedor_almacen = None
+
+
+def usar_almacen(proveedor):
+    global _proveedor_almacen
+    _proveedor_almacen = proveedor
+
+
+def almacen():
+    if _proveedor_almacen is not None:
+        return _proveedor_almacen()
+    return _almacen_global
+
+
+# --- LRU acotada con contadores de aciertos/fallos ---
+class CacheLRU:
+    def __init__(self, max_entradas):
+        self.max_entradas = max_entradas
+        self.entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave):
+        if clave in self.entradas:
+            self.entradas.move_to_end(clave)
+            self.aciertos += 1
+            return True, self.entradas[clave]
+        self.fallos += 1
+        return False, None
+
+    def guardar(self, clave, valor):
+        self.entradas[clave] = valor
+        self.entradas.move_to_end(clave)
+        while len(self.entradas) > self.max_entradas:
+            self.entradas.popitem(last=False)
+
+    def limpiar(self):
+        self.entradas.clear()
+
+
+# --- Decorador de memoización ---
+# Igual que st.cache_*, los parámetros que empiezan con "_" no forman parte de la clave:
+# se usan para pasar frames grandes junto a su versión (p. ej. version_datos + filtros).
+def memoizar(max_entradas=16, nombre=None):
+    def decorador(funcion):
+        firma = inspect.signature(funcion)
+        nombre_cache = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            argumentos = firma.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            clave = tuple((k, v) for k, v in argumentos.arguments.items() if not k.startswith("_"))
+
+            caches = almacen()
+            cache = caches.get(nombre_cache)
+            if cache is None:
+                cache = caches[nombre_cache] = CacheLRU(max_entradas)
+
+            encontrado, valor = cache.obtener(clave)
+            if encontrado:
+                return valor
+            valor = funcion(*args, **kwargs)
+            cache.guardar(clave, valor)
+            return valor
+
+        envoltura.nombre_cache = nombre_cache
+        return envoltura
+    return decorador
+
+
+# --- Estadísticas para el panel de depuración ---
+def estadisticas():
+    filas = []
+    for nombre, cache in sorted(almacen().items()):
+        total = cache.aciertos + cache.fallos
+        filas.append({
+            "Función": nombre,
+            "Aciertos": cache.aciertos,
+            "Fallos": cache.fallos,
+            "Tasa de aciertos": cache.aciertos / total if total else 0.0,
+            "Entradas": len(cache.entradas),
+            "Máximo": cache.max_entradas,
+        })
+    return filas
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+COL_PACK = "Pack"
+COL_COMPONENTE = "Componente"
+COL_CANTIDAD = "Cantidad"
+COL_VENDIDAS_EN_PACKS = "Vendidas en packs"
+
+# Columnas del catálogo (hoja principal) con la composición de cada pack
+COLUMNAS_COMPONENTE = ("componente pack", "componente")
+COLUMNAS_UNIDADES = ("unidades por pack", "unidades pack", "cantidad por pack")
+
+# Profundidad máxima de packs anidados (pack de packs); también corta ciclos
+MAX_NIVELES = 5
+
+
+def normalizar_nombre(serie):
+    return serie.astype("string").str.strip().str.upper().str.replace(r"\s+", " ", regex=True)
+
+
+def _buscar_col(columnas, claves):
+    bajas = {c.lower().strip(): c for c in columnas}
+    for clave in claves:
+        if clave in bajas:
+            return bajas[clave]
+    return next((c for c in columnas if any(clave in c.lower() for clave in claves)), None)
+
+
+def _limpiar_mapeo(packs, componentes, cantidades):
+    mapeo = pd.DataFrame({
+        COL_PACK: normalizar_nombre(packs).to_numpy(dtype=object),
+        COL_COMPONENTE: normalizar_nombre(componentes).to_numpy(dtype=object),
+        COL_CANTIDAD: pd.to_numeric(cantidades, errors="coerce").to_numpy(dtype=float),
+    })
+    mapeo = mapeo[mapeo[COL_PACK].notna() & mapeo[COL_COMPONENTE].notna() & (mapeo[COL_CANTIDAD] > 0)]
+    # Un componente repetido en el mismo pack suma sus unidades
+    return mapeo.groupby([COL_PACK, COL_COMPONENTE], sort=False)[COL_CANTIDAD].sum().reset_index()
+
+
+# --- Mapeo pack -> componente × cantidad desde una hoja dedicada (Pack / Componente / Cantidad) ---
+def mapeo_desde_hoja(hoja):
+    hoja = hoja.rename(columns=lambda c: str(c).strip())
+    col_pack = _buscar_col(hoja.columns, ("pack",))
+    col_comp = _buscar_col(hoja.columns, ("componente", "producto"))
+    col_cant = _buscar_col(hoja.columns, ("cantidad", "unidades"))
+    if not (col_pack and col_comp and col_cant) or col_pack == col_comp:
+        return vacio()
+    return _limpiar_mapeo(hoja[col_pack], hoja[col_comp], hoja[col_cant])
+
+
+# --- ...o desde columnas de la hoja principal: cada fila pack indica su componente y unidades ---
+def mapeo_desde_columnas(df_catalogo, col_producto):
+    col_comp = _buscar_col(df_catalogo.columns, COLUMNAS_COMPONENTE)
+    col_cant = _buscar_col(df_catalogo.columns, COLUMNAS_UNIDADES)
+    if not (col_producto in df_catalogo.columns and col_comp and col_cant):
+        return vacio()
+    return _limpiar_mapeo(df_catalogo[col_producto], df_catalogo[col_comp], df_catalogo[col_cant])
+
+
+def vacio():
+    return pd.DataFrame({COL_PACK: pd.Series(dtype=object), COL_COMPONENTE: pd.Series(dtype=object), COL_CANTIDAD: pd.Series(dtype=float)})
+
+
+# Hoja "Packs" (cualquier hoja cuyo nombre contenga "pack") o, si no hay, columnas de la
+# hoja principal del catálogo ya cargada (con su columna Producto Completo)
+def leer_mapeo(ruta, df_catalogo=None, col_producto="Producto Completo", motor=None):
+    libro = pd.ExcelFile(ruta, engine=motor)
+    hoja = next((h for h in libro.sheet_names if "pack" in str(h).lower()), None)
+    if hoja is not None:
+        return mapeo_desde_hoja(libro.parse(hoja))
+    if df_catalogo is None:
+        return vacio()
+    return mapeo_desde_columnas(df_catalogo, col_producto)
+
+
+# --- Matriz dispersa pack -> componente en formato COO ---
+# Expandir ventas de packs a unidades es un producto matriz-vector disperso:
+# unidades[c] = Σ ventas[p] · cantidad[p, c], que se resuelve con np.bincount sobre las aristas.
+class MatrizPacks:
+    def __init__(self, mapeo):
+        nombres = pd.concat([mapeo[COL_PACK], mapeo[COL_COMPONENTE]], ignore_index=True)
+        codigos, self.nombres = pd.factorize(nombres)
+        self.pack = codigos[:len(mapeo)]
+        self.componente = codigos[len(mapeo):]
+        self.cantidad = mapeo[COL_CANTIDAD].to_numpy(dtype=float)
+        self.es_pack = np.zeros(len(self.nombres), dtype=bool)
+        self.es_pack[self.pack] = True
+
+    def __len__(self):
+        return len(self.cantidad)
+
+    # Posición de cada nombre en la matriz (-1 si no participa en ningún pack)
+    def posiciones(self, nombres):
+        return pd.Index(self.nombres).get_indexer(normalizar_nombre(pd.Series(nombres)).to_numpy(dtype=object))
+
+    # Vector de ventas alineado con la matriz a partir de (nombres, cantidades)
+    def vector(self, nombres, cantidades):
+        pos = self.posiciones(nombres)
+        dentro = pos >= 0
+        return np.bincount(pos[dentro], weights=np.asarray(cantidades, dtype=float)[dentro], minlength=len(self.nombres))
+
+    # Unidades de cada producto consumidas a través de packs (packs anidados nivel a nivel)
+    def expandir(self, ventas):
+        consumo = np.zeros(len(self.nombres))
+        nivel = np.asarray(ventas, dtype=float)
+        for _ in range(MAX_NIVELES):
+            aporte = np.bincount(self.componente, weights=nivel[self.pack] * self.cantidad, minlength=len(self.nombres))
+            if not aporte.any():
+                break
+            consumo += aporte
+            nivel = np.where(self.es_pack, aporte, 0.0)
+        return consumo
+
+    # Packs que se pueden armar con lo disponible: mínimo sobre sus componentes de
+    # floor(disponible / cantidad). Un componente sin dato (NaN: no está en el stock conciliado)
+    # deja el pack como desconocido (NaN) en vez de calcularlo solo con los demás componentes.
+    def disponibles(self, disponible_componentes):
+        disponible = np.asarray(disponible_componentes, dtype=float).copy()
+        for _ in range(MAX_NIVELES):
+            por_arista = np.floor(disponible[self.componente] / self.cantidad)
+            # np.minimum propaga NaN (np.fmin lo ignoraría); un pack anidado se resuelve en el nivel siguiente
+            armables = np.full(len(self.nombres), np.inf)
+            with np.errstate(invalid="ignore"):
+                np.minimum.at(armables, self.pack, por_arista)
+            anterior = disponible
+            disponible = np.where(self.es_pack, armables, disponible)
+            if np.array_equal(anterior, disponible, equal_nan=True):
+                break
+        return np.where(self.es_pack, disponible, np.nan)
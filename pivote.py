@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+FORMATO_FECHA = "%d/%m/%Y"
+
+
+# --- Pivot productos × días en formato disperso (solo celdas con ventas) ---
+# Guarda las celdas no nulas como coordenadas (fila, columna, valor) y arma una tabla
+# densa únicamente para la ventana que se muestra (página de productos × rango de fechas).
+class PivotDisperso:
+    def __init__(self, detalle, col_fila, col_columna, col_valor):
+        detalle = detalle[detalle[col_columna].notna() & detalle[col_fila].notna()]
+        self.col_fila = col_fila
+        codigos_fila, self.filas = pd.factorize(detalle[col_fila], sort=True)
+        codigos_col, self.columnas = pd.factorize(detalle[col_columna], sort=True)
+        valores = detalle[col_valor].to_numpy(dtype=np.float64)
+
+        # Orden por (fila, columna) para poder cortar páginas de productos con searchsorted;
+        # la salida de un groupby ya viene ordenada y no se vuelve a ordenar
+        clave = codigos_fila.astype(np.int64) * max(len(self.columnas), 1) + codigos_col
+        if len(clave) > 1 and (np.diff(clave) < 0).any():
+            orden = np.argsort(clave, kind="stable")
+            codigos_fila, codigos_col, valores = codigos_fila[orden], codigos_col[orden], valores[orden]
+        self.fila = codigos_fila.astype(np.int32)
+        self.columna = codigos_col.astype(np.int32)
+        self.valor = valores
+
+    @property
+    def n_filas(self):
+        return len(self.filas)
+
+    @property
+    def n_columnas(self):
+        return len(self.columnas)
+
+    @property
+    def celdas(self):
+        return len(self.valor)
+
+    # Rango [desde, hasta) de columnas (fechas) entre dos límites inclusive
+    def rango_columnas(self, desde=None, hasta=None):
+        inicio = 0 if desde is None else int(self.columnas.searchsorted(desde, side="left"))
+        fin = self.n_columnas if hasta is None else int(self.columnas.searchsorted(hasta, side="right"))
+        return inicio, fin
+
+    def _en_columnas(self, inicio, fin):
+        return (self.columna >= inicio) & (self.columna < fin)
+
+    # Total por columna (suma de todos los productos) dentro del rango de fechas
+    def totales_columnas(self, inicio, fin):
+        mascara = self._en_columnas(inicio, fin)
+        return np.bincount(self.columna[mascara] - inicio, weights=self.valor[mascara], minlength=fin - inicio)
+
+    # Total por fila (producto) dentro del rango de fechas
+    def totales_filas(self, inicio, fin):
+        mascara = self._en_columnas(inicio, fin)
+        return np.bincount(self.fila[mascara], weights=self.valor[mascara], minlength=self.n_filas)
+
+    # Tabla densa para las filas [fila_desde, fila_hasta) y columnas [inicio, fin)
+    def ventana(self, fila_desde, fila_hasta, inicio, fin):
+        corte = slice(np.searchsorted(self.fila, fila_desde, side="left"),
+                      np.searchsorted(self.fila, fila_hasta, side="left"))
+        fila, columna, valor = self.fila[corte], self.columna[corte], self.valor[corte]
+        mascara = (columna >= inicio) & (columna < fin)
+
+        densa = np.zeros((fila_hasta - fila_desde, fin - inicio), dtype=np.float64)
+        densa[fila[mascara] - fila_desde, columna[mascara] - inicio] = valor[mascara]
+
+        tabla = pd.DataFrame(densa.astype(np.int64), columns=self.columnas[inicio:fin].strftime(FORMATO_FECHA))
+        tabla["Total"] = self.totales_filas(inicio, fin)[fila_desde:fila_hasta].astype(np.int64)
+        tabla.insert(0, self.col_fila, np.asarray(self.filas[fila_desde:fila_hasta], dtype=object))
+        return tabla
+
+    # Fila de totales generales (calculada sobre todos los productos, no solo la página)
+    def fila_totales(self, inicio, fin):
+        totales = self.totales_columnas(inicio, fin)
+        fila = pd.DataFrame([totales.astype(np.int64)], columns=self.columnas[inicio:fin].strftime(FORMATO_FECHA))
+        fila["Total"] = int(totales.sum())
+        fila.insert(0, self.col_fila, "Total")
+        return fila
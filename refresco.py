@@ -0,0 +1,171 @@
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import snapshot
+
+INTERVALO_POR_DEFECTO = 15 * 60
+TIMEOUT = 60
+
+
+# --- Cabeceras que identifican la versión de una fuente (ETag / Last-Modified, o tamaño+mtime local) ---
+def cabeceras_actuales(url):
+    if not snapshot._es_remota(url):
+        return {"Local": snapshot.validador_fuente(url)}
+    req = urllib.request.Request(url, method="HEAD")
+    with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+        cabeceras = _cabeceras(resp.headers)
+    if "ETag" not in cabeceras and "Last-Modified" not in cabeceras:
+        # Sin validadores la línea base es el hash del contenido (si no, la primera revisión
+        # siempre lo daría por cambiado)
+        _, cabeceras = pedir_condicional(url)
+    return cabeceras
+
+
+def _cabeceras(headers):
+    return {k: headers.get(k) for k in ("ETag", "Last-Modified", "Content-Length") if headers.get(k)}
+
+
+# Validador en el formato del snapshot de ventas
+def validador(cabeceras):
+    return cabeceras.get("Local") or snapshot.validador_desde_cabeceras(cabeceras)
+
+
+# --- Petición condicional (If-None-Match / If-Modified-Since) ---
+# Devuelve (contenido, cabeceras); contenido None si la fuente no cambió (304).
+# Si el servidor no da ETag ni Last-Modified se compara el hash del contenido.
+def pedir_condicional(url, previas=None):
+    previas = previas or {}
+    if not snapshot._es_remota(url):
+        actuales = cabeceras_actuales(url)
+        if actuales["Local"] is not None and actuales == previas:
+            return None, previas
+        with open(url, "rb") as f:
+            return f.read(), actuales
+
+    pedido = {}
+    if previas.get("ETag"):
+        pedido["If-None-Match"] = previas["ETag"]
+    if previas.get("Last-Modified"):
+        pedido["If-Modified-Since"] = previas["Last-Modified"]
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=pedido), timeout=TIMEOUT) as resp:
+            contenido = resp.read()
+            cabeceras = _cabeceras(resp.headers)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, previas
+        raise
+    cabeceras["Content-Length"] = str(len(contenido))
+    if "ETag" not in cabeceras and "Last-Modified" not in cabeceras:
+        cabeceras["Hash"] = snapshot.hash_contenido(contenido)
+        if previas.get("Hash") == cabeceras["Hash"]:
+            return None, previas
+    return contenido, cabeceras
+
+
+# --- Refresco en segundo plano (stale-while-revalidate) ---
+# Cada fuente (URL) alimenta una o más claves del almacén de datasets, cada una con su función
+# cargar(contenido, cabeceras) (contenido None = leer desde la URL). Un hilo revisa las fuentes
+# cada `intervalo` segundos con peticiones condicionales; si cambiaron, parsea fuera de la
+# ejecución de los usuarios y reemplaza la entrada del almacén de una vez: mientras tanto las
+# sesiones siguen viendo la versión anterior. Solo se refrescan claves que siguen en memoria.
+class Refrescador:
+    def __init__(self, almacen, intervalo=INTERVALO_POR_DEFECTO):
+        self.almacen = almacen
+        self.intervalo = intervalo
+        self.fuentes = {}
+        self.cerrojo = threading.Lock()
+        self._hilo = None
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+
+    def registrar(self, url, clave, cargar):
+        with self.cerrojo:
+            fuente = self.fuentes.get(url)
+            if fuente is None:
+                fuente = self.fuentes[url] = {
+                    "destinos": {}, "cabeceras": None, "proxima": time.time(),
+                    "ultima": None, "cambios": 0, "sin_cambios": 0, "error": None,
+                }
+            fuente["destinos"][clave] = cargar
+        self.iniciar()
+
+    def iniciar(self):
+        with self.cerrojo:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._detener.clear()
+                self._hilo = threading.Thread(target=self._bucle, name="refrescador-fuentes", daemon=True)
+                self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=TIMEOUT)
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            self.refrescar_pendientes()
+            with self.cerrojo:
+                proxima = min((f["proxima"] for f in self.fuentes.values()), default=time.time() + self.intervalo)
+            self._despertar.wait(timeout=max(proxima - time.time(), 0.05))
+            self._despertar.clear()
+
+    def refrescar_pendientes(self, forzar=False):
+        ahora = time.time()
+        with self.cerrojo:
+            pendientes = [url for url, f in self.fuentes.items() if forzar or f["proxima"] <= ahora]
+        for url in pendientes:
+            self.refrescar(url)
+
+    # Una revisión de una fuente; la primera solo registra sus cabeceras (lo cargado es la línea base)
+    def refrescar(self, url):
+        with self.cerrojo:
+            fuente = self.fuentes[url]
+            destinos = dict(fuente["destinos"])
+            previas = fuente["cabeceras"]
+        try:
+            if previas is None:
+                contenido, cabeceras = None, cabeceras_actuales(url)
+            else:
+                contenido, cabeceras = pedir_condicional(url, previas)
+            if contenido is not None:
+                # En orden de registro: una clave puede depender de otra de la misma fuente
+                for clave, cargar in destinos.items():
+                    if self.almacen.contiene(clave):
+                        self.almacen.guardar(clave, cargar(contenido, cabeceras))
+            error = None
+        except Exception as e:
+            contenido, cabeceras, error = None, previas, f"{type(e).__name__}: {e}"
+        with self.cerrojo:
+            fuente["cabeceras"] = cabeceras
+            fuente["ultima"] = time.time()
+            fuente["proxima"] = fuente["ultima"] + self.intervalo
+            fuente["error"] = error
+            if error is None and previas is not None:
+                fuente["cambios" if contenido is not None else "sin_cambios"] += 1
+
+    # Fuerza una revisión inmediata en el hilo de fondo
+    def despertar(self):
+        with self.cerrojo:
+            for fuente in self.fuentes.values():
+                fuente["proxima"] = 0
+        self._despertar.set()
+
+    # Para el panel de depuración
+    def estado(self):
+        ahora = time.time()
+        with self.cerrojo:
+            return [
+                {
+                    "Fuente": url,
+                    "Última revisión (s)": ahora - f["ultima"] if f["ultima"] else None,
+                    "Próxima (s)": max(f["proxima"] - ahora, 0),
+                    "Cambios": f["cambios"],
+                    "Sin cambios": f["sin_cambios"],
+                    "Error": f["error"] or "",
+                }
+                for url, f in self.fuentes.items()
+            ]
@@ -0,0 +1,199 @@
+import copy
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import carga
+
+# Fuente de stock por defecto (antes fija en la pestaña de cuadratura)
+URL_STOCK_POR_DEFECTO = "https://raw.githubusercontent.com/Adolfoignaciodg/Botillera-/main/stock.xlsx"
+SUCURSAL_POR_DEFECTO = "Principal"
+MEMORIA_MAX_MB = 1024
+INTERVALO_REFRESCO = 15 * 60
+
+
+# --- Registro de datasets: una entrada por sucursal / local ---
+# report.json puede listar sucursales con sus propias fuentes; lo que una sucursal no define
+# (slice, formatos, catálogo compartido...) lo hereda del nivel superior:
+#   "sucursales": [
+#       {"nombre": "Maria Bonita", "dataSource": {"filename": ...}, "stock": {"url": ...}},
+#       {"nombre": "Pandita", "dataSource": {"filename": ...}, "stock": {"url": ...}}
+#   ],
+#   "registro": {"memoriaMaxMB": 2048, "refrescoSegundos": 900, "hilosCarga": 4, "procesosCarga": 2}
+# Sin "sucursales" hay un único dataset con las fuentes del nivel superior.
+def leer_registro(config):
+    base = {k: v for k, v in config.items() if k not in ("sucursales", "registro")}
+    base.setdefault("stock", {"url": URL_STOCK_POR_DEFECTO})
+    registro = {}
+    for i, entrada in enumerate(config.get("sucursales") or [{"nombre": SUCURSAL_POR_DEFECTO}]):
+        dataset = copy.deepcopy(base)
+        for seccion, valor in entrada.items():
+            if seccion == "nombre":
+                continue
+            if isinstance(valor, dict) and isinstance(dataset.get(seccion), dict):
+                dataset[seccion] = {**dataset[seccion], **valor}
+            else:
+                dataset[seccion] = valor
+        registro[str(entrada.get("nombre") or f"Sucursal {i + 1}")] = dataset
+    return registro
+
+
+def fuentes(dataset):
+    return {
+        "ventas": dataset.get("dataSource", {}).get("filename", ""),
+        "catalogo": dataset.get("catalogoProductos", {}).get("url", ""),
+        "stock": dataset.get("stock", {}).get("url", ""),
+    }
+
+
+def intervalo_refresco(config):
+    return float(config.get("registro", {}).get("refrescoSegundos", INTERVALO_REFRESCO))
+
+
+# Pools de la carga concurrente de fuentes (procesosCarga 0: los Excel se parsean en los hilos).
+# El dashboard usa solo los hilos; procesosCarga aplica a generar_informes.py
+def pools_carga(config):
+    seccion = config.get("registro", {})
+    return (
+        int(seccion.get("hilosCarga", carga.HILOS_POR_DEFECTO)),
+        int(seccion.get("procesosCarga", carga.PROCESOS_POR_DEFECTO)),
+    )
+
+
+def memoria_max_bytes(config):
+    return int(float(config.get("registro", {}).get("memoriaMaxMB", MEMORIA_MAX_MB)) * 1024 ** 2)
+
+
+# --- Tamaño aproximado en memoria de lo que se guarda (frames, arrays y objetos que los contienen) ---
+def tamano_bytes(valor, vistos=None):
+    vistos = set() if vistos is None else vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    if isinstance(valor, (pd.DataFrame, pd.Series, pd.Index)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum() if isinstance(valor, pd.DataFrame) else uso)
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, dict):
+        return sum(tamano_bytes(v, vistos) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sum(tamano_bytes(v, vistos) for v in valor)
+    if hasattr(valor, "__dict__"):
+        # Objetos con cachés que crecen después de guardarse (las vistas de filtros.MotorFiltros)
+        # declaran su tope y se cuenta desde el principio
+        reservado = valor.bytes_reservados() if hasattr(valor, "bytes_reservados") else 0
+        return tamano_bytes(vars(valor), vistos) + reservado
+    return 0
+
+
+# --- Memoria por columna de un frame (panel de depuración y benchmark de memoria) ---
+def memoria_por_columna(df):
+    uso = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({"Columna": uso.index, "Tipo": df.dtypes.astype(str).to_numpy(), "KB": uso.to_numpy() / 1024})
+
+
+# Antes / después por columna; las columnas que no están en uno de los dos quedan vacías
+def informe_memoria(antes, despues):
+    informe = memoria_por_columna(antes).merge(
+        memoria_por_columna(despues), on="Columna", how="outer", sort=False, suffixes=(" antes", " después")
+    )
+    total = {"Columna": "TOTAL", "KB antes": informe["KB antes"].sum(), "KB después": informe["KB después"].sum()}
+    return pd.concat([informe, pd.DataFrame([total])], ignore_index=True)
+
+
+# --- Almacén de datasets compartido por todas las sesiones del proceso ---
+# LRU con presupuesto de memoria: al superar el máximo se descartan las entradas usadas hace
+# más tiempo (nunca la recién guardada). Cada clave se carga una sola vez aunque varias
+# sesiones la pidan a la vez; las entradas con ttl vencido se vuelven a cargar.
+class AlmacenDatasets:
+    def __init__(self, memoria_max):
+        self.memoria_max = memoria_max
+        self.entradas = OrderedDict()
+        self.cerrojo = threading.Lock()
+        self.cargando = {}
+        self._versiones = itertools.count(1)
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def _vigente(self, clave):
+        entrada = self.entradas.get(clave)
+        if entrada is None:
+            return None
+        if entrada["ttl"] is not None and time.time() - entrada["cargado"] > entrada["ttl"]:
+            return None
+        self.entradas.move_to_end(clave)
+        return entrada
+
+    def obtener(self, clave, cargar, ttl=None):
+        with self.cerrojo:
+            entrada = self._vigente(clave)
+            if entrada is not None:
+                self.aciertos += 1
+                return entrada["valor"]
+            cerrojo_clave = self.cargando.setdefault(clave, threading.Lock())
+        with cerrojo_clave:
+            # Otra sesión pudo terminar de cargarlo mientras se esperaba
+            with self.cerrojo:
+                entrada = self._vigente(clave)
+                if entrada is not None:
+                    self.aciertos += 1
+                    return entrada["valor"]
+                self.fallos += 1
+            try:
+                valor = cargar()
+                self.guardar(clave, valor, ttl)
+            finally:
+                with self.cerrojo:
+                    self.cargando.pop(clave, None)
+            return valor
+
+    # Reemplazo atómico: quien ya tomó el valor anterior lo sigue usando hasta su próxima ejecución
+    def guardar(self, clave, valor, ttl=None):
+        entrada = {"valor": valor, "bytes": tamano_bytes(valor), "cargado": time.time(), "ttl": ttl}
+        with self.cerrojo:
+            entrada["version"] = next(self._versiones)
+            self.entradas[clave] = entrada
+            self.entradas.move_to_end(clave)
+            while self.memoria_usada() > self.memoria_max and len(self.entradas) > 1:
+                self.entradas.popitem(last=False)
+                self.desalojos += 1
+
+    def contiene(self, clave):
+        with self.cerrojo:
+            return clave in self.entradas
+
+    # Versión de una entrada (cambia cada vez que se guarda): para claves de cálculos derivados
+    def version(self, clave):
+        with self.cerrojo:
+            entrada = self.entradas.get(clave)
+            return entrada["version"] if entrada else None
+
+    def descartar(self, clave):
+        with self.cerrojo:
+            self.entradas.pop(clave, None)
+
+    def limpiar(self):
+        with self.cerrojo:
+            self.entradas.clear()
+
+    def memoria_usada(self):
+        return sum(e["bytes"] for e in self.entradas.values())
+
+    # Para el panel de depuración: una fila por entrada, la más reciente primero
+    def estadisticas(self):
+        ahora = time.time()
+        with self.cerrojo:
+            return [
+                {
+                    "Clave": " · ".join(str(p) for p in clave[:2]) if isinstance(clave, tuple) else str(clave),
+                    "MB": e["bytes"] / 1024 ** 2,
+                    "Edad (s)": ahora - e["cargado"],
+                }
+                for clave, e in reversed(self.entradas.items())
+            ]
@@ -0,0 +1,226 @@
+import collections
+import contextlib
+import functools
+import http.server
+import json
+import os
+import threading
+import time
+
+# Medición por etapa de cada ejecución del script (carga, derivación, filtros, cálculo y render
+# de cada pestaña). Las etapas se anidan: cada una guarda su tiempo total y el propio (sin las
+# etapas internas), y la variación de memoria residente del proceso. Al terminar la ejecución
+# se agrega al historial del proceso, al log local y a las métricas en formato Prometheus.
+#   report.json: "rendimiento": {"log": "rendimiento.jsonl", "puertoPrometheus": 9108,
+#                                "hostPrometheus": "127.0.0.1", "historial": 200}
+# El endpoint escucha solo en localhost salvo que hostPrometheus diga otra cosa (p. ej. "0.0.0.0").
+HISTORIAL_POR_DEFECTO = 200
+HOST_PROMETHEUS_POR_DEFECTO = "127.0.0.1"
+MAX_BYTES_LOG = 5 * 1024 ** 2
+
+_local = threading.local()
+_cerrojo = threading.Lock()
+_historial = collections.deque(maxlen=HISTORIAL_POR_DEFECTO)
+_acumulado = {}  # etiqueta de la etapa -> [segundos, cantidad, último]
+_ejecuciones = [0, 0.0]  # cantidad, segundos
+_opciones = {"log": None}
+
+
+def opciones(config):
+    seccion = (config or {}).get("rendimiento", {})
+    return {
+        "log": seccion.get("log") or None,
+        "puertoPrometheus": int(seccion.get("puertoPrometheus", 0) or 0),
+        "hostPrometheus": seccion.get("hostPrometheus") or HOST_PROMETHEUS_POR_DEFECTO,
+        "historial": int(seccion.get("historial", HISTORIAL_POR_DEFECTO)),
+    }
+
+
+def configurar(config):
+    global _historial
+    valores = opciones(config)
+    with _cerrojo:
+        _opciones["log"] = valores["log"]
+        if _historial.maxlen != valores["historial"]:
+            _historial = collections.deque(_historial, maxlen=valores["historial"])
+    return valores
+
+
+# Memoria residente del proceso en MB (Linux); None donde no hay /proc
+def memoria_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# --- Ejecución en curso (una por hilo: cada sesión de Streamlit corre su script en su hilo) ---
+def iniciar(**datos):
+    _local.ejecucion = {"inicio": time.perf_counter(), "hora": time.time(), "etapas": [], "pila": [], "datos": dict(datos)}
+
+
+def _ejecucion():
+    return getattr(_local, "ejecucion", None)
+
+
+# Datos de la ejecución para el historial (p. ej. filas de ventas, sucursal)
+def anotar(**datos):
+    ejecucion = _ejecucion()
+    if ejecucion is not None:
+        ejecucion["datos"].update(datos)
+
+
+# etiqueta: nombre fijo para las métricas acumuladas cuando el nombre lleva datos variables
+# (p. ej. una tabla por categoría), para que las series de Prometheus no crezcan sin límite
+@contextlib.contextmanager
+def etapa(nombre, etiqueta=None):
+    ejecucion = _ejecucion()
+    if ejecucion is None:
+        yield
+        return
+    registro = {"Etapa": nombre, "etiqueta": etiqueta or nombre, "nivel": len(ejecucion["pila"]), "hijos": 0.0}
+    ejecucion["etapas"].append(registro)
+    ejecucion["pila"].append(registro)
+    memoria = memoria_mb()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        ejecucion["pila"].pop()
+        registro["segundos"] = segundos
+        registro["Δ MB"] = memoria_mb() - memoria if memoria is not None else None
+        if ejecucion["pila"]:
+            ejecucion["pila"][-1]["hijos"] += segundos
+
+
+# Decorador: mide cada llamada como una etapa (por defecto con el nombre de la función)
+def medir(nombre=None):
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with etapa(nombre or funcion.__name__):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+# Cierra la ejecución: historial, log y métricas acumuladas
+def terminar():
+    ejecucion = _ejecucion()
+    if ejecucion is None:
+        return None
+    _local.ejecucion = None
+    total = time.perf_counter() - ejecucion["inicio"]
+    # Etapas todavía abiertas (app.detener dentro de una etapa) se cierran con el total
+    for registro in ejecucion["etapas"]:
+        registro.setdefault("segundos", total)
+        registro.setdefault("Δ MB", None)
+    resumen = {
+        "hora": ejecucion["hora"],
+        "total_ms": total * 1000,
+        "etapas": {r["Etapa"]: r["segundos"] * 1000 for r in ejecucion["etapas"] if r["nivel"] == 0},
+        **ejecucion["datos"],
+    }
+    with _cerrojo:
+        _historial.append(resumen)
+        _ejecuciones[0] += 1
+        _ejecuciones[1] += total
+        for registro in ejecucion["etapas"]:
+            acumulado = _acumulado.setdefault(registro["etiqueta"], [0.0, 0, 0.0])
+            acumulado[0] += registro["segundos"]
+            acumulado[1] += 1
+            acumulado[2] = registro["segundos"]
+        ruta_log = _opciones["log"]
+    if ruta_log:
+        escribir_log(ruta_log, resumen)
+    _local.ultima = ejecucion["etapas"], total
+    return resumen
+
+
+# Etapas de la última ejecución terminada en este hilo, para el panel
+def ultima():
+    etapas, total = getattr(_local, "ultima", ([], 0.0))
+    filas = [{
+        "Etapa": "  " * r["nivel"] + r["Etapa"],
+        "ms": r["segundos"] * 1000,
+        "Propio (ms)": (r["segundos"] - r["hijos"]) * 1000,
+        "Δ MB": r["Δ MB"],
+    } for r in etapas]
+    return filas, total
+
+
+def historial():
+    with _cerrojo:
+        return list(_historial)
+
+
+# --- Log local: una línea JSON por ejecución; al pasar MAX_BYTES_LOG se rota a .1 ---
+def escribir_log(ruta, resumen):
+    try:
+        if os.path.exists(ruta) and os.path.getsize(ruta) > MAX_BYTES_LOG:
+            os.replace(ruta, ruta + ".1")
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(resumen, ensure_ascii=False, default=str) + "\n")
+    except OSError:
+        pass
+
+
+# --- Métricas en formato de texto de Prometheus ---
+def _etiqueta(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def texto_prometheus():
+    with _cerrojo:
+        acumulado = {k: list(v) for k, v in _acumulado.items()}
+        ejecuciones, segundos = _ejecuciones
+        ultima_ejecucion = _historial[-1] if _historial else {}
+    lineas = [
+        "# HELP botilleria_ejecucion_segundos Duración de las ejecuciones del script del dashboard",
+        "# TYPE botilleria_ejecucion_segundos summary",
+        f"botilleria_ejecucion_segundos_sum {segundos}",
+        f"botilleria_ejecucion_segundos_count {ejecuciones}",
+        "# HELP botilleria_etapa_segundos Duración de cada etapa (incluye sus etapas internas)",
+        "# TYPE botilleria_etapa_segundos summary",
+    ]
+    for nombre, (suma, cantidad, _) in sorted(acumulado.items()):
+        lineas.append(f'botilleria_etapa_segundos_sum{{etapa="{_etiqueta(nombre)}"}} {suma}')
+        lineas.append(f'botilleria_etapa_segundos_count{{etapa="{_etiqueta(nombre)}"}} {cantidad}')
+    lineas += [
+        "# HELP botilleria_etapa_ultima_segundos Duración de la etapa en su última ejecución",
+        "# TYPE botilleria_etapa_ultima_segundos gauge",
+    ]
+    for nombre, (_, _, ultimo) in sorted(acumulado.items()):
+        lineas.append(f'botilleria_etapa_ultima_segundos{{etapa="{_etiqueta(nombre)}"}} {ultimo}')
+    if "filas" in ultima_ejecucion:
+        lineas += [
+            "# HELP botilleria_filas_ventas Filas de ventas cargadas en la última ejecución",
+            "# TYPE botilleria_filas_ventas gauge",
+            f"botilleria_filas_ventas {ultima_ejecucion['filas']}",
+        ]
+    return "\n".join(lineas) + "\n"
+
+
+class _ManejadorMetricas(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        cuerpo = texto_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+# Endpoint /metrics en un hilo del proceso (una vez por proceso: app.py lo guarda en cache_resource)
+def servir_prometheus(puerto, host=HOST_PROMETHEUS_POR_DEFECTO):
+    servidor = http.server.ThreadingHTTPServer((host, puerto), _ManejadorMetricas)
+    threading.Thread(target=servidor.serve_forever, name="metricas-prometheus", daemon=True).start()
+    return servidor
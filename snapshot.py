@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import time
+import urllib.request
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import claves_producto
+import indice_fechas
+import ingesta
+
+# Directorio donde se guardan los snapshots columnares (Feather sin compresión para poder mapearlos)
+DIR_CACHE = os.environ.get("BOTILLERIA_CACHE_DIR", ".cache_botilleria")
+
+# Se incrementa cuando cambia el contenido del snapshot (columnas derivadas, tipos)
+VERSION_FORMATO = 4
+
+def _es_remota(url):
+    return url.startswith(("http://", "https://"))
+
+
+def clave_fuente(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+def rutas_snapshot(url, directorio=None):
+    base = os.path.join(directorio or DIR_CACHE, clave_fuente(url))
+    return base + ".feather", base + ".json"
+
+
+# --- Validador barato de la fuente: ETag/Last-Modified o tamaño + mtime ---
+def validador_fuente(url):
+    if not _es_remota(url):
+        try:
+            info = os.stat(url)
+        except OSError:
+            return None
+        return f"local:{info.st_size}:{info.st_mtime_ns}"
+    try:
+        req = urllib.request.Request(url, method="HEAD")
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return validador_desde_cabeceras(resp.headers)
+    except Exception:
+        return None
+
+
+# Mismo validador a partir de las cabeceras de una respuesta (HEAD o GET)
+def validador_desde_cabeceras(cabeceras):
+    etag = cabeceras.get("ETag")
+    modificado = cabeceras.get("Last-Modified")
+    if etag:
+        return f"etag:{etag}"
+    if modificado:
+        return f"mod:{modificado}:{cabeceras.get('Content-Length', '')}"
+    return None
+
+
+def hash_contenido(contenido):
+    return "sha256:" + hashlib.sha256(contenido).hexdigest()
+
+
+# El esquema de tipos sale del slice: si cambia, el snapshot ya no sirve
+def huella_config(config):
+    slice_cfg = json.dumps((config or {}).get("slice", {}), sort_keys=True)
+    return hashlib.sha1(slice_cfg.encode("utf-8")).hexdigest()[:16]
+
+
+# Identificador de la versión de los datos (para cachés derivados: cubo, índices)
+def version_datos(meta):
+    partes = [str(meta.get(k)) for k in ("url", "validador", "hash", "bytes", "config")]
+    return hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()[:16]
+
+
+def leer_meta(url, directorio=None, config=None):
+    ruta_datos, ruta_meta = rutas_snapshot(url, directorio)
+    if not os.path.exists(ruta_datos):
+        return None
+    try:
+        with open(ruta_meta, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("url") != url or meta.get("version") != VERSION_FORMATO:
+        return None
+    if config is not None and meta.get("config") != huella_config(config):
+        return None
+    return meta
+
+
+# --- Lectura mapeada en memoria del snapshot ---
+def leer_snapshot(url, directorio=None):
+    ruta_datos, _ = rutas_snapshot(url, directorio)
+    tabla = feather.read_table(ruta_datos, memory_map=True)
+    # split_blocks evita consolidar columnas y permite zero-copy en numéricas
+    return tabla.to_pandas(split_blocks=True)
+
+
+# --- Escritura atómica (archivo temporal + os.replace) ---
+def escribir_snapshot(url, df, meta, directorio=None):
+    ruta_datos, _ = rutas_snapshot(url, directorio)
+    os.makedirs(os.path.dirname(ruta_datos) or ".", exist_ok=True)
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_datos = ruta_datos + ".tmp"
+    feather.write_feather(tabla, tmp_datos, compression="uncompressed")
+    os.replace(tmp_datos, ruta_datos)
+
+    escribir_meta(url, dict(meta, filas=len(df), creado=time.time()), directorio)
+
+
+def escribir_meta(url, meta, directorio=None):
+    _, ruta_meta = rutas_snapshot(url, directorio)
+    meta = dict(meta, url=url, version=VERSION_FORMATO)
+    tmp_meta = ruta_meta + ".tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_meta, ruta_meta)
+
+
+# Parseo + columnas derivadas: lo que queda guardado en el snapshot
+def procesar_ventas(contenido, config, sep=None):
+    df, stats = ingesta.leer_csv_tipado(contenido, config=config, sep=sep)
+    col_fecha = _buscar_col(df.columns, "fecha")
+    if col_fecha and pd.api.types.is_datetime64_any_dtype(df[col_fecha]):
+        ingesta.derivar_columnas_fecha(df, col_fecha)
+        # El snapshot se guarda ordenado por fecha (rangos de fechas por búsqueda binaria)
+        df = indice_fechas.ordenar_por_fecha(df, col_fecha)
+    por_nombre = {ingesta.nombre_base(c): c for c in df.columns}
+    claves_producto.agregar_clave_producto(df, por_nombre.get("Producto / Servicio"), por_nombre.get("Variante"))
+    # La variante ya quedó en "Producto Completo"; ninguna pestaña la usa por separado
+    if por_nombre.get("Variante") and por_nombre.get("Producto / Servicio"):
+        df.drop(columns=por_nombre["Variante"], inplace=True)
+    ingesta.compactar(df, excluir=[claves_producto.COL_ID_PRODUCTO])
+    return df, stats
+
+
+def _buscar_col(columnas, busqueda):
+    return next((c for c in columnas if busqueda in c.lower()), None)
+
+
+# Columnas que identifican un documento (tipo + número) para detectar correcciones
+def columnas_documento(columnas):
+    num = _buscar_col(columnas, "numero documento")
+    tipo = _buscar_col(columnas, "tipo de documento")
+    return [c for c in (tipo, num) if c]
+
+
+# Marca de agua: última fecha y mayor número de documento ya cargados
+def marca_de_agua(df):
+    col_fecha = _buscar_col(df.columns, "fecha")
+    claves = columnas_documento(df.columns)
+    marca = {"fecha": None, "documento": None}
+    if col_fecha and df[col_fecha].notna().any():
+        marca["fecha"] = df[col_fecha].max().isoformat()
+    if claves and pd.api.types.is_numeric_dtype(df[claves[-1]]) and df[claves[-1]].notna().any():
+        marca["documento"] = int(df[claves[-1]].max())
+    return marca
+
+
+# Datos de la fuente que permiten retomar la carga en el próximo refresco
+def meta_fuente(contenido, huella, sep, validador, config):
+    return {
+        "validador": validador,
+        "hash": huella,
+        "bytes": len(contenido),
+        "sep": sep,
+        "cabecera": contenido[:contenido.find(b"\n") + 1].decode("utf-8"),
+        "config": huella_config(config),
+    }
+
+
+# Une dos frames manteniendo las columnas categóricas (sin recodificar la base)
+def concatenar(base, nuevos):
+    for col in base.columns:
+        if col in nuevos.columns and isinstance(base[col].dtype, pd.CategoricalDtype):
+            valores_nuevos = nuevos[col].astype(object).dropna().unique()
+            faltantes = pd.Index(valores_nuevos).difference(base[col].cat.categories)
+            if len(faltantes):
+                base[col] = base[col].cat.add_categories(faltantes)
+            nuevos[col] = pd.Categorical(nuevos[col].astype(object), categories=base[col].cat.categories)
+    return pd.concat([base, nuevos], ignore_index=True)
+
+
+# --- Fusión de filas nuevas: documentos ya existentes se reemplazan (correcciones) ---
+def fusionar(base, nuevos):
+    claves = columnas_documento(base.columns)
+    reemplazar = pd.Series(False, index=base.index)
+    if claves and all(c in nuevos.columns for c in claves):
+        col_num = claves[-1]
+        # Primero un isin numérico barato; la clave completa solo sobre los candidatos
+        candidatos = base[col_num].isin(nuevos[col_num].unique())
+        if candidatos.any():
+            idx_base = pd.MultiIndex.from_frame(base.loc[candidatos, claves].astype(object))
+            idx_nuevos = pd.MultiIndex.from_frame(nuevos[claves].astype(object))
+            reemplazar.loc[candidatos] = idx_base.isin(idx_nuevos)
+    correcciones = int(reemplazar.sum())
+    if correcciones:
+        base = base.loc[~reemplazar]
+    return concatenar(base, nuevos), correcciones
+
+
+# --- Refresco incremental: solo se parsean los bytes agregados ---
+# Se trabaja siempre sobre el archivo completo: con solo la cola (Range) no se puede saber si
+# cambió algo antes, y una corrección de un documento ya cargado quedaría sin ver. Descargar es
+# barato frente a parsear; el hash de lo ya procesado decide si alcanza con agregar las filas nuevas.
+def actualizar_incremental(url, config, meta, validador, contenido, directorio=None):
+    largo = meta.get("bytes")
+    if not largo or not meta.get("hash") or not meta.get("cabecera"):
+        return None
+    inicio = time.perf_counter()
+    procesado = contenido[:largo]
+    if len(procesado) != largo or hash_contenido(procesado) != meta["hash"]:
+        # Lo ya procesado cambió (no es solo un append): hay que recargar completo
+        return None
+    if not procesado.endswith(b"\n") and len(contenido) > largo:
+        return None
+
+    agregados = contenido[largo:]
+    if not agregados.strip():
+        # Sin bytes nuevos: si el validador cambió, lo resuelve la comparación por hash de cargar_ventas
+        if validador and validador != meta.get("validador"):
+            return None
+        base = leer_snapshot(url, directorio)
+        return base, _stats_snapshot(base, inicio, meta)
+
+    base = leer_snapshot(url, directorio)
+    nuevos, stats = procesar_ventas(meta["cabecera"].encode("utf-8") + agregados, config, sep=meta["sep"])
+    marca = meta.get("marca") or {}
+    tardias = 0
+    col_fecha = _buscar_col(nuevos.columns, "fecha")
+    if marca.get("fecha") and col_fecha:
+        tardias = int((nuevos[col_fecha] < pd.Timestamp(marca["fecha"])).sum())
+
+    df, correcciones = fusionar(base, nuevos)
+    # Filas tardías o corregidas quedan al final: se reordena (sin costo si ya está ordenado)
+    df = indice_fechas.ordenar_por_fecha(df, _buscar_col(df.columns, "fecha"))
+
+    nueva_meta = dict(
+        meta,
+        validador=validador,
+        hash=hash_contenido(contenido),
+        bytes=len(contenido),
+        marca=marca_de_agua(df),
+    )
+    try:
+        escribir_snapshot(url, df, nueva_meta, directorio)
+    except OSError:
+        pass
+
+    segundos = time.perf_counter() - inicio
+    stats.update({
+        "origen": "incremental",
+        "version_datos": version_datos(dict(nueva_meta, url=url)),
+        "filas": len(df),
+        "filas_nuevas": len(nuevos),
+        "correcciones": correcciones,
+        "tardias": tardias,
+        "segundos": segundos,
+        "filas_por_segundo": len(nuevos) / segundos if segundos > 0 else 0.0,
+    })
+    return df, stats
+
+
+# --- Carga de ventas usando el snapshot local cuando la fuente no cambió ---
+# contenido/validador: el archivo ya descargado y su validador (refresco en segundo plano),
+# para no volver a pedirlo.
+def cargar_ventas(url, config, directorio=None, contenido=None, validador=None):
+    inicio = time.perf_counter()
+    meta = leer_meta(url, directorio, config)
+    if contenido is None:
+        validador = validador_fuente(url)
+
+    if meta and validador and meta.get("validador") == validador:
+        df = leer_snapshot(url, directorio)
+        return df, _stats_snapshot(df, inicio, meta)
+
+    if contenido is None:
+        contenido = ingesta.leer_bytes(url)
+    if meta:
+        resultado = actualizar_incremental(url, config, meta, validador, contenido, directorio)
+        if resultado is not None:
+            return resultado
+    huella = hash_contenido(contenido)
+
+    # Sin ETag/Last-Modified el hash del contenido evita al menos el parseo
+    if meta and meta.get("hash") == huella:
+        df = leer_snapshot(url, directorio)
+        if validador:
+            escribir_meta(url, dict(meta, validador=validador), directorio)
+        return df, _stats_snapshot(df, inicio, meta)
+
+    sep = ingesta.detectar_separador(contenido)
+    df, stats = procesar_ventas(contenido, config, sep=sep)
+    meta = meta_fuente(contenido, huella, sep, validador, config)
+    meta["marca"] = marca_de_agua(df)
+    try:
+        escribir_snapshot(url, df, meta, directorio)
+    except OSError:
+        # Sin permisos de escritura el dashboard sigue funcionando sin snapshot
+        pass
+    stats["origen"] = "csv"
+    stats["version_datos"] = version_datos(dict(meta, url=url))
+    return df, stats
+
+
+def _stats_snapshot(df, inicio, meta):
+    segundos = time.perf_counter() - inicio
+    return {
+        "origen": "snapshot",
+        "version_datos": version_datos(meta),
+        "motor": "feather",
+        "filas": len(df),
+        "segundos": segundos,
+        "filas_por_segundo": len(df) / segundos if segundos > 0 else 0.0,
+    }
+
+
+# --- Snapshot de tablas auxiliares (catálogo, stock, packs) en el mismo formato columnar ---
+# `clave` distingue tablas que salen del mismo archivo (catálogo y packs). Vale si coincide el
+# validador de la fuente o, sin validador, el hash del contenido ya descargado.
+def tabla_vigente(clave, validador=None, huella=None, directorio=None):
+    meta = leer_meta(clave, directorio)
+    if meta is None:
+        return None
+    if validador and meta.get("validador") == validador:
+        return leer_snapshot(clave, directorio)
+    if huella and meta.get("hash") == huella:
+        if validador:
+            escribir_meta(clave, dict(meta, validador=validador), directorio)
+        return leer_snapshot(clave, directorio)
+    return None
+
+
+def guardar_tabla(clave, df, validador, huella, directorio=None):
+    try:
+        escribir_snapshot(clave, df, {"validador": validador, "hash": huella}, directorio)
+    except (OSError, pa.ArrowException):
+        # Sin permisos de escritura (o tipos que Arrow no acepta) se sigue sin snapshot
+        pass
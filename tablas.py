@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import exportar
+import rendimiento
+
+FILAS_POR_PAGINA = 100
+SIN_ORDEN = "(orden original)"
+
+
+# --- Formatos por columna (se aplican solo a las celdas de la página visible) ---
+# Mismo texto que los f-strings que se usaban celda a celda sobre el frame completo;
+# los valores no numéricos se muestran tal cual.
+def _numerico(funcion):
+    def formatear(x):
+        try:
+            return funcion(float(x))
+        except (TypeError, ValueError):
+            return x
+    return formatear
+
+
+FORMATOS = {
+    "entero": _numerico(lambda x: f"{int(x):,}".replace(",", ".")),
+    "numero": _numerico(lambda x: f"{x:,.0f}".replace(",", ".")),
+    "moneda": _numerico(lambda x: f"${x:,.0f}".replace(",", ".")),
+    "moneda_decimal": _numerico(lambda x: f"${x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")),
+    "porcentaje": _numerico(lambda x: f"{float(np.round(x * 100, 2))}%"),
+}
+
+
+# --- Búsqueda del lado del servidor: subcadena sin distinguir mayúsculas en columnas de texto ---
+def filtrar_texto(df, texto):
+    texto = (texto or "").strip()
+    if not texto or df.empty:
+        return df
+    mascara = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Se busca en las categorías (pocas) y se marcan las filas por código
+            coincide = serie.cat.categories.astype(str).str.contains(texto, case=False, regex=False)
+            mascara |= np.isin(serie.cat.codes.to_numpy(), np.flatnonzero(coincide))
+        elif pd.api.types.is_string_dtype(serie.dtype) or serie.dtype == object:
+            mascara |= serie.astype(str).str.contains(texto, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+    return df[mascara]
+
+
+def ordenar(df, columna, descendente=False):
+    if not columna or columna == SIN_ORDEN or columna not in df.columns:
+        return df
+    try:
+        return df.sort_values(columna, ascending=not descendente, kind="stable", na_position="last")
+    except TypeError:
+        # Columnas con valores mixtos (texto + números): orden por su texto
+        return df.sort_values(columna, ascending=not descendente, kind="stable", na_position="last", key=lambda s: s.astype(str))
+
+
+def pagina(df, numero, filas_por_pagina=FILAS_POR_PAGINA):
+    inicio = (numero - 1) * filas_por_pagina
+    return df.iloc[inicio:inicio + filas_por_pagina]
+
+
+# Arrow no admite columnas con valores mixtos (p. ej. números y "No aplica"): en la página
+# visible se envían como texto
+def _columnas_mixtas_a_texto(df_pagina):
+    mixtas = [c for c in df_pagina.columns
+              if df_pagina[c].dtype == object
+              and pd.api.types.infer_dtype(df_pagina[c], skipna=True) in ("mixed", "mixed-integer")]
+    if not mixtas:
+        return df_pagina
+    df_pagina = df_pagina.copy()
+    for c in mixtas:
+        df_pagina[c] = df_pagina[c].astype(str)
+    return df_pagina
+
+
+def _estilizar(df_pagina, formatos, estilos):
+    styler = df_pagina.style
+    for col, formato in (formatos or {}).items():
+        if col in df_pagina.columns:
+            styler = styler.format(FORMATOS.get(formato, formato), subset=[col])
+    for funcion, columnas in estilos or []:
+        columnas = [c for c in columnas if c in df_pagina.columns]
+        if columnas:
+            # Styler.applymap pasó a llamarse Styler.map en pandas 2.1
+            aplicar = getattr(styler, "map", None) or styler.applymap
+            styler = aplicar(funcion, subset=columnas)
+    return styler
+
+
+# --- Tabla paginada del lado del servidor ---
+# Búsqueda, orden y paginación se resuelven en Python; al navegador solo viaja la página
+# visible, formateada y con estilos. Los controles aparecen solo si la tabla no cabe en
+# una página (con una sola página st.dataframe ya ordena y busca en el navegador).
+#   formatos: {columna: "entero" | "numero" | "moneda" | "moneda_decimal" | "porcentaje" | función}
+#   estilos:  [(función valor -> css, [columnas]), ...]
+#   etiqueta: nombre fijo de la etapa en las métricas si la clave lleva datos (p. ej. la categoría)
+def tabla_paginada(df, clave, formatos=None, estilos=None, filas_por_pagina=FILAS_POR_PAGINA, etiqueta=None, **kwargs_dataframe):
+    kwargs_dataframe.setdefault("use_container_width", True)
+    datos = df
+    numero = 1
+    if len(df) > filas_por_pagina:
+        col_buscar, col_orden, col_desc, col_pagina = st.columns([3, 2, 1, 1])
+        texto = col_buscar.text_input("Buscar", key=f"{clave}_buscar", placeholder="Filtrar filas por texto…")
+        columna = col_orden.selectbox("Ordenar por", [SIN_ORDEN] + [str(c) for c in df.columns], key=f"{clave}_orden")
+        descendente = col_desc.toggle("Desc.", key=f"{clave}_desc")
+        datos = ordenar(filtrar_texto(df, texto), columna, descendente)
+        paginas = max(1, -(-len(datos) // filas_por_pagina))
+        # La página vive en session_state; si la búsqueda dejó menos páginas se ajusta antes del widget
+        clave_pagina = f"{clave}_pagina"
+        st.session_state[clave_pagina] = min(st.session_state.get(clave_pagina, 1), paginas)
+        numero = int(col_pagina.number_input("Página", min_value=1, max_value=paginas, step=1, key=clave_pagina))
+
+    # Formato, estilos (Styler) y serialización de la página visible
+    with rendimiento.etapa(f"tabla · {clave}", f"tabla · {etiqueta or clave}"):
+        visible = _columnas_mixtas_a_texto(pagina(datos, numero, filas_por_pagina))
+        if formatos or estilos:
+            st.dataframe(_estilizar(visible, formatos, estilos), **kwargs_dataframe)
+        else:
+            st.dataframe(visible, **kwargs_dataframe)
+
+    if len(df) > filas_por_pagina:
+        inicio = (numero - 1) * filas_por_pagina
+        paginas = max(1, -(-len(datos) // filas_por_pagina))
+        st.caption(f"Página {numero} de {paginas} · filas {inicio + 1 if len(visible) else 0}–{inicio + len(visible)} de {len(datos):,}".replace(",", ".") +
+                   (f" (filtradas de {len(df):,})".replace(",", ".") if len(datos) != len(df) else ""))
+    return datos
+
+
+# --- Botones de descarga (XLSX y CSV) ---
+# El archivo se genera recién al hacer clic (descarga diferida) y por bloques: bloques es una
+# función sin argumentos que devuelve un iterable de frames con las mismas columnas.
+#   formatos: los de tabla_paginada (se traducen a formatos nativos de Excel)
+#   formatos_excel: exportar.formatos_config(config) (formatos de report.json)
+def descargas(clave, nombre_archivo, bloques, formatos=None, formatos_excel=None, por_defecto=None):
+    col_xlsx, col_csv, _ = st.columns([1, 1, 4])
+    col_xlsx.download_button(
+        "⬇️ Excel",
+        data=lambda: exportar.archivo_xlsx(bloques(), formatos=formatos, formatos_excel=formatos_excel, por_defecto=por_defecto),
+        file_name=f"{nombre_archivo}.xlsx",
+        mime=exportar.MIME_XLSX,
+        key=f"{clave}_descarga_xlsx",
+        on_click="ignore",
+    )
+    col_csv.download_button(
+        "⬇️ CSV",
+        data=lambda: exportar.archivo_csv(bloques()),
+        file_name=f"{nombre_archivo}.csv",
+        mime=exportar.MIME_CSV,
+        key=f"{clave}_descarga_csv",
+        on_click="ignore",
+    )
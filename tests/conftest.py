@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+CABECERA = (
+    "+Sucursal,+Tipo de Documento,+Numero Documento,+Fecha Documento,+Mes,+Vendedor,"
+    "+Tipo de Producto / Servicio,+Producto / Servicio,+Variante,+SKU,Cantidad,Subtotal Neto\n"
+)
+PRODUCTOS = [
+    ("CERVEZAS", "CERVEZA ESCUDO", "LATA 470CC", 1001, 1200.0),
+    ("VINOS", "VINO GATO NEGRO", "750CC", 1002, 3500.0),
+    ("BEBIDAS", "COCA COLA", "1.5 L", 1003, 1800.0),
+]
+
+
+# Líneas de ventas con el formato del export de Bsale: un documento por línea, un día cada 5
+def lineas_ventas(desde, hasta, cantidad=1):
+    lineas = []
+    for n in range(desde, hasta):
+        tipo, producto, variante, sku, precio = PRODUCTOS[n % len(PRODUCTOS)]
+        dia = 1 + (n // 5) % 28
+        mes = 1 + (n // 140) % 12
+        lineas.append(
+            f"CENTRAL,BOLETA,{n},{dia:02d}/{mes:02d}/2024,2024-{mes:02d},ANA,{tipo},{producto},{variante},"
+            f"{sku},{cantidad:.1f},{precio * cantidad:.1f}\n"
+        )
+    return "".join(lineas).encode("utf-8")
+
+
+@pytest.fixture
+def ventas_csv():
+    def crear(desde, hasta, cantidad=1):
+        return CABECERA.encode("utf-8") + lineas_ventas(desde, hasta, cantidad)
+    return crear
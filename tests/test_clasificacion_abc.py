@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import clasificacion_abc
+
+MESES = ["2024-01", "2024-02", "2024-03", "2024-04"]
+
+
+@pytest.fixture
+def detalle():
+    rng = np.random.default_rng(1)
+    n = 400
+    return pd.DataFrame({
+        "Tipo": rng.choice(["CERVEZAS", "VINOS"], n),
+        "Producto": rng.choice([f"PRODUCTO {i:02d}" for i in range(40)], n),
+        "Mes": rng.choice(MESES, n),
+        # Montos con decimales: sin empates al ordenar
+        "Subtotal Neto": rng.uniform(1000, 50000, n).round(2),
+        "Margen Neto": rng.uniform(100, 9000, n).round(2),
+        "Cantidad": rng.integers(1, 12, n).astype(float),
+    })
+
+
+# ABC de la pestaña 2 antes de la clasificación vectorizada: orden, cumsum y pd.cut
+def abc_original(df, valor_col, grupo_col="Producto"):
+    agrupado = df.groupby(grupo_col).agg({valor_col: "sum", "Cantidad": "sum"}).reset_index()
+    agrupado = agrupado.sort_values(by=valor_col, ascending=False)
+    agrupado["PorcAcum"] = agrupado[valor_col].cumsum() / agrupado[valor_col].sum()
+    agrupado["Clase"] = pd.cut(agrupado["PorcAcum"], bins=[0, 0.7, 0.9, 1], labels=["A", "B", "C"], include_lowest=True)
+    # Si el cumsum en float pasaba de 1 por redondeo, pd.cut dejaba el último producto sin clase:
+    # la clasificación vectorizada lo deja en C, que es lo que correspondía
+    agrupado["Clase"] = agrupado["Clase"].astype(object).where(agrupado["Clase"].notna(), "C")
+    if valor_col == "Margen Neto":
+        agrupado["Margen por Unidad"] = agrupado.apply(lambda x: x[valor_col] / x["Cantidad"] if x["Cantidad"] > 0 else 0, axis=1)
+    return agrupado
+
+
+def comparar(tabla, referencia, metrica):
+    tabla = tabla.set_index("Producto").loc[referencia["Producto"]]
+    np.testing.assert_allclose(tabla[metrica].to_numpy(), referencia[metrica].to_numpy())
+    np.testing.assert_allclose(tabla[clasificacion_abc.col_porcentaje(metrica)].to_numpy(), referencia["PorcAcum"].to_numpy())
+    assert tabla[clasificacion_abc.col_clase(metrica)].astype(str).tolist() == referencia["Clase"].astype(str).tolist()
+
+
+def test_abc_global_igual_al_acumulado_original(detalle):
+    tabla = clasificacion_abc.clasificar(detalle, "Producto", ["Subtotal Neto", "Margen Neto"])
+    for metrica in ["Subtotal Neto", "Margen Neto"]:
+        comparar(tabla, abc_original(detalle, metrica), metrica)
+    referencia = abc_original(detalle, "Margen Neto").set_index("Producto")
+    np.testing.assert_allclose(
+        tabla.set_index("Producto").loc[referencia.index, clasificacion_abc.COL_MARGEN_UNIDAD].to_numpy(),
+        referencia["Margen por Unidad"].to_numpy(),
+    )
+    # De mayor a menor en la primera métrica
+    assert tabla["Subtotal Neto"].is_monotonic_decreasing
+
+
+def test_abc_por_grupo_igual_al_original_en_cada_grupo(detalle):
+    tabla = clasificacion_abc.clasificar(detalle, "Producto", ["Subtotal Neto"], grupos=("Tipo",))
+    for tipo, grupo in detalle.groupby("Tipo"):
+        comparar(tabla[tabla["Tipo"] == tipo], abc_original(grupo, "Subtotal Neto"), "Subtotal Neto")
+
+
+def test_xyz_con_los_meses_sin_ventas_en_cero(detalle):
+    # Un producto con ventas en un solo mes de los cuatro: demanda errática, no estable
+    detalle = pd.concat([detalle, pd.DataFrame({
+        "Tipo": ["VINOS"], "Producto": ["PRODUCTO NUEVO"], "Mes": ["2024-02"],
+        "Subtotal Neto": [1000.5], "Margen Neto": [100.5], "Cantidad": [6.0],
+    })], ignore_index=True)
+    tabla = clasificacion_abc.clasificar(detalle, "Producto", ["Subtotal Neto"], col_periodo="Mes").set_index("Producto")
+
+    mensual = detalle.pivot_table(index="Producto", columns="Mes", values="Cantidad", aggfunc="sum", fill_value=0)
+    mensual = mensual.reindex(columns=MESES, fill_value=0)
+    cv = mensual.std(axis=1, ddof=0) / mensual.mean(axis=1)
+    np.testing.assert_allclose(tabla.loc[cv.index, clasificacion_abc.COL_CV].to_numpy(), cv.to_numpy())
+    assert tabla.loc["PRODUCTO NUEVO", clasificacion_abc.COL_XYZ] == "Z"
+
+    # Filtrado a un tipo que no vendió en todos los meses: cuentan los meses del rango completo
+    vinos = detalle[(detalle["Tipo"] == "VINOS") & (detalle["Mes"] != "2024-04")]
+    tabla = clasificacion_abc.clasificar(vinos, "Producto", ["Subtotal Neto"], col_periodo="Mes", n_periodos=4)
+    assert tabla.set_index("Producto").loc["PRODUCTO NUEVO", clasificacion_abc.COL_CV] == pytest.approx(np.sqrt(3))
+
+
+def test_sin_xyz_con_menos_de_dos_periodos(detalle):
+    un_mes = detalle[detalle["Mes"] == "2024-01"]
+    tabla = clasificacion_abc.clasificar(un_mes, "Producto", ["Subtotal Neto"], col_periodo="Mes")
+    assert clasificacion_abc.COL_XYZ not in tabla.columns and clasificacion_abc.COL_CV not in tabla.columns
+    tabla = clasificacion_abc.clasificar(detalle, "Producto", ["Subtotal Neto"], col_periodo="Mes", n_periodos=1)
+    assert clasificacion_abc.COL_XYZ not in tabla.columns
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+import coincidencias
+
+CATALOGO = [
+    "CERVEZA ESCUDO LATA (470 CC)",
+    "CERVEZA CRISTAL LATA (470 CC)",
+    "PISCO CAPEL 35° (1 LT)",
+    "VINO GATO NEGRO CARMENERE (750CC)",
+    "COCA COLA SIN AZÚCAR (1,5 LT)",
+    "PAPAS LAYS CLASICAS (250 GR)",
+]
+SKUS = ["00123", "124", "125", "126", "127", "128"]
+
+
+@pytest.fixture
+def indice():
+    return coincidencias.IndiceCatalogo(CATALOGO, SKUS)
+
+
+# Similitud de referencia: Dice sobre los trigramas contra todas las filas del catálogo
+def mejor_por_fuerza_bruta(normalizado):
+    consulta = coincidencias.ngramas(normalizado)
+    puntajes = []
+    for fila, nombre in enumerate(CATALOGO):
+        grams = coincidencias.ngramas(coincidencias.normalizar(nombre))
+        puntajes.append((2 * len(consulta & grams) / max(len(consulta) + len(grams), 1), -fila))
+    puntaje, fila = max(puntajes)
+    return -fila, puntaje
+
+
+def test_resolver_exacto_por_nombre_normalizado_y_por_sku(indice):
+    cruce = indice.resolver(
+        ["cerveza escudo lata 470cc", "Pisco Capel 35 (1 L)", "COCA COLA SIN AZUCAR 1.5L", "OTRO NOMBRE", None],
+        pd.Series(["", None, "", "123", ""]),
+    )
+    assert cruce["Estado"].tolist()[:4] == [coincidencias.EXACTO] * 4
+    assert cruce["Coincidencia por"].tolist()[:4] == ["nombre", "nombre", "nombre", "SKU"]
+    assert cruce["Candidato en catálogo"].tolist()[:4] == [CATALOGO[0], CATALOGO[2], CATALOGO[4], CATALOGO[0]]
+    # Un producto sin nombre no es exacto con nada
+    assert cruce["Estado"].iloc[4] == coincidencias.NO_REGISTRADO
+
+
+def test_resolver_probable_y_no_registrado(indice):
+    consultas = ["CERVESA ESCUDO LATA (470 CC)", "VINO GATO NEGRO CARMENER 750", "DETERGENTE OMO MATIC (3 KG)"]
+    cruce = indice.resolver(consultas)
+    assert cruce["Estado"].tolist() == [coincidencias.PROBABLE, coincidencias.PROBABLE, coincidencias.NO_REGISTRADO]
+    assert (cruce["Coincidencia por"] == "similitud").all()
+
+    # El bloqueo por claves raras encuentra el mismo mejor candidato que comparar con todo el catálogo
+    for consulta, (_, fila) in zip(consultas, cruce.iterrows()):
+        esperado, puntaje = mejor_por_fuerza_bruta(coincidencias.normalizar(consulta))
+        if puntaje >= coincidencias.UMBRAL_PROBABLE:
+            assert fila["Candidato en catálogo"] == CATALOGO[esperado]
+            assert fila["Similitud"] == pytest.approx(puntaje, abs=1e-3)
+
+
+# Pares que casi_duplicados debe agrupar, comparando todos contra todos
+def pares_por_fuerza_bruta(nombres, umbral=coincidencias.UMBRAL_DUPLICADO):
+    normalizados = [coincidencias.normalizar(n) for n in nombres]
+    pares = set()
+    for i in range(len(nombres)):
+        for j in range(i + 1, len(nombres)):
+            a, b = coincidencias.ngramas(normalizados[i]), coincidencias.ngramas(normalizados[j])
+            dice = 2 * len(a & b) / max(len(a) + len(b), 1)
+            numeros = [sorted(coincidencias._RE_NUMERO.findall(t)) for t in (normalizados[i], normalizados[j])]
+            if dice >= umbral and numeros[0] == numeros[1] and coincidencias.misma_escritura(normalizados[i], normalizados[j]):
+                pares.add((i, j))
+    return pares
+
+
+def test_casi_duplicados_agrupa_solo_variantes_de_escritura():
+    nombres = CATALOGO + [
+        "CERVEZA ESCUDO LATA 470CC",            # 0: mismo nombre normalizado
+        "VINO GATO NEGRO CARMENRE (750CC)",     # 3: error de tipeo
+        "COCA COLA SINAZUCAR (1.5 L)",          # 4: palabras juntas
+        "COCA COLA SIN AZÚCAR (3 LT)",          # otro formato: no es duplicado
+        "PAPAS LAYS ONDULADAS (250 GR)",        # otra palabra: no es duplicado
+    ]
+    duplicados = coincidencias.IndiceCatalogo(nombres).casi_duplicados()
+    grupos = duplicados.groupby("Grupo")["fila"].apply(lambda f: tuple(sorted(f))).tolist()
+    assert sorted(grupos) == [(0, 6), (3, 7), (4, 8)]
+
+    pares = {(min(a, b), max(a, b)) for grupo in grupos for a in grupo for b in grupo if a != b}
+    assert pares == pares_por_fuerza_bruta(nombres)
+
+    # Con un umbral bajo, otro formato u otra palabra siguen sin ser duplicados
+    duplicados = coincidencias.IndiceCatalogo(nombres).casi_duplicados(umbral=0.6)
+    assert not duplicados["fila"].isin([9, 10]).any()
+    grupos = duplicados.groupby("Grupo")["fila"].apply(lambda f: tuple(sorted(f))).tolist()
+    pares = {(min(a, b), max(a, b)) for grupo in grupos for a in grupo for b in grupo if a != b}
+    assert pares == pares_por_fuerza_bruta(nombres, umbral=0.6)
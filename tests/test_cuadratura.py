@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+import cuadratura
+
+COL_CATEGORIA = "Tipo de Producto / Servicio"
+COL_VENTAS = "Vendidas desde enero hasta marzo"
+
+
+def stock(filas):
+    return pd.DataFrame(filas, columns=[COL_CATEGORIA, "Producto Completo", "Stock", "Costo Neto Prom. Unitario"])
+
+
+# La cuadratura de la pestaña 5 antes del motor vectorizado: merge, limpieza y columnas fila a fila
+def cuadratura_por_fila(df_stock, ventas_producto, col_ventas):
+    def limpiar_a_numero_positivo(valor):
+        if pd.isna(valor):
+            return 0
+        if isinstance(valor, (int, float)):
+            return valor
+        try:
+            return float(str(valor).replace("$", "").replace(".", "").replace(",", ".").strip())
+        except ValueError:
+            return 0
+
+    df = pd.merge(df_stock, ventas_producto, on="Producto Completo", how="left")
+    df[col_ventas] = df[col_ventas].fillna(0)
+    df["Costo Neto Prom. Unitario"] = df["Costo Neto Prom. Unitario"].apply(limpiar_a_numero_positivo)
+    df["Stock"] = pd.to_numeric(df["Stock"], errors="coerce").fillna(0)
+    df["Cantidad Disponible"] = df.apply(
+        lambda row: "No aplica" if "PACK" in row["Producto Completo"] else max(row["Stock"] - row[col_ventas], 0), axis=1
+    )
+    df["Valor en Stock (Costo Total)"] = df["Stock"] * df["Costo Neto Prom. Unitario"]
+    df["Alerta"] = df.apply(lambda row: (
+        "❗ Sin ventas" if row[col_ventas] == 0 else
+        "⚠️ Bajo Stock" if row[col_ventas] >= 20 and row.get("Stock", 0) < 5 else ""
+    ), axis=1)
+    orden = df["Alerta"].apply(lambda x: 0 if "❗" in x else 1 if "⚠️" in x else 2)
+    return df.iloc[np.argsort(orden.to_numpy(), kind="stable")].reset_index(drop=True)
+
+
+def comparar(cuadrado, referencia, col_ventas):
+    assert cuadrado["Producto Completo"].tolist() == referencia["Producto Completo"].tolist()
+    for col in ["Stock", col_ventas, "Costo Neto Prom. Unitario", "Valor en Stock (Costo Total)"]:
+        np.testing.assert_allclose(cuadrado[col].to_numpy(dtype=float), referencia[col].to_numpy(dtype=float))
+    # "No aplica" de los PACK es NaN en el motor vectorizado
+    disponible = referencia["Cantidad Disponible"].replace("No aplica", np.nan).to_numpy(dtype=float)
+    np.testing.assert_allclose(cuadrado["Cantidad Disponible"].to_numpy(dtype=float), disponible)
+    assert cuadrado["Alerta"].tolist() == referencia["Alerta"].tolist()
+
+
+def test_conciliar_igual_a_la_version_por_fila():
+    df_stock = stock([
+        ("CERVEZAS", "CERVEZA ESCUDO (LATA)", 40, 650.0),
+        ("CERVEZAS", "PACK ESCUDO X6", 3, "$3.900"),
+        ("VINOS", "VINO GATO NEGRO (750CC)", -3, "2.150,5"),       # stock negativo
+        ("VINOS", "VINO SANTA RITA (750CC)", "s/i", "sin costo"),   # stock y costo no numéricos
+        ("BEBIDAS", "COCA COLA (1.5 L)", None, np.nan),
+        ("BEBIDAS", "AGUA CACHANTUN (1.6 L)", 2, 400),
+        ("BEBIDAS", "SPRITE (1.5 L)", 10, 900),
+    ])
+    ventas_producto = pd.DataFrame({
+        "Producto Completo": ["CERVEZA ESCUDO (LATA)", "PACK ESCUDO X6", "VINO GATO NEGRO (750CC)",
+                              "VINO SANTA RITA (750CC)", "AGUA CACHANTUN (1.6 L)", "PRODUCTO SIN STOCK"],
+        COL_VENTAS: [12.0, 4.0, 25.0, 3.0, 30.0, 7.0],
+    })
+
+    cuadrado, resumen = cuadratura.conciliar(df_stock, ventas_producto, COL_VENTAS, COL_CATEGORIA)
+    referencia = cuadratura_por_fila(df_stock, ventas_producto, COL_VENTAS)
+    comparar(cuadrado, referencia, COL_VENTAS)
+    assert cuadrado[cuadratura.COL_PACK].tolist() == referencia["Producto Completo"].str.contains("PACK").tolist()
+
+    # Resumen por categoría: sumas de stock, disponible (sin los packs) y valor
+    esperado = referencia.assign(**{"Cantidad Disponible": referencia["Cantidad Disponible"].replace("No aplica", np.nan)})
+    esperado = esperado.groupby(COL_CATEGORIA)[["Stock", "Cantidad Disponible", "Valor en Stock (Costo Total)"]].sum()
+    obtenido = resumen.set_index(COL_CATEGORIA)[esperado.columns]
+    np.testing.assert_allclose(obtenido.loc[esperado.index].to_numpy(dtype=float), esperado.to_numpy(dtype=float))
+
+
+def test_cuadrar_acumula_desde_el_mes_elegido():
+    fechas = pd.to_datetime(["2024-01-10", "2024-02-03", "2024-02-20", "2024-03-05", "2024-03-31", None])
+    ventas = pd.DataFrame({
+        "Producto Completo": ["CERVEZA ESCUDO (LATA)", "CERVEZA ESCUDO (LATA)", "VINO GATO NEGRO (750CC)",
+                             "CERVEZA ESCUDO (LATA)", "TABACO (20)", "VINO GATO NEGRO (750CC)"],
+        "Cantidad": [5.0, 7.0, 2.0, 1.0, 4.0, 100.0],
+        "Fecha": fechas,
+    })
+    df_stock = stock([
+        ("CERVEZAS", "CERVEZA ESCUDO (LATA)", 10, 650.0),
+        ("VINOS", "VINO GATO NEGRO (750CC)", 3, 2150.0),
+        ("SNACKS", "PAPAS FRITAS (100G)", 8, 700.0),    # categoría fuera de CATEGORIAS_CLAVE
+    ])
+
+    resultado = cuadratura.cuadrar(df_stock, ventas, COL_CATEGORIA, "Fecha", mes_desde=2)
+    col_ventas = resultado["titulo_col_ventas"]
+    assert col_ventas == "Vendidas desde febrero hasta marzo"
+
+    # Misma selección con una máscara sobre las fechas (la venta sin fecha no entra)
+    en_rango = ventas[(ventas["Fecha"] >= "2024-02-01") & (ventas["Fecha"] <= "2024-03-31")]
+    ventas_producto = en_rango.groupby("Producto Completo")["Cantidad"].sum().rename(col_ventas).reset_index()
+    filtrado = df_stock[df_stock[COL_CATEGORIA].isin(cuadratura.CATEGORIAS_CLAVE)]
+    comparar(resultado["cuadratura"], cuadratura_por_fila(filtrado, ventas_producto, col_ventas), col_ventas)
+    assert resultado["cuadratura"].set_index("Producto Completo")[col_ventas].to_dict() == {
+        "CERVEZA ESCUDO (LATA)": 8.0, "VINO GATO NEGRO (750CC)": 2.0,
+    }
+
+    vinos = cuadratura.cuadrar(df_stock, ventas, COL_CATEGORIA, "Fecha", mes_desde=2, categoria="VINOS")
+    assert vinos["cuadratura"]["Producto Completo"].tolist() == ["VINO GATO NEGRO (750CC)"]
+    assert vinos["resumen"][COL_CATEGORIA].tolist() == ["VINOS"]
@@ -0,0 +1,77 @@
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import exportar
+import pivote
+
+
+def tabla():
+    return pd.DataFrame({
+        "Producto Completo": [f"PRODUCTO {i:02d} Ñ" for i in range(23)],
+        "Fecha": pd.date_range("2024-01-30", periods=23, freq="D"),
+        "Cantidad": np.arange(23, dtype=np.int64),
+        "Subtotal Neto": np.where(np.arange(23) % 5 == 0, np.nan, np.arange(23) * 1000.5),
+        "% Acum. Subtotal Neto": np.linspace(0.01, 1.0, 23),
+        "CV demanda": np.where(np.arange(23) == 3, np.inf, 0.25),
+    })
+
+
+def leer_xlsx(archivo):
+    libro = openpyxl.load_workbook(archivo)
+    hoja = libro.active
+    filas = list(hoja.iter_rows(values_only=True))
+    return hoja, pd.DataFrame(filas[1:], columns=filas[0])
+
+
+def test_xlsx_por_bloques_conserva_valores_y_formatos():
+    df = tabla()
+    archivo = exportar.archivo_xlsx(
+        exportar.bloques_frame(df, filas=7),
+        formatos={"Subtotal Neto": "moneda", "% Acum. Subtotal Neto": "porcentaje"},
+        formatos_excel=exportar.formatos_config({}),
+    )
+    hoja, leido = leer_xlsx(archivo)
+    assert leido.columns.tolist() == df.columns.tolist() and len(leido) == len(df)
+    assert leido["Producto Completo"].tolist() == df["Producto Completo"].tolist()
+    assert pd.to_datetime(leido["Fecha"]).tolist() == df["Fecha"].tolist()
+    assert leido["Cantidad"].tolist() == df["Cantidad"].tolist()
+    # NaN e inf quedan como celdas vacías
+    np.testing.assert_allclose(leido["Subtotal Neto"].astype(float).to_numpy(), df["Subtotal Neto"].to_numpy())
+    assert leido["CV demanda"].isna().tolist() == np.isinf(df["CV demanda"]).tolist()
+
+    # Formatos nativos por columna
+    assert hoja["B2"].number_format == exportar.FORMATO_FECHA_EXCEL
+    assert hoja["D3"].number_format == '"$"#,##0'
+    assert hoja["E2"].number_format == exportar.FORMATO_PORCENTAJE
+
+
+def test_csv_por_bloques_igual_al_csv_de_pandas():
+    df = tabla()
+    archivo = exportar.archivo_csv(exportar.bloques_frame(df, filas=7))
+    contenido = archivo.read()
+    assert contenido.startswith(b"\xef\xbb\xbf")
+    assert contenido.decode("utf-8-sig").replace("\r\n", "\n") == df.to_csv(index=False).replace("\r\n", "\n")
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(contenido), encoding="utf-8-sig", parse_dates=["Fecha"]),
+                                  df.assign(Fecha=df["Fecha"].astype("datetime64[ns]")), check_dtype=False)
+
+
+def test_pivot_por_paginas_igual_a_la_tabla_completa():
+    detalle = pd.DataFrame({
+        "Producto Completo": [f"PRODUCTO {i % 7}" for i in range(40)],
+        "Fecha": pd.date_range("2024-01-25", periods=40, freq="D")[np.arange(40) % 11],
+        "Cantidad": np.arange(40, dtype=float),
+    }).groupby(["Producto Completo", "Fecha"], as_index=False)["Cantidad"].sum()
+    pivot = pivote.PivotDisperso(detalle, "Producto Completo", "Fecha", "Cantidad")
+    completo = pd.concat([pivot.ventana(0, pivot.n_filas, 0, pivot.n_columnas),
+                          pivot.fila_totales(0, pivot.n_columnas)], ignore_index=True)
+
+    _, leido = leer_xlsx(exportar.archivo_xlsx(exportar.bloques_pivot(pivot, productos=3)))
+    assert leido.columns.tolist() == completo.columns.tolist()
+    assert leido["Producto Completo"].tolist() == completo["Producto Completo"].tolist()
+    np.testing.assert_array_equal(leido.iloc[:, 1:].to_numpy(dtype=float), completo.iloc[:, 1:].to_numpy(dtype=float))
+
+    contenido = exportar.archivo_csv(exportar.bloques_pivot(pivot, productos=3)).read().decode("utf-8-sig")
+    assert contenido == completo.to_csv(index=False)
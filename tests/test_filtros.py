@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import filtros
+import registro
+
+COLUMNAS = {"sucursal": "+Sucursal", "tipo": "+Tipo de Producto / Servicio", "mes": "+Mes", "producto": "Producto Completo"}
+
+
+@pytest.fixture
+def cubo():
+    rng = np.random.default_rng(0)
+    n = 3000
+    producto = rng.choice(["CERVEZA ESCUDO", "VINO GATO NEGRO", "COCA COLA", "PISCO CAPEL", None], n)
+    return pd.DataFrame({
+        "+Sucursal": pd.Categorical(rng.choice(["CENTRAL", "PANDITA", "BODEGA"], n)),
+        "+Tipo de Producto / Servicio": rng.choice(["CERVEZAS", "VINOS", "BEBIDAS"], n),
+        "+Mes": rng.choice([f"2024-{m:02d}" for m in range(1, 7)], n),
+        "Producto Completo": producto,
+        "Cantidad": rng.integers(1, 10, n).astype(float),
+    })
+
+
+# Filtrado de referencia: máscara booleana por cada filtro elegido
+def con_mascara(df, **filtros_sel):
+    mascara = np.ones(len(df), dtype=bool)
+    for nombre, valor in filtros_sel.items():
+        if valor is not None:
+            mascara &= (df[COLUMNAS[nombre]] == valor).to_numpy()
+    return df[mascara]
+
+
+def test_vistas_iguales_al_filtrado_con_mascaras(cubo):
+    motor = filtros.MotorFiltros(cubo, COLUMNAS)
+    opciones = {
+        "sucursal": [None, "CENTRAL", "BODEGA", "NO EXISTE"],
+        "tipo": [None, "VINOS"],
+        "mes": [None, "2024-03"],
+        "producto": [None, "COCA COLA"],
+    }
+    for valores in itertools.product(*opciones.values()):
+        seleccion = dict(zip(opciones, valores))
+        vista = motor.vista_filtrada(**seleccion)
+        esperado = con_mascara(cubo, **seleccion)
+        # Mismas filas y en el mismo orden que la máscara
+        pd.testing.assert_frame_equal(vista, esperado)
+        # Segunda consulta: la vista guardada
+        assert motor.vista_filtrada(**seleccion) is vista
+
+
+def test_valores_dentro_de_la_seleccion(cubo):
+    motor = filtros.MotorFiltros(cubo, COLUMNAS)
+    # Los nulos no son un valor del filtro
+    assert motor.valores("producto") == sorted(cubo["Producto Completo"].dropna().unique())
+    for tipo in ["CERVEZAS", "VINOS"]:
+        esperado = sorted(con_mascara(cubo, tipo=tipo, sucursal="PANDITA")["+Mes"].unique())
+        assert motor.valores("mes", tipo=tipo, sucursal="PANDITA") == esperado
+    assert motor.valores("mes", sucursal="NO EXISTE") == []
+    assert motor.valores("no es un filtro") == []
+
+
+def test_vistas_guardadas_acotadas_por_memoria(cubo):
+    motor = filtros.MotorFiltros(cubo, COLUMNAS)
+    for sucursal, mes in itertools.product(["CENTRAL", "PANDITA", "BODEGA"], [None] + [f"2024-{m:02d}" for m in range(1, 7)]):
+        motor.vista_filtrada(sucursal=sucursal, mes=mes)
+    # 21 vistas que juntas ocupan el doble del cubo: se descartan las más antiguas
+    assert len(motor._vistas) < 21 and 0 < motor._bytes_vistas <= motor.max_bytes_vistas
+    assert motor._bytes_vistas == sum(tamano for _, tamano in motor._vistas.values())
+
+    # El almacén cuenta el tope de las vistas como parte del cubo desde que se guarda
+    almacen = registro.AlmacenDatasets(registro.MEMORIA_MAX_MB * 1024 ** 2)
+    nuevo = filtros.MotorFiltros(cubo, COLUMNAS)
+    almacen.guardar("cubo", (cubo, nuevo))
+    assert almacen.memoria_usada() >= registro.tamano_bytes(cubo) + nuevo.max_bytes_vistas
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cuadratura
+import indice_fechas
+import informes
+
+
+@pytest.fixture
+def ventas():
+    # Horas dentro del día, meses con y sin ventas (marzo vacío), fin de año y fechas vacías
+    fechas = pd.to_datetime([
+        "2024-01-31 23:59", "2024-02-01 00:00", "2024-02-29 18:30", "2024-01-01 00:00", None,
+        "2024-04-01 09:00", "2024-12-31 23:00", "2025-01-01 00:00", "2024-02-15 12:00", None,
+    ]).astype("datetime64[us]")
+    df = pd.DataFrame({"Fecha": fechas, "Cantidad": np.arange(len(fechas), dtype=float)})
+    return indice_fechas.ordenar_por_fecha(df, "Fecha")
+
+
+# Rango de referencia: máscara booleana sobre la columna (los NaT no cumplen ninguna comparación)
+def con_mascara(df, desde=None, hasta=None):
+    mascara = df["Fecha"].notna()
+    if desde is not None:
+        mascara &= df["Fecha"] >= desde
+    if hasta is not None:
+        mascara &= df["Fecha"] < hasta
+    return df[mascara]
+
+
+def test_ordenado_con_fechas_vacias_al_final(ventas):
+    assert indice_fechas.esta_ordenado(ventas["Fecha"].to_numpy())
+    assert ventas["Fecha"].isna().tolist()[-2:] == [True, True] and ventas.index.tolist() == list(range(10))
+    # Ya ordenado: se devuelve el mismo frame
+    assert indice_fechas.ordenar_por_fecha(ventas, "Fecha") is ventas
+
+
+@pytest.mark.parametrize("año, mes", [(2024, 1), (2024, 2), (2024, 3), (2024, 12), (2025, 1)])
+def test_mes_igual_a_la_mascara(ventas, año, mes):
+    inicio = pd.Timestamp(year=año, month=mes, day=1)
+    esperado = con_mascara(ventas, inicio, inicio + pd.offsets.MonthBegin(1))
+    pd.testing.assert_frame_equal(indice_fechas.IndiceFechas(ventas, "Fecha").mes(año, mes), esperado)
+
+
+@pytest.mark.parametrize("desde, hasta", [
+    ("2024-01-31", "2024-02-01"),   # cruza el fin de mes: el último minuto de enero y el primero de febrero
+    ("2024-02-29", None),           # solo el 29 de febrero
+    ("2024-02-02", "2024-02-14"),   # sin ventas
+    ("2024-12-31", "2025-01-01"),   # cambio de año
+    (None, None),                   # todo: sin las fechas vacías
+])
+def test_dias_completos_igual_a_la_mascara(ventas, desde, hasta):
+    indice = indice_fechas.IndiceFechas(ventas, "Fecha")
+    inicio = pd.Timestamp(desde) if desde else None
+    fin = pd.Timestamp(hasta or desde) + pd.Timedelta(days=1) if desde else None
+    pd.testing.assert_frame_equal(indice.dias(desde, hasta), con_mascara(ventas, inicio, fin))
+
+
+def test_meses_con_ventas(ventas):
+    indice = indice_fechas.IndiceFechas(ventas, "Fecha")
+    assert len(indice) == 8
+    assert indice.primera() == pd.Timestamp("2024-01-01") and indice.ultima() == pd.Timestamp("2025-01-01")
+    assert [m.strftime("%Y-%m") for m in indice.meses()] == ["2024-01", "2024-02", "2024-04", "2024-12", "2025-01"]
+
+
+def test_sin_fechas_validas_no_hay_rango():
+    df = pd.DataFrame({
+        "Fecha": pd.Series([pd.NaT, pd.NaT], dtype="datetime64[us]"),
+        "Producto Completo": ["CERVEZA ESCUDO (LATA)", "VINO GATO NEGRO (750CC)"],
+        "Cantidad": [1.0, 2.0],
+    })
+    indice = indice_fechas.IndiceFechas(df, "Fecha")
+    assert len(indice) == 0 and indice.meses() == [] and indice.dias("2024-01-01").empty
+    assert cuadratura.rango_fechas(indice, 1) is None
+    assert informes.rango_meses(df, "Fecha") is None
+    stock = pd.DataFrame({"Tipo": ["CERVEZAS"], "Producto Completo": ["CERVEZA ESCUDO (LATA)"], "Stock": [3]})
+    assert informes.cuadratura_stock(stock, df, "Tipo", "Fecha") is None
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+import packs
+
+
+def matriz(aristas):
+    return packs.MatrizPacks(packs._limpiar_mapeo(*[pd.Series(c) for c in zip(*aristas)]))
+
+
+def disponibles(m, disponible):
+    vector = np.full(len(m.nombres), np.nan)
+    for nombre, cantidad in disponible.items():
+        vector[m.posiciones([nombre])[0]] = cantidad
+    armables = m.disponibles(vector)
+    return {nombre: armables[m.posiciones([nombre])[0]] for nombre in m.nombres[m.es_pack]}
+
+
+def test_pack_armable_con_el_minimo_de_sus_componentes():
+    m = matriz([("PACK ESCUDO X6", "CERVEZA ESCUDO", 6), ("PACK PISCOLA", "PISCO", 1), ("PACK PISCOLA", "COCA COLA", 2)])
+    armables = disponibles(m, {"CERVEZA ESCUDO": 20, "PISCO": 10, "COCA COLA": 5})
+    assert armables == {"PACK ESCUDO X6": 3, "PACK PISCOLA": 2}
+
+
+def test_componente_sin_stock_deja_el_pack_desconocido():
+    m = matriz([("PACK PISCOLA", "PISCO", 1), ("PACK PISCOLA", "COCA COLA", 2)])
+    # COCA COLA no está en el stock: el pack no se calcula solo con el pisco
+    assert np.isnan(disponibles(m, {"PISCO": 10})["PACK PISCOLA"])
+
+
+def test_packs_anidados_se_resuelven_por_nivel():
+    m = matriz([("PACK X6", "CERVEZA", 6), ("CAJA 4 PACKS", "PACK X6", 4), ("CAJA MIXTA", "CAJA 4 PACKS", 1),
+                ("CAJA MIXTA", "MANI", 2)])
+    armables = disponibles(m, {"CERVEZA": 50, "MANI": 1})
+    assert armables["PACK X6"] == 8 and armables["CAJA 4 PACKS"] == 2 and armables["CAJA MIXTA"] == 0
+    assert np.isnan(disponibles(m, {"CERVEZA": 50})["CAJA MIXTA"])
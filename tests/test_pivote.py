@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pivote
+
+
+@pytest.fixture
+def detalle():
+    rng = np.random.default_rng(2)
+    n = 600
+    dias = pd.date_range("2024-01-01", "2024-03-31", freq="D")
+    return pd.DataFrame({
+        "Producto Completo": rng.choice([f"PRODUCTO {i:02d}" for i in range(25)] + [None], n),
+        "Fecha": rng.choice(dias, n),
+        "Cantidad": rng.integers(1, 20, n).astype(float),
+    })
+
+
+# Pivot denso de referencia con pandas: productos × días con ceros donde no hubo ventas
+def pivot_denso(detalle):
+    denso = detalle.dropna(subset=["Producto Completo"]).pivot_table(
+        index="Producto Completo", columns="Fecha", values="Cantidad", aggfunc="sum", fill_value=0
+    )
+    return denso.sort_index().sort_index(axis=1)
+
+
+def test_ventanas_iguales_al_pivot_denso(detalle):
+    agrupado = detalle.groupby(["Producto Completo", "Fecha"], as_index=False)["Cantidad"].sum()
+    pivot = pivote.PivotDisperso(agrupado, "Producto Completo", "Fecha", "Cantidad")
+    denso = pivot_denso(detalle)
+    assert (pivot.n_filas, pivot.n_columnas) == denso.shape
+    assert pivot.celdas == int((denso.to_numpy() != 0).sum())
+
+    for fila_desde, fila_hasta, desde, hasta in [(0, 10, None, None), (10, 25, "2024-02-01", "2024-02-29"),
+                                                 (5, 6, "2024-01-31", "2024-02-01")]:
+        inicio, fin = pivot.rango_columnas(desde and pd.Timestamp(desde), hasta and pd.Timestamp(hasta))
+        esperado = denso.iloc[fila_desde:fila_hasta].loc[:, desde:hasta]
+        ventana = pivot.ventana(fila_desde, fila_hasta, inicio, fin)
+        assert ventana["Producto Completo"].tolist() == esperado.index.tolist()
+        assert ventana.columns[1:-1].tolist() == esperado.columns.strftime(pivote.FORMATO_FECHA).tolist()
+        np.testing.assert_array_equal(ventana.iloc[:, 1:-1].to_numpy(), esperado.to_numpy())
+        np.testing.assert_array_equal(ventana["Total"].to_numpy(), esperado.sum(axis=1).to_numpy())
+
+        # La fila de totales suma todos los productos, no solo los de la página
+        totales = pivot.fila_totales(inicio, fin)
+        completo = denso.loc[:, desde:hasta]
+        np.testing.assert_array_equal(totales.iloc[0, 1:-1].to_numpy(dtype=float), completo.sum(axis=0).to_numpy())
+        assert totales["Total"].iloc[0] == completo.to_numpy().sum()
+
+
+def test_detalle_sin_ordenar_y_rango_sin_fechas(detalle):
+    desordenado = detalle.dropna(subset=["Producto Completo"]).sample(frac=1, random_state=0)
+    agrupado = desordenado.groupby(["Producto Completo", "Fecha"], as_index=False, sort=False)["Cantidad"].sum()
+    pivot = pivote.PivotDisperso(agrupado, "Producto Completo", "Fecha", "Cantidad")
+    denso = pivot_denso(detalle)
+    ventana = pivot.ventana(0, pivot.n_filas, 0, pivot.n_columnas)
+    np.testing.assert_array_equal(ventana.iloc[:, 1:-1].to_numpy(), denso.to_numpy())
+
+    # Un rango fuera de las fechas con ventas no tiene columnas
+    inicio, fin = pivot.rango_columnas(pd.Timestamp("2025-01-01"), pd.Timestamp("2025-01-31"))
+    assert fin - inicio == 0
+    assert pivot.ventana(0, 3, inicio, fin)["Total"].tolist() == [0, 0, 0]
@@ -0,0 +1,235 @@
+import email.utils
+import hashlib
+import http.server
+import threading
+
+import pytest
+
+import refresco
+import registro
+import snapshot
+from test_snapshot import cantidad_documento, corregir
+
+
+# --- Servidor HTTP local que hace de fuente: ETag / Last-Modified, 304 y Range ---
+class Fuente:
+    def __init__(self, contenido, validadores="etag", rangos=True):
+        self.contenido = contenido
+        self.validadores = validadores
+        self.rangos = rangos
+        self.modificado = 1_700_000_000
+        self.pedidos = {"HEAD": 0, "200": 0, "206": 0, "304": 0}
+
+    def cambiar(self, contenido):
+        self.contenido = contenido
+        self.modificado += 10
+
+    def cabeceras(self):
+        cabeceras = {}
+        if self.validadores == "etag":
+            cabeceras["ETag"] = '"' + hashlib.md5(self.contenido).hexdigest() + '"'
+        elif self.validadores == "mod":
+            cabeceras["Last-Modified"] = email.utils.formatdate(self.modificado, usegmt=True)
+        return cabeceras
+
+
+class Manejador(http.server.BaseHTTPRequestHandler):
+    fuente = None
+
+    def responder(self, estado, cuerpo=b"", extra=None):
+        self.send_response(estado)
+        for nombre, valor in {**self.fuente.cabeceras(), **(extra or {})}.items():
+            self.send_header(nombre, valor)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(cuerpo)
+
+    def do_HEAD(self):
+        self.fuente.pedidos["HEAD"] += 1
+        self.responder(200, self.fuente.contenido)
+
+    def do_GET(self):
+        fuente = self.fuente
+        cabeceras = fuente.cabeceras()
+        if ("ETag" in cabeceras and self.headers.get("If-None-Match") == cabeceras["ETag"]) or (
+            "Last-Modified" in cabeceras and self.headers.get("If-Modified-Since") == cabeceras["Last-Modified"]
+        ):
+            fuente.pedidos["304"] += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        rango = self.headers.get("Range")
+        if rango and fuente.rangos:
+            desde = int(rango.split("=")[1].rstrip("-"))
+            if desde >= len(fuente.contenido):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            fuente.pedidos["206"] += 1
+            self.responder(206, fuente.contenido[desde:],
+                           {"Content-Range": f"bytes {desde}-{len(fuente.contenido) - 1}/{len(fuente.contenido)}"})
+            return
+        fuente.pedidos["200"] += 1
+        self.responder(200, fuente.contenido)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    servidores = []
+
+    def iniciar(contenido, validadores="etag", rangos=True):
+        fuente = Fuente(contenido, validadores, rangos)
+        manejador = type("ManejadorFuente", (Manejador,), {"fuente": fuente})
+        http_servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), manejador)
+        threading.Thread(target=http_servidor.serve_forever, daemon=True).start()
+        servidores.append(http_servidor)
+        return fuente, f"http://127.0.0.1:{http_servidor.server_address[1]}/ventas.csv"
+
+    yield iniciar
+    for http_servidor in servidores:
+        http_servidor.shutdown()
+        http_servidor.server_close()
+
+
+# Carga de ventas como la de app.py: snapshot (completo o incremental) con el validador del refresco
+def cargador_ventas(url, directorio, llamadas=None):
+    def cargar(contenido=None, cabeceras=None):
+        if llamadas is not None:
+            llamadas.append(contenido is not None)
+        validador = refresco.validador(cabeceras) if cabeceras else None
+        return snapshot.cargar_ventas(url, {}, directorio=directorio, contenido=contenido, validador=validador)
+    return cargar
+
+
+# Almacén con la fuente cargada y registrada; el hilo de fondo se detiene y las revisiones se
+# hacen a mano (la primera solo registra las cabeceras de lo cargado)
+def refrescador_con(url, cargar):
+    almacen = registro.AlmacenDatasets(registro.MEMORIA_MAX_MB * 1024 ** 2)
+    clave = ("ventas", url)
+    almacen.obtener(clave, cargar)
+    refrescador = refresco.Refrescador(almacen, intervalo=3600)
+    refrescador.registrar(url, clave, cargar)
+    refrescador.detener()
+    if refrescador.fuentes[url]["cabeceras"] is None:
+        refrescador.refrescar(url)
+    return almacen, refrescador, clave
+
+
+def test_304_conserva_la_version(tmp_path, servidor, ventas_csv):
+    fuente, url = servidor(ventas_csv(0, 500))
+    llamadas = []
+    almacen, refrescador, clave = refrescador_con(url, cargador_ventas(url, str(tmp_path), llamadas))
+    version = almacen.version(clave)
+
+    refrescador.refrescar(url)
+    assert fuente.pedidos["304"] == 1
+    assert almacen.version(clave) == version and llamadas == [False]
+    assert refrescador.estado()[0]["Sin cambios"] == 1
+
+
+@pytest.mark.parametrize("validadores", ["etag", "mod"])
+def test_validador_cambiado_reparsea_y_reemplaza(tmp_path, servidor, ventas_csv, validadores):
+    original = ventas_csv(0, 500)
+    fuente, url = servidor(original, validadores=validadores)
+    almacen, refrescador, clave = refrescador_con(url, cargador_ventas(url, str(tmp_path)))
+    anterior, _ = almacen.obtener(clave, None)
+    version = almacen.version(clave)
+
+    fuente.cambiar(corregir(original, 10))
+    refrescador.refrescar(url)
+    df, stats = almacen.obtener(clave, None)
+    assert almacen.version(clave) != version and df is not anterior
+    assert stats["origen"] == "csv" and cantidad_documento(df, 10) == [9.0]
+    assert cantidad_documento(anterior, 10) == [1.0]
+    assert refrescador.estado()[0]["Cambios"] == 1
+
+
+def test_lectores_ven_la_version_anterior_hasta_el_reemplazo(tmp_path, servidor, ventas_csv):
+    fuente, url = servidor(ventas_csv(0, 500))
+    cargar = cargador_ventas(url, str(tmp_path))
+    parseando, continuar = threading.Event(), threading.Event()
+
+    def cargar_lento(contenido=None, cabeceras=None):
+        resultado = cargar(contenido, cabeceras)
+        if contenido is not None:
+            parseando.set()
+            continuar.wait(10)
+        return resultado
+
+    almacen, refrescador, clave = refrescador_con(url, cargar_lento)
+    anterior = almacen.obtener(clave, None)
+    version = almacen.version(clave)
+
+    fuente.cambiar(ventas_csv(0, 600))
+    hilo = threading.Thread(target=refrescador.refrescar, args=(url,))
+    hilo.start()
+    assert parseando.wait(10)
+    # Parseo terminado pero sin reemplazar: las sesiones siguen con el frame anterior
+    assert almacen.obtener(clave, None) is anterior and almacen.version(clave) == version
+    continuar.set()
+    hilo.join(10)
+
+    df, _ = almacen.obtener(clave, None)
+    assert almacen.version(clave) != version and len(df) == 600 and len(anterior[0]) == 500
+
+
+def test_sin_validadores_compara_el_hash_del_contenido(tmp_path, servidor, ventas_csv):
+    fuente, url = servidor(ventas_csv(0, 500), validadores=None)
+    llamadas = []
+    almacen, refrescador, clave = refrescador_con(url, cargador_ventas(url, str(tmp_path), llamadas))
+    version = almacen.version(clave)
+
+    # Mismo contenido: se descarga (no hay 304) pero no se parsea ni se reemplaza
+    refrescador.refrescar(url)
+    assert fuente.pedidos["304"] == 0 and fuente.pedidos["200"] >= 1
+    assert almacen.version(clave) == version and llamadas == [False]
+
+    fuente.cambiar(ventas_csv(0, 520))
+    refrescador.refrescar(url)
+    df, _ = almacen.obtener(clave, None)
+    assert almacen.version(clave) != version and len(df) == 520 and llamadas == [False, True]
+
+
+def test_append_de_ventas_es_incremental(tmp_path, servidor, ventas_csv):
+    fuente, url = servidor(ventas_csv(0, 2000))
+    almacen, refrescador, clave = refrescador_con(url, cargador_ventas(url, str(tmp_path)))
+
+    fuente.cambiar(ventas_csv(0, 2100))
+    refrescador.refrescar(url)
+    df, stats = almacen.obtener(clave, None)
+    assert stats["origen"] == "incremental" and stats["filas_nuevas"] == 100 and len(df) == 2100
+
+    # Sin el refrescador (sin contenido descargado) también se parsean solo las filas agregadas
+    fuente.cambiar(ventas_csv(0, 2200))
+    df, stats = snapshot.cargar_ventas(url, {}, directorio=str(tmp_path))
+    assert stats["origen"] == "incremental" and stats["filas_nuevas"] == 100 and len(df) == 2200
+
+
+@pytest.mark.parametrize("rangos", [True, False])
+def test_edicion_sin_append_recarga_completo(tmp_path, servidor, ventas_csv, rangos):
+    original = ventas_csv(0, 2000)
+    fuente, url = servidor(original, rangos=rangos)
+    snapshot.cargar_ventas(url, {}, directorio=str(tmp_path))
+
+    fuente.cambiar(corregir(original, 10))
+    df, stats = snapshot.cargar_ventas(url, {}, directorio=str(tmp_path))
+    assert stats["origen"] == "csv" and cantidad_documento(df, 10) == [9.0]
+
+
+# Una corrección antes de la cola más un append: aunque el servidor acepte Range, la carga no
+# puede quedarse con la fila vieja
+@pytest.mark.parametrize("rangos", [True, False])
+def test_edicion_mas_append_recarga_completo(tmp_path, servidor, ventas_csv, rangos):
+    original = ventas_csv(0, 2000)
+    fuente, url = servidor(original, rangos=rangos)
+    snapshot.cargar_ventas(url, {}, directorio=str(tmp_path))
+
+    fuente.cambiar(corregir(ventas_csv(0, 2100), 10))
+    df, stats = snapshot.cargar_ventas(url, {}, directorio=str(tmp_path))
+    assert stats["origen"] == "csv" and len(df) == 2100
+    assert cantidad_documento(df, 10) == [9.0]
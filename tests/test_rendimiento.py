@@ -0,0 +1,38 @@
+import rendimiento
+
+
+def test_etiqueta_fija_para_las_metricas():
+    rendimiento.iniciar()
+    with rendimiento.etapa("pestaña 3"):
+        for categoria in ["CERVEZAS", "VINOS", "LICORES"]:
+            with rendimiento.etapa(f"tabla · detalle_dia_{categoria}", "tabla · detalle_dia"):
+                pass
+    rendimiento.terminar()
+
+    filas, _ = rendimiento.ultima()
+    assert "    tabla · detalle_dia_VINOS" not in [f["Etapa"] for f in filas]
+    assert "  tabla · detalle_dia_VINOS" in [f["Etapa"] for f in filas]
+    texto = rendimiento.texto_prometheus()
+    assert 'etapa="tabla · detalle_dia"' in texto
+    assert "detalle_dia_VINOS" not in texto
+
+
+# detener() en app.py cierra la ejecución dentro de una etapa abierta antes del st.stop
+def test_terminar_con_etapas_abiertas_llega_al_historial():
+    rendimiento.iniciar(dataset="prueba")
+    with rendimiento.etapa("filtros"):
+        resumen = rendimiento.terminar()
+    assert resumen["dataset"] == "prueba" and "filtros" in resumen["etapas"]
+    assert rendimiento.historial()[-1] is resumen
+
+
+def test_prometheus_escucha_en_localhost_por_defecto():
+    assert rendimiento.opciones({})["hostPrometheus"] == "127.0.0.1"
+    opciones = rendimiento.opciones({"rendimiento": {"puertoPrometheus": 9108, "hostPrometheus": "0.0.0.0"}})
+    assert opciones["hostPrometheus"] == "0.0.0.0" and opciones["puertoPrometheus"] == 9108
+    servidor = rendimiento.servir_prometheus(0)
+    try:
+        assert servidor.server_address[0] == "127.0.0.1"
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
@@ -0,0 +1,85 @@
+import os
+
+import snapshot
+from conftest import lineas_ventas
+
+
+def escribir(ruta, contenido, mtime=None):
+    with open(ruta, "wb") as f:
+        f.write(contenido)
+    if mtime is not None:
+        os.utime(ruta, ns=(mtime, mtime))
+
+
+# Cambia la cantidad del documento n (mismo largo de línea: el tamaño del archivo no cambia)
+def corregir(contenido, n, cantidad="9.0"):
+    linea = lineas_ventas(n, n + 1)
+    corregida = linea.replace(b",1.0,", f",{cantidad},".encode(), 1)
+    assert len(corregida) == len(linea) and linea in contenido
+    return contenido.replace(linea, corregida, 1)
+
+
+def cantidad_documento(df, n):
+    return df.loc[df["+Numero Documento"] == n, "Cantidad"].tolist()
+
+
+def test_append_se_carga_incremental(tmp_path, ventas_csv):
+    ruta = str(tmp_path / "ventas.csv")
+    escribir(ruta, ventas_csv(0, 2000))
+    df, stats = snapshot.cargar_ventas(ruta, {}, directorio=str(tmp_path / "cache"))
+    assert stats["origen"] == "csv" and len(df) == 2000
+
+    escribir(ruta, ventas_csv(0, 2100))
+    df, stats = snapshot.cargar_ventas(ruta, {}, directorio=str(tmp_path / "cache"))
+    assert stats["origen"] == "incremental"
+    assert stats["filas_nuevas"] == 100 and len(df) == 2100
+
+
+def test_correccion_antes_de_la_cola_con_append_recarga(tmp_path, ventas_csv):
+    ruta = str(tmp_path / "ventas.csv")
+    cache = str(tmp_path / "cache")
+    original = ventas_csv(0, 2000)
+    assert len(original) > 128 * 1024
+    escribir(ruta, original)
+    snapshot.cargar_ventas(ruta, {}, directorio=cache)
+
+    escribir(ruta, corregir(ventas_csv(0, 2100), 10))
+    df, stats = snapshot.cargar_ventas(ruta, {}, directorio=cache)
+    assert stats["origen"] == "csv"
+    assert cantidad_documento(df, 10) == [9.0] and len(df) == 2100
+
+
+def test_correccion_sin_append_no_pasa_como_sin_cambios(tmp_path, ventas_csv):
+    ruta = str(tmp_path / "ventas.csv")
+    cache = str(tmp_path / "cache")
+    original = ventas_csv(0, 2000)
+    escribir(ruta, original, mtime=1_700_000_000_000_000_000)
+    snapshot.cargar_ventas(ruta, {}, directorio=cache)
+
+    # Mismo tamaño, otro mtime: cambia el validador pero no se agregaron bytes
+    escribir(ruta, corregir(original, 10), mtime=1_700_000_100_000_000_000)
+    df, stats = snapshot.cargar_ventas(ruta, {}, directorio=cache)
+    assert stats["origen"] == "csv"
+    assert cantidad_documento(df, 10) == [9.0]
+
+    # La meta quedó con el contenido nuevo: la siguiente carga usa el snapshot corregido
+    df, stats = snapshot.cargar_ventas(ruta, {}, directorio=cache)
+    assert stats["origen"] == "snapshot" and cantidad_documento(df, 10) == [9.0]
+
+
+def test_contenido_descargado_verifica_todo_el_prefijo(tmp_path, ventas_csv):
+    url = "https://ejemplo.invalid/ventas.csv"
+    cache = str(tmp_path / "cache")
+    snapshot.cargar_ventas(url, {}, directorio=cache, contenido=ventas_csv(0, 2000), validador="etag:\"1\"")
+
+    # Append limpio: incremental, y el hash del prefijo sigue al archivo
+    df, stats = snapshot.cargar_ventas(url, {}, directorio=cache, contenido=ventas_csv(0, 2050), validador="etag:\"2\"")
+    assert stats["origen"] == "incremental" and len(df) == 2050
+
+    # Corrección lejos de la cola más un append: recarga completa
+    df, stats = snapshot.cargar_ventas(
+        url, {}, directorio=cache, contenido=corregir(ventas_csv(0, 2100), 10), validador="etag:\"3\""
+    )
+    assert stats["origen"] == "csv"
+    assert cantidad_documento(df, 10) == [9.0] and len(df) == 2100
+